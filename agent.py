@@ -1,13 +1,28 @@
-from agents import Agent
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from typing import Optional, List
-import os
+from difflib import SequenceMatcher
+import hashlib
+import json
+import logging
+import math
+import re
 import asyncio
-from agents import Runner
 
-# Load environment variables
-load_dotenv()
+from config import config
+from metrics import metrics, track_provider_call
+from providers import providers
+from resilience import minutes_policy
+
+logger = logging.getLogger(__name__)
+
+minutes_input_tokens = metrics.counter(
+    "mma_minutes_input_tokens_total",
+    "Estimated transcript tokens sent to the minutes model, before and after compaction",
+    ["stage"]
+)
+
+class TokenBudgetExceededError(ValueError):
+    """Raised instead of sending a transcript larger than MINUTES_MAX_INPUT_TOKENS to the model"""
 
 class ActionItem(BaseModel):
     task: str
@@ -19,24 +34,7 @@ class MeetingMinutes(BaseModel):
     decisions: List[str]
     action_items: List[ActionItem]
 
-async def  generate_meeting_minutes(transcript: str) -> dict:
-    """
-    Generate meeting minutes from transcript using OpenAI Agent SDK
-    
-    Args:
-        transcript (str): The meeting transcript text
-        
-    Returns:
-        dict: Meeting minutes with summary, decisions, and action items
-    """
-    try:
-        # Check if OpenAI API key is available
-        if "OPENAI_API_KEY" not in os.environ:
-            raise ValueError("OPENAI_API_KEY environment variable not found")
-        
-        agent = Agent(
-            name="MeetingMinutesAgent",
-            instructions="""
+MINUTES_INSTRUCTIONS = """
 You are a Meeting Minutes Agent. 
 Your job is to take transcripts of meetings and produce:
 
@@ -45,30 +43,392 @@ Your job is to take transcripts of meetings and produce:
 3. Action items with owners and due dates (if mentioned)
 
 Please analyze the transcript and provide a structured response.
-""",
-            output_type=MeetingMinutes
+"""
+
+MAP_INSTRUCTIONS = """
+You are a Meeting Minutes Agent working on one part of a long meeting transcript.
+The transcript has been split into consecutive parts; you only see one of them.
+
+From this part alone, produce:
+
+1. A short summary of what was discussed in this part
+2. Key decisions made in this part
+3. Action items with owners and due dates (if mentioned)
+
+Do not guess at what happened in other parts.
+"""
+
+REDUCE_INSTRUCTIONS = """
+You are a Meeting Minutes Agent. You are given summaries of consecutive parts
+of one meeting, in order. Write a single coherent summary of the whole meeting.
+"""
+
+SUMMARY_INSTRUCTIONS = """
+You are a Meeting Minutes Agent. Decisions and action items have already been
+extracted from this meeting transcript. Write only a short summary of the discussion.
+"""
+
+UPDATE_INSTRUCTIONS = """
+You are a Meeting Minutes Agent following a live meeting. You are given the
+minutes so far and the newest part of the transcript. Produce:
+
+1. An updated summary of the whole meeting so far, in at most 150 words
+2. Only the decisions made in the newest part
+3. Only the action items that are new in the newest part, or that it gives
+   an owner or due date to (if mentioned)
+
+Do not repeat decisions or action items that are already in the minutes.
+"""
+
+def _minutes_fingerprint() -> str:
+    """Fingerprint everything besides the transcript that shapes the generated minutes"""
+    parts = [
+        MINUTES_INSTRUCTIONS,
+        MAP_INSTRUCTIONS,
+        REDUCE_INSTRUCTIONS,
+        SUMMARY_INSTRUCTIONS,
+        json.dumps(MeetingMinutes.model_json_schema(), sort_keys=True),
+        config.MINUTES_BACKEND,
+        config.MINUTES_MODEL or "sdk-default",
+        str(config.MINUTES_CHUNK_TOKENS),
+        str((config.COMPACT_TRANSCRIPTS, config.COMPACT_STRIP_FILLERS, config.COMPACT_MAX_NGRAM))
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+MINUTES_FINGERPRINT = _minutes_fingerprint()
+
+def minutes_cache_key(transcript: str, mode: str = "llm") -> str:
+    """
+    Build the meeting minutes cache key for a transcript
+
+    Whitespace is normalized so trivially reformatted transcripts share an
+    entry. The key also covers the agent instructions, output schema,
+    backend and model, so changing any of them invalidates earlier entries.
+
+    Args:
+        transcript (str): The meeting transcript text
+        mode (str): How the minutes are generated (llm or hybrid)
+
+    Returns:
+        str: The cache key
+    """
+    normalized = " ".join(transcript.split())
+    key = f"{MINUTES_FINGERPRINT}:{mode}:{normalized}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in a text (roughly four characters per token)"""
+    return math.ceil(len(text) / 4)
+
+def split_transcript(transcript: str, max_tokens: int) -> List[str]:
+    """
+    Split a transcript into consecutive chunks of at most max_tokens tokens
+
+    Chunks break on sentence and line boundaries where possible; a single
+    sentence longer than the budget is split on word boundaries.
+
+    Args:
+        transcript (str): The meeting transcript text
+        max_tokens (int): Token budget per chunk
+
+    Returns:
+        List[str]: The chunks, in order
+    """
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+|\n+", transcript) if s.strip()]
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for sentence in sentences:
+        pieces = [sentence]
+        if estimate_tokens(sentence) > max_tokens:
+            words = sentence.split()
+            words_per_piece = max(1, len(words) * max_tokens // estimate_tokens(sentence))
+            pieces = [" ".join(words[i:i + words_per_piece]) for i in range(0, len(words), words_per_piece)]
+
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece.strip())
+            current_tokens += piece_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+# Hesitations that carry no content, with the commas around them
+_FILLERS = re.compile(r"(?:,\s*)?\b(?:u+m+|u+h+m*|e+r+m*|a+h+|h+m+|m{2,})\b(?:,\s*)?", re.IGNORECASE)
+# Phrase fillers, only when set off by commas ("it was, you know, late")
+_PHRASE_FILLERS = re.compile(r",\s*(?:you know|i mean)\s*,", re.IGNORECASE)
+
+def _collapse_repeats(words: List[str], max_ngram: int) -> List[str]:
+    """
+    Drop immediate repeats of word sequences up to max_ngram words long
+
+    Catches ASR loops ("thank you thank you thank you") and text repeated
+    across chunk boundaries. Words are compared ignoring case and
+    punctuation. A single word is kept at most twice in a row, since some
+    doubled words ("had had") are grammatical.
+    """
+    kept: List[str] = []
+    keys: List[str] = []
+    for word in words:
+        key = re.sub(r"\W", "", word.lower())
+        kept.append(word)
+        keys.append(key)
+        if len(keys) >= 3 and keys[-3] == keys[-2] == key:
+            del kept[-1], keys[-1]
+            continue
+        for n in range(2, max_ngram + 1):
+            if len(keys) < 2 * n:
+                break
+            if keys[-n:] == keys[-2 * n:-n]:
+                del kept[-n:], keys[-n:]
+                break
+    return kept
+
+def compact_transcript(transcript: str) -> str:
+    """
+    Remove what costs model tokens without carrying meaning
+
+    Normalizes whitespace, collapses repeated word sequences and, with
+    COMPACT_STRIP_FILLERS, strips disfluencies such as "um" and "uh".
+
+    Args:
+        transcript (str): The meeting transcript text
+
+    Returns:
+        str: The compacted transcript
+    """
+    lines = []
+    for line in transcript.splitlines():
+        if config.COMPACT_STRIP_FILLERS:
+            line = _PHRASE_FILLERS.sub("", line)
+            line = _FILLERS.sub(" ", line)
+        words = _collapse_repeats(line.split(), config.COMPACT_MAX_NGRAM)
+        line = " ".join(words)
+        # Tidy punctuation left behind by removed words
+        line = re.sub(r"\s+([,.!?;:])", r"\1", line)
+        line = re.sub(r"([.!?])[,.]+", r"\1", line)
+        line = re.sub(r"^[,.;:]\s*", "", line)
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+def prepare_transcript(transcript: str) -> tuple:
+    """
+    Compact a transcript for the minutes model and check it against the token budget
+
+    Args:
+        transcript (str): The meeting transcript text
+
+    Returns:
+        tuple: The text to send and metadata with the input tokens before
+            and after compaction and the tokens saved
+
+    Raises:
+        TokenBudgetExceededError: If the compacted transcript is over MINUTES_MAX_INPUT_TOKENS
+    """
+    compacted = compact_transcript(transcript) if config.COMPACT_TRANSCRIPTS else transcript
+    input_tokens = estimate_tokens(transcript)
+    compacted_tokens = estimate_tokens(compacted)
+    if config.MINUTES_MAX_INPUT_TOKENS and compacted_tokens > config.MINUTES_MAX_INPUT_TOKENS:
+        raise TokenBudgetExceededError(
+            f"Transcript is about {compacted_tokens} tokens, over the budget of {config.MINUTES_MAX_INPUT_TOKENS}"
         )
+
+    minutes_input_tokens.inc(input_tokens, stage="raw")
+    minutes_input_tokens.inc(compacted_tokens, stage="compacted")
+    metadata = {
+        "input_tokens": input_tokens,
+        "compacted_tokens": compacted_tokens,
+        "tokens_saved": input_tokens - compacted_tokens
+    }
+    logger.info("Prepared transcript for the minutes model", extra=metadata)
+    return compacted, metadata
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+def _similar(a: str, b: str) -> bool:
+    # Compare word sequences so short texts differing in one token ("v1"/"v2") stay distinct
+    return SequenceMatcher(None, _words(a), _words(b)).ratio() >= config.MINUTES_DEDUPE_THRESHOLD
+
+def dedupe_decisions(decisions: List[str]) -> List[str]:
+    """Drop decisions that are near-identical to an earlier one"""
+    unique: List[str] = []
+    for decision in decisions:
+        if not any(_similar(decision, kept) for kept in unique):
+            unique.append(decision)
+    return unique
+
+def dedupe_action_items(action_items: List[ActionItem]) -> List[ActionItem]:
+    """
+    Merge action items with near-identical tasks and compatible owners
+
+    The first occurrence is kept, with a missing owner or due date filled in
+    from its duplicates.
+    """
+    unique: List[ActionItem] = []
+    for item in action_items:
+        for kept in unique:
+            owners_match = not item.owner or not kept.owner or _similar(item.owner, kept.owner)
+            if owners_match and _similar(item.task, kept.task):
+                kept.owner = kept.owner or item.owner
+                kept.due = kept.due or item.due
+                break
+        else:
+            unique.append(item.model_copy())
+    return unique
+
+def prepare_agents() -> None:
+    """Build the shared minutes agents ahead of the first request"""
+    backend = providers.minutes()
+    backend.prepare("MeetingMinutesAgent", MINUTES_INSTRUCTIONS, MeetingMinutes)
+    backend.prepare("MeetingMinutesChunkAgent", MAP_INSTRUCTIONS, MeetingMinutes)
+    backend.prepare("MeetingMinutesReduceAgent", REDUCE_INSTRUCTIONS)
+    backend.prepare("MeetingMinutesSummaryAgent", SUMMARY_INSTRUCTIONS)
+    backend.prepare("MeetingMinutesUpdateAgent", UPDATE_INSTRUCTIONS, MeetingMinutes)
+
+async def _run_agent(agent_name: str, instructions: str, prompt: str, output_type=None):
+    """
+    Run one agent on the minutes backend with retries, hedging and circuit
+    breaking, recording the latency and any failure of every attempt
+    """
+    backend = await providers.load_minutes()
+
+    async def attempt():
+        with track_provider_call("minutes", backend.name):
+            return await backend.run(agent_name, instructions, prompt, output_type)
+
+    return await minutes_policy.call_async(attempt)
+
+async def _map_reduce_minutes(transcript: str) -> MeetingMinutes:
+    """
+    Generate minutes for a long transcript chunk by chunk
+
+    Each chunk is summarised concurrently (map). The partial decisions and
+    action items are merged with near-duplicates removed, and the partial
+    summaries are combined into one by a final model call (reduce).
+    """
+    chunks = split_transcript(transcript, config.MINUTES_CHUNK_TOKENS)
+    logger.info("Generating meeting minutes with map-reduce", extra={"chunks": len(chunks)})
+
+    semaphore = asyncio.Semaphore(config.MINUTES_MAP_CONCURRENCY)
+
+    async def extract(index: int, chunk: str) -> MeetingMinutes:
+        async with semaphore:
+            return await _run_agent(
+                "MeetingMinutesChunkAgent", MAP_INSTRUCTIONS,
+                f"Part {index + 1} of {len(chunks)}:\n\n{chunk}", MeetingMinutes
+            )
+
+    partials = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks)))
+
+    summaries = "\n\n".join(
+        f"Part {i + 1}: {partial.summary}" for i, partial in enumerate(partials)
+    )
+    summary = await _run_agent("MeetingMinutesReduceAgent", REDUCE_INSTRUCTIONS, summaries)
+
+    return MeetingMinutes(
+        summary=summary,
+        decisions=dedupe_decisions([d for partial in partials for d in partial.decisions]),
+        action_items=dedupe_action_items([a for partial in partials for a in partial.action_items])
+    )
+
+def minutes_to_dict(output: MeetingMinutes) -> dict:
+    """Convert meeting minutes to the dictionary format of API responses"""
+    return {
+        "summary": output.summary,
+        "decisions": output.decisions,
+        "action_items": [
+            {
+                "task": item.task,
+                "owner": item.owner,
+                "due": item.due
+            }
+            for item in output.action_items
+        ]
+    }
+
+async def summarize_transcript(transcript: str) -> str:
+    """
+    Write only the summary of a meeting, for when decisions and action items are already known
+
+    Raises:
+        Exception: If the minutes backend fails
+    """
+    return await _run_agent("MeetingMinutesSummaryAgent", SUMMARY_INSTRUCTIONS, transcript)
+
+async def update_meeting_minutes(minutes: MeetingMinutes, delta: str) -> MeetingMinutes:
+    """
+    Fold a new part of a live meeting's transcript into its minutes
+
+    The model sees only the current minutes and the new part, never the
+    whole transcript, so each update costs about the same however long
+    the meeting has run. New decisions and action items are merged into
+    the existing ones with near-duplicates removed.
+
+    Args:
+        minutes (MeetingMinutes): The minutes so far
+        delta (str): Transcript text added since the last update
+
+    Returns:
+        MeetingMinutes: The updated minutes
+
+    Raises:
+        Exception: If the delta is over the token budget or the minutes backend fails
+    """
+    delta, _ = prepare_transcript(delta)
+    prompt = (
+        f"Minutes so far:\n{minutes.model_dump_json()}\n\n"
+        f"Newest part of the transcript:\n{delta}"
+    )
+    update = await _run_agent("MeetingMinutesUpdateAgent", UPDATE_INSTRUCTIONS, prompt, MeetingMinutes)
+    return MeetingMinutes(
+        summary=update.summary,
+        decisions=dedupe_decisions(minutes.decisions + update.decisions),
+        action_items=dedupe_action_items(minutes.action_items + update.action_items)
+    )
+
+async def  generate_meeting_minutes(transcript: str) -> dict:
+    """
+    Generate meeting minutes from transcript with the configured minutes backend (OpenAI Agent SDK by default)
+
+    The transcript is compacted first. Transcripts still longer than
+    MINUTES_CHUNK_TOKENS are processed with map-reduce over transcript
+    chunks instead of in a single call.
+    
+    Args:
+        transcript (str): The meeting transcript text
         
-        # Process the transcript
-        result = await Runner.run(agent, transcript)    
-        output = result.final_output
-        print(output)
+    Returns:
+        dict: Meeting minutes with summary, decisions, and action items,
+            plus token counts under "metadata"
+
+    Raises:
+        TokenBudgetExceededError: If the transcript is over MINUTES_MAX_INPUT_TOKENS
+            even after compaction; retrying can't help, so it is not reported in the minutes
+    """
+    transcript, metadata = prepare_transcript(transcript)
+    try:
+        if metadata["compacted_tokens"] > config.MINUTES_CHUNK_TOKENS:
+            output = await _map_reduce_minutes(transcript)
+        else:
+            # Process the transcript
+            output = await _run_agent(
+                "MeetingMinutesAgent", MINUTES_INSTRUCTIONS, transcript, MeetingMinutes
+            )
+        logger.debug("Meeting minutes: %s", output)
         # Convert to dictionary format for API response
-        return {
-            "summary": output.summary,
-            "decisions": output.decisions,
-            "action_items": [
-                {
-                    "task": item.task,
-                    "owner": item.owner,
-                    "due": item.due
-                }
-                for item in output.action_items
-            ]
-        }
+        meeting_minutes = minutes_to_dict(output)
+        meeting_minutes["metadata"] = metadata
+        return meeting_minutes
         
     except Exception as e:
-        print(f"Error generating meeting minutes: {str(e)}")
+        logger.error("Error generating meeting minutes: %s", e)
         return {
             "summary": "Error generating meeting minutes",
             "decisions": [],
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import date, datetime
+from typing import Generator, Iterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import config
+from rules import resolve_due_date
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    transcript_sha256 TEXT NOT NULL UNIQUE,
+    transcript TEXT NOT NULL,
+    summary TEXT,
+    decisions TEXT,
+    minutes TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decisions_meeting ON decisions (meeting_id);
+CREATE TABLE IF NOT EXISTS action_items (
+    id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+    task TEXT NOT NULL,
+    owner TEXT COLLATE NOCASE,
+    due TEXT,
+    due_date TEXT
+);
+CREATE INDEX IF NOT EXISTS action_items_meeting ON action_items (meeting_id);
+CREATE INDEX IF NOT EXISTS action_items_owner ON action_items (owner, id);
+CREATE INDEX IF NOT EXISTS action_items_due_date ON action_items (due_date, id);
+
+-- Full-text index over the meetings table, kept in step by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+    summary, decisions, transcript,
+    content='meetings', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS meetings_ai AFTER INSERT ON meetings BEGIN
+    INSERT INTO meetings_fts (rowid, summary, decisions, transcript)
+    VALUES (new.id, new.summary, new.decisions, new.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_ad AFTER DELETE ON meetings BEGIN
+    INSERT INTO meetings_fts (meetings_fts, rowid, summary, decisions, transcript)
+    VALUES ('delete', old.id, old.summary, old.decisions, old.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_au AFTER UPDATE ON meetings BEGIN
+    INSERT INTO meetings_fts (meetings_fts, rowid, summary, decisions, transcript)
+    VALUES ('delete', old.id, old.summary, old.decisions, old.transcript);
+    INSERT INTO meetings_fts (rowid, summary, decisions, transcript)
+    VALUES (new.id, new.summary, new.decisions, new.transcript);
+END;
+"""
+
+
+def _fts_query(text: str) -> str:
+    # Match every word literally, so user input can't hit FTS5 query syntax
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class MinutesArchive:
+    """
+    SQLite archive of transcripts and meeting minutes
+
+    Meetings are keyed by their transcript, so transcribing a recording and
+    later generating its minutes fills in one meeting rather than two.
+    Decisions and action items get their own rows for querying, and an FTS5
+    index covers summaries, decisions and transcripts. Like the job store,
+    every method opens its own short-lived connection.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def record(self, transcript: str, meeting_minutes: Optional[dict] = None) -> int:
+        """
+        Store a transcript and, if given, its minutes
+
+        Minutes replace any stored earlier for the same transcript. Recording
+        the same transcript and minutes again changes nothing, so decision
+        and action item ids stay stable for cursors that page on them.
+
+        Args:
+            transcript (str): The meeting transcript text
+            meeting_minutes (dict, optional): Minutes with summary, decisions and action items
+
+        Returns:
+            int: The meeting id
+        """
+        normalized = " ".join(transcript.split())
+        transcript_sha256 = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        now = time.time()
+        summary = decisions = minutes_json = None
+        if meeting_minutes:
+            summary = meeting_minutes.get("summary")
+            decisions = "\n".join(meeting_minutes.get("decisions", []))
+            minutes_json = json.dumps(meeting_minutes)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, minutes FROM meetings WHERE transcript_sha256 = ?", (transcript_sha256,)
+            ).fetchone()
+            if row is not None and (minutes_json is None or row["minutes"] == minutes_json):
+                return row["id"]
+
+            row = conn.execute(
+                "INSERT INTO meetings (transcript_sha256, transcript, summary, decisions, minutes, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (transcript_sha256) DO UPDATE SET "
+                "summary = coalesce(excluded.summary, summary), "
+                "decisions = coalesce(excluded.decisions, decisions), "
+                "minutes = coalesce(excluded.minutes, minutes), "
+                "updated_at = excluded.updated_at "
+                "RETURNING id, created_at",
+                (transcript_sha256, transcript, summary, decisions, minutes_json, now, now)
+            ).fetchone()
+            meeting_id = row["id"]
+            if not meeting_minutes:
+                return meeting_id
+
+            # Relative due dates ("Friday") count from when the meeting was first seen
+            meeting_day = date.fromtimestamp(row["created_at"])
+            conn.execute("DELETE FROM decisions WHERE meeting_id = ?", (meeting_id,))
+            conn.execute("DELETE FROM action_items WHERE meeting_id = ?", (meeting_id,))
+            conn.executemany(
+                "INSERT INTO decisions (meeting_id, text) VALUES (?, ?)",
+                [(meeting_id, text) for text in meeting_minutes.get("decisions", [])]
+            )
+            action_items = []
+            for item in meeting_minutes.get("action_items", []):
+                due_date = resolve_due_date(item["due"], meeting_day) if item.get("due") else None
+                action_items.append((
+                    meeting_id, item["task"], item.get("owner"), item.get("due"),
+                    due_date.isoformat() if due_date else None
+                ))
+            conn.executemany(
+                "INSERT INTO action_items (meeting_id, task, owner, due, due_date) VALUES (?, ?, ?, ?, ?)",
+                action_items
+            )
+        return meeting_id
+
+    def get(self, meeting_id: int) -> Optional[dict]:
+        """Return an archived meeting with its minutes, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, transcript, minutes, created_at, updated_at FROM meetings WHERE id = ?",
+                (meeting_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        meeting = dict(row)
+        meeting["minutes"] = json.loads(meeting["minutes"]) if meeting["minutes"] else None
+        return meeting
+
+    def _rows(self, sql: str, params: tuple) -> Iterator[sqlite3.Row]:
+        # Rows are fetched a few at a time as the response is written; the
+        # generator may be resumed from different threadpool threads
+        conn = self._connect(check_same_thread=False)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(64)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def search(self, query: str, limit: int, before_id: Optional[int] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[dict]:
+        """
+        Yield meetings matching every word of a query, newest first
+
+        Args:
+            query (str): Words to search for in summaries, decisions and transcripts
+            limit (int): Maximum number of meetings to yield
+            before_id (int, optional): Only meetings older than this id (the page cursor)
+            since (datetime, optional): Only meetings first seen at or after this time
+            until (datetime, optional): Only meetings first seen before this time
+
+        Returns:
+            Iterator[dict]: Matching meetings with a highlighted snippet
+        """
+        sql = (
+            "SELECT m.id AS meeting_id, m.created_at, m.summary, "
+            "snippet(meetings_fts, -1, '[', ']', '...', 16) AS snippet "
+            "FROM meetings_fts JOIN meetings m ON m.id = meetings_fts.rowid "
+            "WHERE meetings_fts MATCH ?"
+        )
+        params = [_fts_query(query)]
+        if before_id is not None:
+            sql += " AND meetings_fts.rowid < ?"
+            params.append(before_id)
+        if since is not None:
+            sql += " AND m.created_at >= ?"
+            params.append(since.timestamp())
+        if until is not None:
+            sql += " AND m.created_at < ?"
+            params.append(until.timestamp())
+        # Walking the index in rowid order lets the limit stop the scan early
+        sql += " ORDER BY meetings_fts.rowid DESC LIMIT ?"
+        params.append(limit)
+        for row in self._rows(sql, tuple(params)):
+            yield dict(row)
+
+    def action_items(self, limit: int, before_id: Optional[int] = None, owner: Optional[str] = None,
+                     due_before: Optional[date] = None) -> Iterator[dict]:
+        """
+        Yield archived action items, newest first
+
+        Args:
+            limit (int): Maximum number of action items to yield
+            before_id (int, optional): Only items older than this id (the page cursor)
+            owner (str, optional): Only items owned by this person (case-insensitive)
+            due_before (date, optional): Only items due strictly before this date;
+                items without a resolvable due date are left out
+
+        Returns:
+            Iterator[dict]: Action items with their meeting id and resolved due date
+        """
+        sql = (
+            "SELECT a.id, a.meeting_id, a.task, a.owner, a.due, a.due_date, m.created_at "
+            "FROM action_items a JOIN meetings m ON m.id = a.meeting_id WHERE 1 = 1"
+        )
+        params = []
+        if before_id is not None:
+            sql += " AND a.id < ?"
+            params.append(before_id)
+        if owner is not None:
+            sql += " AND a.owner = ?"
+            params.append(owner)
+        if due_before is not None:
+            sql += " AND a.due_date < ?"
+            params.append(due_before.isoformat())
+        sql += " ORDER BY a.id DESC LIMIT ?"
+        params.append(limit)
+        for row in self._rows(sql, tuple(params)):
+            yield dict(row)
+
+
+async def prefetch(items: Generator[dict, None, None]) -> Generator[dict, None, None]:
+    """
+    Run a query as far as its first item before the response starts
+
+    Once a streamed response has sent its 200 headers, a failing query can
+    only cut the body short; failing here turns it into an error response.
+
+    Returns:
+        Generator: The same items, first one included; closing it closes the query
+    """
+    first = await run_in_threadpool(next, items, None)
+
+    def chained() -> Generator[dict, None, None]:
+        try:
+            if first is not None:
+                yield first
+                yield from items
+        finally:
+            items.close()
+
+    return chained()
+
+
+def json_page(items: Generator[dict, None, None], limit: int, cursor_field: str) -> Iterator[bytes]:
+    """
+    Encode one page of results as JSON while they are read
+
+    The page is ``{"items": [...], "next_cursor": ...}``. Callers ask the
+    query for ``limit + 1`` items; the extra one only shows there is a
+    next page, whose cursor is the last item's ``cursor_field``.
+    """
+    yield b'{"items": ['
+    last = None
+    count = 0
+    try:
+        for item in items:
+            if count == limit:
+                break
+            if count:
+                yield b", "
+            yield json.dumps(item).encode("utf-8")
+            last = item
+            count += 1
+        else:
+            last = None
+    finally:
+        # Release the database connection even if the client went away
+        items.close()
+    next_cursor = last[cursor_field] if last is not None else None
+    yield f'], "next_cursor": {json.dumps(next_cursor)}}}'.encode("utf-8")
+
+
+async def archive_result(transcript: str, meeting_minutes: Optional[dict] = None) -> None:
+    """
+    Archive a fresh transcript and minutes without failing the request
+
+    Minutes that report an error are not archived, only their transcript.
+    """
+    if not config.ARCHIVE_ENABLED:
+        return
+    if meeting_minutes and "error" in meeting_minutes:
+        meeting_minutes = None
+    try:
+        await run_in_threadpool(minutes_archive.record, transcript, meeting_minutes)
+    except Exception as e:
+        logger.error("Error archiving meeting: %s", e)
+
+
+# Create archive instance
+minutes_archive = MinutesArchive(config.ARCHIVE_DB_PATH)
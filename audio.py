@@ -0,0 +1,405 @@
+import bisect
+import io
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Whisper consumes 16 kHz mono audio, so that is what we decode compressed formats to
+TARGET_SAMPLE_RATE = 16000
+
+
+# Output samples resampled per block, bounding the float64 index arrays
+_RESAMPLE_BLOCK = 1 << 16
+
+
+@dataclass
+class PCMAudio:
+    """
+    Raw interleaved PCM samples plus the parameters needed to interpret them
+
+    Slices share their parent's buffer, so ``frames`` may be a memoryview.
+    """
+    frames: bytes
+    sample_rate: int
+    channels: int
+    sample_width: int
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def duration(self) -> float:
+        """Length of the audio in seconds"""
+        return len(self.frames) / (self.frame_size * self.sample_rate)
+
+    def slice(self, start: float, end: float) -> "PCMAudio":
+        """Return the audio between two offsets, in seconds"""
+        start_byte = int(start * self.sample_rate) * self.frame_size
+        end_byte = int(end * self.sample_rate) * self.frame_size
+        return PCMAudio(
+            frames=memoryview(self.frames)[start_byte:end_byte],
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            sample_width=self.sample_width
+        )
+
+    def to_mono_float(self) -> np.ndarray:
+        """Return the samples as one float32 channel scaled to [-1, 1]"""
+        usable = len(self.frames) - len(self.frames) % self.frame_size
+        raw = np.frombuffer(memoryview(self.frames)[:usable], dtype=np.uint8)
+        if self.sample_width == 1:
+            values, offset, scale = raw, 128, 128
+        elif self.sample_width == 3:
+            # Sign-extend 24-bit little-endian samples into int32
+            triples = raw.reshape(-1, 3).astype(np.int32)
+            values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+            values = np.where(values >= 1 << 23, values - (1 << 24), values)
+            offset, scale = 0, 1 << 23
+        else:
+            dtype = {2: np.int16, 4: np.int32}[self.sample_width]
+            values, offset, scale = raw.view(dtype), 0, np.iinfo(dtype).max
+
+        # Downmix before scaling so only one float copy of the audio is made
+        if self.channels > 1:
+            samples = values.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        else:
+            samples = values.astype(np.float32)
+        if offset:
+            samples -= offset
+        samples /= scale
+        return samples
+
+    def to_wav_bytes(self) -> bytes:
+        """Encode the audio as an in-memory WAV file"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(self.channels)
+            wav_file.setsampwidth(self.sample_width)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(self.frames)
+        return buffer.getvalue()
+
+
+def load_pcm(audio_file_path: str) -> Optional[PCMAudio]:
+    """
+    Decode an audio file to PCM
+
+    PCM WAV files are read directly. Anything else is decoded with ffmpeg
+    to 16 kHz mono 16-bit PCM when ffmpeg is installed.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+
+    Returns:
+        PCMAudio: The decoded audio, or None if the file cannot be decoded
+    """
+    try:
+        with wave.open(audio_file_path, "rb") as wav_file:
+            return PCMAudio(
+                frames=wav_file.readframes(wav_file.getnframes()),
+                sample_rate=wav_file.getframerate(),
+                channels=wav_file.getnchannels(),
+                sample_width=wav_file.getsampwidth()
+            )
+    except (wave.Error, EOFError):
+        pass
+
+    if shutil.which("ffmpeg") is None:
+        return None
+
+    result = subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-i", audio_file_path,
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-"
+        ],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        return None
+
+    return PCMAudio(
+        frames=result.stdout,
+        sample_rate=TARGET_SAMPLE_RATE,
+        channels=1,
+        sample_width=2
+    )
+
+
+def split_windows(audio: PCMAudio, window_seconds: float, overlap_seconds: float) -> List[PCMAudio]:
+    """
+    Split audio into fixed-length windows that overlap their predecessor
+
+    Args:
+        audio (PCMAudio): The audio to split
+        window_seconds (float): Length of each window
+        overlap_seconds (float): How much of the previous window each window repeats
+
+    Returns:
+        List[PCMAudio]: The windows, in order
+    """
+    step = window_seconds - overlap_seconds
+    if step <= 0:
+        raise ValueError("Window length must be greater than the overlap")
+
+    windows = []
+    start = 0.0
+    while True:
+        end = start + window_seconds
+        windows.append(audio.slice(start, end))
+        if end >= audio.duration:
+            break
+        start += step
+    return windows
+
+
+
+def lowpass_filter(samples: np.ndarray, cutoff: float, sample_rate: int, taps: int = 101) -> np.ndarray:
+    """
+    Apply a windowed-sinc FIR low-pass filter
+
+    Args:
+        samples (np.ndarray): Mono float samples
+        cutoff (float): Cutoff frequency in Hz
+        sample_rate (int): Sample rate of the samples
+        taps (int): Filter length; odd, so the filter has no delay
+
+    Returns:
+        np.ndarray: The filtered samples, the same length as the input
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff / sample_rate * n) * np.hamming(taps)
+    kernel = (kernel / kernel.sum()).astype(np.float32)
+    return np.convolve(samples, kernel, mode="same")
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample mono float samples to another rate
+
+    Downsampling first low-pass filters below the new Nyquist frequency so
+    high frequencies do not alias into the speech band; the samples are
+    then linearly interpolated onto the new timeline.
+
+    Args:
+        samples (np.ndarray): Mono float samples
+        source_rate (int): Current sample rate
+        target_rate (int): Desired sample rate
+
+    Returns:
+        np.ndarray: The resampled samples
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    if target_rate < source_rate:
+        # Leave a little room below Nyquist for the filter's transition band
+        samples = lowpass_filter(samples, 0.45 * target_rate, source_rate)
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    step = source_rate / target_rate
+    last = len(samples) - 1
+    resampled = np.empty(target_length, dtype=np.float32)
+    for start in range(0, target_length, _RESAMPLE_BLOCK):
+        positions = np.arange(start, min(start + _RESAMPLE_BLOCK, target_length), dtype=np.float64) * step
+        left = np.minimum(positions.astype(np.int64), last)
+        right = np.minimum(left + 1, last)
+        fraction = (positions - left).astype(np.float32)
+        resampled[start:start + len(positions)] = samples[left] + (samples[right] - samples[left]) * fraction
+    return resampled
+
+
+def is_normalized(audio: PCMAudio, sample_rate: int = TARGET_SAMPLE_RATE) -> bool:
+    """Return whether audio is already mono 16-bit PCM at the given rate"""
+    return audio.sample_rate == sample_rate and audio.channels == 1 and audio.sample_width == 2
+
+
+def normalize_audio(audio: PCMAudio, sample_rate: int = TARGET_SAMPLE_RATE) -> PCMAudio:
+    """
+    Downmix audio to mono and resample it to 16-bit PCM at the target rate
+
+    Args:
+        audio (PCMAudio): The audio to normalize
+        sample_rate (int): Target sample rate
+
+    Returns:
+        PCMAudio: The normalized audio, or the input itself if it is already in the target format
+    """
+    if is_normalized(audio, sample_rate):
+        return audio
+    samples = resample(audio.to_mono_float(), audio.sample_rate, sample_rate)
+    np.clip(samples, -1.0, 1.0, out=samples)
+    samples *= 32767
+    pcm = samples.astype("<i2")
+    return PCMAudio(frames=pcm.tobytes(), sample_rate=sample_rate, channels=1, sample_width=2)
+
+
+def encode_audio(audio: PCMAudio, format: str = "wav") -> bytes:
+    """
+    Encode audio for upload to a provider
+
+    FLAC is lossless and roughly half the size of WAV for speech, but needs
+    ffmpeg; without it, or for any other format, the audio is sent as WAV.
+
+    Args:
+        audio (PCMAudio): The audio to encode
+        format (str): "wav" or "flac"
+
+    Returns:
+        bytes: The encoded audio file
+    """
+    if format == "flac" and shutil.which("ffmpeg") is not None:
+        sample_format = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}[audio.sample_width]
+        result = subprocess.run(
+            [
+                "ffmpeg", "-v", "error",
+                "-f", sample_format, "-ar", str(audio.sample_rate), "-ac", str(audio.channels), "-i", "-",
+                "-f", "flac", "-"
+            ],
+            input=audio.frames,
+            capture_output=True
+        )
+        if result.returncode == 0:
+            return result.stdout
+    return audio.to_wav_bytes()
+
+@dataclass
+class TrimmedAudio:
+    """
+    Audio with silent spans removed, plus the map back to the original timeline
+
+    Each segment is ``(trimmed_start, original_start, duration)`` in seconds:
+    the kept audio from ``trimmed_start`` onwards came from ``original_start``
+    in the original recording.
+    """
+    audio: PCMAudio
+    segments: List[Tuple[float, float, float]] = field(default_factory=list)
+    removed_seconds: float = 0.0
+
+    def to_original(self, offset: float) -> float:
+        """Map an offset in the trimmed audio to the same moment in the original"""
+        if not self.segments:
+            return offset
+        starts = [segment[0] for segment in self.segments]
+        trimmed_start, original_start, _ = self.segments[max(0, bisect.bisect_right(starts, offset) - 1)]
+        return original_start + offset - trimmed_start
+
+
+def detect_speech(audio: PCMAudio, frame_seconds: float, margin_db: float,
+                  zcr_threshold: float) -> Optional[np.ndarray]:
+    """
+    Classify fixed-length frames as speech or silence from their energy and zero-crossing rate
+
+    The threshold adapts to the recording: frames are compared with its
+    noise floor (the 10th percentile of frame energies). Frames well above
+    the floor are speech; frames moderately above it count as speech when
+    their zero-crossing rate is high, which catches unvoiced consonants.
+
+    Args:
+        audio (PCMAudio): The audio to analyse
+        frame_seconds (float): Length of each analysis frame
+        margin_db (float): How far above the noise floor a frame must be to count as speech
+        zcr_threshold (float): Zero-crossing rate (crossings per sample) marking quiet unvoiced speech
+
+    Returns:
+        np.ndarray: One boolean per frame, or None if the recording has too
+            little dynamic range to tell speech from silence
+    """
+    samples = audio.to_mono_float()
+    frame_length = max(1, int(frame_seconds * audio.sample_rate))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return None
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy_db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame_length + 1e-12)
+    zcr = np.mean(np.diff(np.signbit(frames), axis=1), axis=1)
+
+    noise_floor = np.percentile(energy_db, 10)
+    if energy_db.max() - noise_floor < margin_db:
+        return None
+
+    loud = energy_db > noise_floor + margin_db
+    unvoiced = (energy_db > noise_floor + margin_db / 2) & (zcr > zcr_threshold)
+    return loud | unvoiced
+
+
+def level_db(audio: PCMAudio) -> float:
+    """Return the RMS level of audio in dB relative to full scale"""
+    samples = audio.to_mono_float()
+    if not len(samples):
+        return -120.0
+    return float(10 * np.log10(np.dot(samples, samples) / len(samples) + 1e-12))
+
+
+def _runs(mask: np.ndarray, value: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end indices of the runs of a value in a boolean array"""
+    edges = np.diff(np.concatenate(([False], mask == value, [False])).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def trim_silence(audio: PCMAudio, min_silence_seconds: float, padding_seconds: float,
+                 frame_seconds: float = 0.03, margin_db: float = 12.0,
+                 zcr_threshold: float = 0.25) -> TrimmedAudio:
+    """
+    Remove long silent spans from audio
+
+    Speech is padded on both sides so word edges are not clipped, and only
+    silences longer than min_silence_seconds after padding are removed.
+    Audio in which no speech can be told apart is returned unchanged.
+
+    Args:
+        audio (PCMAudio): The audio to trim
+        min_silence_seconds (float): Shortest silence worth removing
+        padding_seconds (float): Audio kept on each side of detected speech
+        frame_seconds (float): Length of each analysis frame
+        margin_db (float): Energy above the noise floor that counts as speech
+        zcr_threshold (float): Zero-crossing rate marking quiet unvoiced speech
+
+    Returns:
+        TrimmedAudio: The kept audio, its offset map and the seconds removed
+    """
+    untrimmed = TrimmedAudio(audio, [(0.0, 0.0, audio.duration)])
+    speech = detect_speech(audio, frame_seconds, margin_db, zcr_threshold)
+    if speech is None or not speech.any():
+        return untrimmed
+
+    # Pad speech on both sides, then keep silences too short to be worth removing
+    pad_frames = int(round(padding_seconds / frame_seconds))
+    if pad_frames:
+        speech = np.convolve(speech, np.ones(2 * pad_frames + 1), mode="same") > 0
+    keep = speech.copy()
+    for start, end in zip(*_runs(speech, False)):
+        if (end - start) * frame_seconds < min_silence_seconds:
+            keep[start:end] = True
+    if keep.all():
+        return untrimmed
+
+    frame_length = max(1, int(frame_seconds * audio.sample_rate))
+    total_samples = len(audio.frames) // audio.frame_size
+    frames = memoryview(audio.frames)
+    pieces = []
+    segments = []
+    kept_samples = 0
+    for start, end in zip(*_runs(keep, True)):
+        start_sample = int(start) * frame_length
+        # The partial frame at the end goes with the last frame
+        end_sample = total_samples if end == len(keep) else int(end) * frame_length
+        pieces.append(frames[start_sample * audio.frame_size:end_sample * audio.frame_size])
+        segments.append((
+            kept_samples / audio.sample_rate,
+            start_sample / audio.sample_rate,
+            (end_sample - start_sample) / audio.sample_rate
+        ))
+        kept_samples += end_sample - start_sample
+
+    trimmed = PCMAudio(
+        frames=b"".join(pieces),
+        sample_rate=audio.sample_rate,
+        channels=audio.channels,
+        sample_width=audio.sample_width
+    )
+    return TrimmedAudio(trimmed, segments, audio.duration - trimmed.duration)
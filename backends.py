@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Optional, Protocol, Union
+
+from config import config
+
+# Provider SDKs (huggingface_hub, openai, agents) take seconds to import, so
+# each backend imports its own on construction: processes start without
+# them, and only the selected backends ever load theirs
+
+logger = logging.getLogger(__name__)
+
+
+class ASRBackend(Protocol):
+    """Speech recognition backend used by transcription.py"""
+    name: str
+
+    def transcribe(self, audio: Union[str, bytes]) -> str:
+        """Transcribe an audio file path or in-memory audio; blocking"""
+        ...
+
+    async def warmup(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class MinutesBackend(Protocol):
+    """LLM backend used by agent.py to run its agents"""
+    name: str
+
+    def prepare(self, agent_name: str, instructions: str, output_type=None) -> None:
+        """Build whatever the backend needs for an agent ahead of its first run"""
+        ...
+
+    async def run(self, agent_name: str, instructions: str, prompt: str, output_type=None) -> Any:
+        """Run an agent on a prompt and return its final output (an output_type instance or str)"""
+        ...
+
+    async def warmup(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+def extract_asr_text(output) -> str:
+    """Pull the transcript text out of an ASR response"""
+    # Handle different response types
+    if hasattr(output, 'text'):
+        # If it's an object with a text attribute
+        return output.text
+    elif isinstance(output, dict) and 'text' in output:
+        # If it's a dictionary with text key
+        return output['text']
+    elif isinstance(output, str):
+        # If it's already a string
+        return output
+    elif hasattr(output, '__str__'):
+        # Try to convert to string as fallback
+        return str(output)
+    else:
+        # Last resort - try to access common attributes
+        logger.warning("Unexpected ASR output type %s: %r", type(output), output)
+        return "Transcription completed but text extraction failed"
+
+
+class HuggingFaceASRBackend:
+    """Hugging Face inference providers, through one shared InferenceClient"""
+    name = "huggingface"
+
+    def __init__(self):
+        # Check if HF_TOKEN is available
+        if "HF_TOKEN" not in os.environ:
+            raise ValueError("HF_TOKEN environment variable not found")
+
+        from huggingface_hub import InferenceClient
+
+        self.client = InferenceClient(
+            provider=config.TRANSCRIPTION_PROVIDER,
+            api_key=os.environ["HF_TOKEN"],
+            timeout=config.TRANSCRIPTION_TIMEOUT
+        )
+
+    def transcribe(self, audio: Union[str, bytes]) -> str:
+        output = self.client.automatic_speech_recognition(audio, model=config.TRANSCRIPTION_MODEL)
+        return extract_asr_text(output)
+
+    async def warmup(self) -> None:
+        from huggingface_hub import get_session
+
+        await asyncio.to_thread(
+            get_session().head, "https://router.huggingface.co", timeout=config.PROVIDER_WARMUP_TIMEOUT
+        )
+
+    def close(self) -> None:
+        if hasattr(self.client, "close"):
+            self.client.close()
+
+
+class OpenAIAgentsMinutesBackend:
+    """OpenAI Agents SDK with one pooled AsyncOpenAI client and agents built once"""
+    name = "openai"
+
+    def __init__(self):
+        # Check if OpenAI API key is available
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable not found")
+
+        import httpx
+        from agents import Agent, Runner, set_default_openai_client
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        self._agent_class = Agent
+        self._runner = Runner
+        self.client = AsyncOpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.OPENAI_MAX_CONNECTIONS
+                )
+            )
+        )
+        set_default_openai_client(self.client)
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def _agent(self, agent_name: str, instructions: str, output_type=None) -> Any:
+        with self._lock:
+            if agent_name not in self._agents:
+                agent_options = {"model": config.MINUTES_MODEL} if config.MINUTES_MODEL else {}
+                if output_type is not None:
+                    agent_options["output_type"] = output_type
+                self._agents[agent_name] = self._agent_class(
+                    name=agent_name, instructions=instructions, **agent_options
+                )
+            return self._agents[agent_name]
+
+    def prepare(self, agent_name: str, instructions: str, output_type=None) -> None:
+        self._agent(agent_name, instructions, output_type)
+
+    async def run(self, agent_name: str, instructions: str, prompt: str, output_type=None) -> Any:
+        result = await self._runner.run(self._agent(agent_name, instructions, output_type), prompt)
+        return result.final_output
+
+    async def warmup(self) -> None:
+        await self.client.with_options(timeout=config.PROVIDER_WARMUP_TIMEOUT).models.list()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class FakeProviderError(RuntimeError):
+    """Injected failure from a fake backend"""
+
+
+class LatencyModel:
+    """
+    Random latency drawn from a distribution spec
+
+    Specs look like ``fixed:1.5``, ``uniform:0.5:2.0``, ``exponential:1.0``
+    (mean) or ``lognormal:1.0:0.5`` (median and sigma), all in seconds.
+    """
+
+    def __init__(self, spec: str, rng: random.Random):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.rng = rng
+        if kind not in ("fixed", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(self.params[0], self.params[1])
+        if self.kind == "exponential":
+            return self.rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        median, sigma = self.params
+        return median * self.rng.lognormvariate(0, sigma)
+
+
+_FAKE_SENTENCES = [
+    "We reviewed the progress since the last meeting.",
+    "The team discussed the project timeline in detail.",
+    "There were some concerns about the budget for next quarter.",
+    "Everyone agreed the release needs more testing.",
+    "We talked through the customer feedback from last week.",
+    "The design review raised a few open questions.",
+]
+
+_FAKE_NAMES = ["John", "Sarah", "Priya", "Alex", "Maria", "Chen"]
+_FAKE_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def _content_rng(content: Union[str, bytes]) -> random.Random:
+    # Output depends only on the input and seed, never on call order
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    digest = hashlib.sha256(content).hexdigest()
+    return random.Random(f"{config.FAKE_SEED}:{digest}")
+
+
+class _FakeBackendBase:
+    def __init__(self, latency_spec: str, error_rate: float):
+        # Latency and failures follow one seeded sequence per backend
+        self._rng = random.Random(config.FAKE_SEED)
+        self._rng_lock = threading.Lock()
+        self.latency = LatencyModel(latency_spec, self._rng)
+        self.error_rate = error_rate
+
+    def _draw(self) -> tuple:
+        with self._rng_lock:
+            return self.latency.sample(), self._rng.random() < self.error_rate
+
+
+class FakeASRBackend(_FakeBackendBase):
+    """
+    Offline stand-in for an ASR provider
+
+    Sleeps for a sampled latency, fails at the configured rate and returns a
+    deterministic transcript whose length grows with the size of the audio.
+    """
+    name = "fake"
+
+    def __init__(self):
+        super().__init__(config.FAKE_ASR_LATENCY, config.FAKE_ASR_ERROR_RATE)
+
+    def transcribe(self, audio: Union[str, bytes]) -> str:
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio = f.read()
+        delay, fail = self._draw()
+        time.sleep(delay)
+        if fail:
+            raise FakeProviderError("Injected ASR failure")
+
+        rng = _content_rng(audio)
+        target_words = max(5, int(len(audio) / (1024 * 1024) * config.FAKE_ASR_WORDS_PER_MB))
+        sentences = []
+        words = 0
+        while words < target_words:
+            roll = rng.random()
+            if roll < 0.1:
+                sentence = f"Decision: {rng.choice(_FAKE_SENTENCES).rstrip('.').lower()}."
+            elif roll < 0.2:
+                sentence = (f"Action: {rng.choice(_FAKE_NAMES)} to follow up on the "
+                            f"{rng.choice(['budget', 'timeline', 'release', 'design'])} "
+                            f"by {rng.choice(_FAKE_DAYS)}.")
+            else:
+                sentence = rng.choice(_FAKE_SENTENCES)
+            sentences.append(sentence)
+            words += len(sentence.split())
+        return " ".join(sentences)
+
+    async def warmup(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FakeMinutesBackend(_FakeBackendBase):
+    """
+    Offline stand-in for the minutes LLM
+
+    Sleeps for a sampled latency, fails at the configured rate and returns
+    deterministic minutes with the configured number of decisions and
+    action items, or a deterministic summary for plain-text agents.
+    """
+    name = "fake"
+
+    def __init__(self):
+        super().__init__(config.FAKE_MINUTES_LATENCY, config.FAKE_MINUTES_ERROR_RATE)
+
+    def prepare(self, agent_name: str, instructions: str, output_type=None) -> None:
+        pass
+
+    async def run(self, agent_name: str, instructions: str, prompt: str, output_type=None) -> Any:
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        if fail:
+            raise FakeProviderError("Injected minutes failure")
+
+        rng = _content_rng(prompt)
+        summary = " ".join(rng.choice(_FAKE_SENTENCES) for _ in range(config.FAKE_MINUTES_SUMMARY_SENTENCES))
+        if output_type is None:
+            return summary
+
+        return output_type.model_validate({
+            "summary": summary,
+            "decisions": [
+                f"Decision {i + 1}: {rng.choice(_FAKE_SENTENCES)}"
+                for i in range(config.FAKE_MINUTES_DECISIONS)
+            ],
+            "action_items": [
+                {
+                    "task": f"Follow up on item {i + 1}",
+                    "owner": rng.choice(_FAKE_NAMES),
+                    "due": rng.choice(_FAKE_DAYS)
+                }
+                for i in range(config.FAKE_MINUTES_ACTION_ITEMS)
+            ]
+        })
+
+    async def warmup(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+ASR_BACKENDS = {
+    "huggingface": HuggingFaceASRBackend,
+    "fake": FakeASRBackend,
+}
+
+MINUTES_BACKENDS = {
+    "openai": OpenAIAgentsMinutesBackend,
+    "fake": FakeMinutesBackend,
+}
+
+
+def create_asr_backend(name: Optional[str] = None) -> ASRBackend:
+    """Build the ASR backend selected by name, defaulting to config.ASR_BACKEND"""
+    name = name or config.ASR_BACKEND
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name}. Available: {list(ASR_BACKENDS)}")
+    return ASR_BACKENDS[name]()
+
+
+def create_minutes_backend(name: Optional[str] = None) -> MinutesBackend:
+    """Build the minutes backend selected by name, defaulting to config.MINUTES_BACKEND"""
+    name = name or config.MINUTES_BACKEND
+    if name not in MINUTES_BACKENDS:
+        raise ValueError(f"Unknown minutes backend: {name}. Available: {list(MINUTES_BACKENDS)}")
+    return MINUTES_BACKENDS[name]()
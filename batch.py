@@ -0,0 +1,148 @@
+import asyncio
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from config import config
+from pipeline import transcribe_with_cache, generate_minutes_with_cache
+from uploads import ArchiveTooLargeError, SavedUpload, save_upload, is_zip_upload, extract_audio_files
+
+
+@dataclass
+class BatchItem:
+    """One recording in a batch: an uploaded file, an extracted archive member or an error"""
+    filename: str
+    upload: Optional[UploadFile] = None
+    saved: Optional[SavedUpload] = None
+    error: Optional[str] = None
+
+
+async def collect_batch_items(files: List[UploadFile]) -> List[BatchItem]:
+    """
+    Expand uploaded files into batch items, unpacking zip archives in place
+
+    Args:
+        files (List[UploadFile]): The uploaded audio files and zip archives
+
+    Returns:
+        List[BatchItem]: One item per audio file, in upload order
+    """
+    items: List[BatchItem] = []
+    try:
+        for file in files:
+            if not is_zip_upload(file):
+                items.append(BatchItem(file.filename, upload=file))
+                continue
+
+            archive = await save_upload(file, max_size=config.BATCH_MAX_TOTAL_SIZE)
+            extracted = sum(item.saved.size for item in items if item.saved is not None)
+            try:
+                members = await run_in_threadpool(
+                    extract_audio_files, archive.path,
+                    max_files=config.BATCH_MAX_FILES - len(items),
+                    max_total_size=config.BATCH_MAX_TOTAL_SIZE - extracted
+                )
+            except zipfile.BadZipFile:
+                items.append(BatchItem(file.filename, error="Invalid zip archive"))
+                continue
+            except ArchiveTooLargeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Batch too large. Maximum: {config.BATCH_MAX_FILES} files and "
+                        f"{config.BATCH_MAX_TOTAL_SIZE / (1024*1024):.1f}MB of extracted audio"
+                    )
+                )
+            finally:
+                os.unlink(archive.path)
+
+            for name, member in members:
+                if isinstance(member, SavedUpload):
+                    items.append(BatchItem(f"{file.filename}/{name}", saved=member))
+                else:
+                    items.append(BatchItem(f"{file.filename}/{name}", error=member))
+    except BaseException:
+        # Don't leak files extracted before the failure
+        for item in items:
+            if item.saved is not None:
+                os.unlink(item.saved.path)
+        raise
+
+    if len(items) > config.BATCH_MAX_FILES:
+        for item in items:
+            if item.saved is not None:
+                os.unlink(item.saved.path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files in batch. Maximum: {config.BATCH_MAX_FILES}"
+        )
+    return items
+
+
+async def process_batch(items: List[BatchItem], generate_minutes: bool) -> List[dict]:
+    """
+    Transcribe and summarise batch items concurrently
+
+    At most BATCH_CONCURRENCY items are processed at once. Every item gets
+    its own result, so a bad file only fails its own entry.
+
+    Args:
+        items (List[BatchItem]): The items to process
+        generate_minutes (bool): Whether to generate meeting minutes for each item
+
+    Returns:
+        List[dict]: One result per item, in the same order
+    """
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+
+    async def process(index: int, item: BatchItem) -> dict:
+        result = {
+            "index": index,
+            "filename": item.filename,
+            "success": False,
+            "transcript": None,
+            "meeting_minutes": None,
+            "transcript_cached": False,
+            "minutes_cached": False,
+            "silence_removed_seconds": 0.0,
+            "offset_map": [],
+            "error": item.error
+        }
+        if item.error:
+            return result
+
+        saved = item.saved
+        try:
+            async with semaphore:
+                if saved is None:
+                    # Validate file type
+                    if item.upload.content_type not in config.ALLOWED_AUDIO_TYPES:
+                        raise ValueError(f"File type {item.upload.content_type} not supported")
+                    saved = await save_upload(item.upload)
+
+                transcription, result["transcript_cached"] = await transcribe_with_cache(saved.path, saved.sha256)
+                if not transcription or not transcription.text:
+                    raise RuntimeError("Transcription failed")
+                transcript = transcription.text
+                result["transcript"] = transcript
+                result["silence_removed_seconds"] = transcription.silence_removed_seconds
+                result["offset_map"] = transcription.offset_map
+
+                if generate_minutes:
+                    result["meeting_minutes"], result["minutes_cached"] = await generate_minutes_with_cache(transcript)
+            result["success"] = True
+        except HTTPException as e:
+            result["error"] = e.detail
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            # Clean up temporary file
+            if saved is not None:
+                os.unlink(saved.path)
+        return result
+
+    return await asyncio.gather(*(process(i, item) for i, item in enumerate(items)))
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load-test script for the Meeting Minutes Agent API
+
+Drives the API with a configurable mix of /transcribe, /transcribe-only and
+/generate-minutes requests, either in-process (the app is imported and
+served through an ASGI transport with the fake backends) or over HTTP
+against a running server, and prints the results as JSON.
+
+Examples:
+    python benchmark.py --requests 200 --concurrency 20
+    python benchmark.py --mix generate-minutes=3,transcribe=1 --output run.json
+    python benchmark.py --mode http --base-url http://localhost:8000
+    python benchmark.py --baseline previous.json  # exit 1 on regressions
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+ENDPOINTS = ("transcribe", "transcribe-only", "generate-minutes")
+
+SAMPLE_TRANSCRIPT = """
+Meeting started at 10:00 AM.
+John discussed the new project timeline and mentioned we need to start next week.
+Sarah raised budget concerns and suggested we review the current allocation.
+Decision: Project will start next week as planned.
+Decision: Budget review meeting scheduled for Friday.
+Action: John to prepare detailed project plan by Friday.
+Action: Sarah to review and update budget spreadsheet by Monday.
+Meeting ended at 11:00 AM.
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Meeting Minutes Agent API")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess",
+                        help="Serve the app in-process with fake backends, or hit a running server")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Server URL in http mode")
+    parser.add_argument("--requests", type=int, default=100, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--mix", default="transcribe=1,transcribe-only=1,generate-minutes=1",
+                        help="Relative weights per endpoint, e.g. transcribe=1,generate-minutes=3")
+    parser.add_argument("--audio-seconds", type=float, default=30, help="Length of generated test audio")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="Send identical inputs so result caches are exercised")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix and inputs")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against an earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative p95 latency / throughput regression against the baseline")
+    return parser.parse_args()
+
+
+def parse_mix(mix: str) -> dict:
+    """Parse 'endpoint=weight,...' into a dict of weights"""
+    weights = {}
+    for part in mix.split(","):
+        endpoint, _, weight = part.partition("=")
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in mix: {endpoint}. Choose from {ENDPOINTS}")
+        weights[endpoint] = float(weight or 1)
+    return weights
+
+
+def make_wav(seconds: float, rng: random.Random) -> bytes:
+    """Generate a 16 kHz mono WAV of low-level noise"""
+    frames = int(seconds * 16000)
+    samples = struct.pack(f"<{frames}h", *(rng.randint(-500, 500) for _ in range(frames)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(samples)
+    return buffer.getvalue()
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(latencies: list) -> dict:
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies, default=0.0)
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def monitor_event_loop(samples: list, stop: asyncio.Event, interval: float = 0.01):
+    """Record how late the event loop wakes up from short sleeps"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+def unique_audio(audio: bytes, index: int) -> bytes:
+    """Stamp the request index into the first samples so each upload hashes differently"""
+    stamped = bytearray(audio)
+    stamped[44:52] = struct.pack("<q", index)
+    return bytes(stamped)
+
+
+async def send_request(client, endpoint: str, index: int, args, audio: bytes):
+    if endpoint == "generate-minutes":
+        transcript = SAMPLE_TRANSCRIPT if args.repeat_inputs else f"{SAMPLE_TRANSCRIPT}\nRequest {index}."
+        return await client.post("/generate-minutes", json={"transcript": transcript})
+
+    if not args.repeat_inputs:
+        audio = unique_audio(audio, index)
+    files = {"file": (f"bench-{index}.wav", audio, "audio/wav")}
+    return await client.post(f"/{endpoint}", files=files)
+
+
+async def run_load(client, args) -> dict:
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(weights), weights=list(weights.values()), k=args.requests)
+    shared_audio = make_wav(args.audio_seconds, rng)
+
+    latencies = {endpoint: [] for endpoint in weights}
+    errors = {endpoint: 0 for endpoint in weights}
+    status_codes = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(plan):
+        queue.put_nowait(item)
+
+    async def worker():
+        while not queue.empty():
+            index, endpoint = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await send_request(client, endpoint, index, args, shared_audio)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+            if status == 200:
+                latencies[endpoint].append(elapsed)
+            else:
+                errors[endpoint] += 1
+
+    lag_samples: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_event_loop(lag_samples, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall_time = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "wall_time_seconds": wall_time,
+        "requests_per_second": args.requests / wall_time if wall_time else 0.0,
+        "successful_requests": len(all_latencies),
+        "failed_requests": sum(errors.values()),
+        "status_codes": status_codes,
+        "latency_seconds": {
+            "overall": summarize(all_latencies),
+            **{endpoint: {**summarize(values), "errors": errors[endpoint]}
+               for endpoint, values in latencies.items()}
+        },
+        "event_loop_lag_seconds": {
+            "p50": percentile(lag_samples, 0.50),
+            "p99": percentile(lag_samples, 0.99),
+            "max": max(lag_samples, default=0.0)
+        }
+    }
+
+
+async def run_inprocess(args) -> dict:
+    # Offline fakes and throwaway state unless the caller configured otherwise
+    state_dir = tempfile.mkdtemp(prefix="mma-bench-")
+    os.environ.setdefault("ASR_BACKEND", "fake")
+    os.environ.setdefault("MINUTES_BACKEND", "fake")
+    os.environ.setdefault("PROVIDER_WARMUP", "False")
+    # Every simulated user shares one client address
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+    os.environ.setdefault("CACHE_DIR", os.path.join(state_dir, "cache"))
+    os.environ.setdefault("DATA_DIR", os.path.join(state_dir, "data"))
+
+    import httpx
+    import main
+
+    rss_before = peak_rss_mb()
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            results = await run_load(client, args)
+    results["peak_rss_mb"] = peak_rss_mb()
+    results["peak_rss_growth_mb"] = results["peak_rss_mb"] - rss_before
+    results["backends"] = {"asr": main.config.ASR_BACKEND, "minutes": main.config.MINUTES_BACKEND}
+    return results
+
+
+async def run_http(args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=None, limits=limits) as client:
+        results = await run_load(client, args)
+    # Only the client's own memory is visible over HTTP
+    results["client_peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions of results against a baseline"""
+    regressions = []
+    for endpoint, stats in results["latency_seconds"].items():
+        before = baseline.get("latency_seconds", {}).get(endpoint, {}).get("p95")
+        if before and stats["p95"] > before * (1 + tolerance):
+            regressions.append(f"{endpoint} p95 {before:.3f}s -> {stats['p95']:.3f}s")
+    before_rps = baseline.get("requests_per_second")
+    if before_rps and results["requests_per_second"] < before_rps * (1 - tolerance):
+        regressions.append(f"throughput {before_rps:.1f} -> {results['requests_per_second']:.1f} req/s")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    runner = run_inprocess if args.mode == "inprocess" else run_http
+    # Keep the app's own console output out of the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        results = asyncio.run(runner(args))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "settings": {
+            "mode": args.mode,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": parse_mix(args.mix),
+            "audio_seconds": args.audio_seconds,
+            "repeat_inputs": args.repeat_inputs,
+            "seed": args.seed
+        },
+        **results
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
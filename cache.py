@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import config
+from metrics import metrics
+
+# Other server processes write to the same directory, so the disk size is
+# recounted this often rather than only tracked from this process's writes
+_DISK_RESCAN_SECONDS = 60
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serialisable results
+
+    Lookups hit a small in-memory LRU first and fall back to one JSON file
+    per entry on disk. The disk tier survives restarts and evicts its least
+    recently used files once it grows past ``max_disk_bytes``. Entries older
+    than ``ttl`` seconds are treated as misses when a ttl is given. Server
+    processes share the disk tier, so one process's result is a hit in all.
+    """
+
+    def __init__(self, directory: str, max_memory_entries: int, max_disk_bytes: int,
+                 ttl: Optional[float] = None):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._scan())
+        self._scanned_at = time.time()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry["created_at"]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry["value"]
+            self._memory.pop(key, None)
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if self._expired(entry["created_at"]):
+                    self._disk_bytes -= os.path.getsize(path)
+                    os.unlink(path)
+                    self.misses += 1
+                    return None
+                # Refresh the modification time so disk eviction is least recently used
+                os.utime(path)
+            except (OSError, ValueError, KeyError, TypeError):
+                self.misses += 1
+                return None
+
+            self._remember(key, entry)
+            self.hits += 1
+            return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers"""
+        entry = {"created_at": time.time(), "value": value}
+        data = json.dumps(entry).encode("utf-8")
+        path = self._path(key)
+        with self._lock:
+            self._remember(key, entry)
+            try:
+                previous_size = os.path.getsize(path)
+            except OSError:
+                previous_size = 0
+
+            # Write to a temporary file first so readers never see a partial entry
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+            self._disk_bytes += len(data) - previous_size
+            if self._disk_bytes > self.max_disk_bytes or time.time() - self._scanned_at > _DISK_RESCAN_SECONDS:
+                self._evict_disk()
+
+    def _scan(self) -> list:
+        # (entry, size, mtime) of every cache file; files removed meanwhile by another process are skipped
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self) -> None:
+        entries = sorted(self._scan(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+            self._memory.pop(entry.name[:-len(".json")], None)
+        self._disk_bytes = total
+        self._scanned_at = time.time()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+# Create cache instances
+transcription_cache = ResultCache(
+    directory=os.path.join(config.CACHE_DIR, "transcriptions"),
+    max_memory_entries=config.TRANSCRIPTION_CACHE_MEMORY_ENTRIES,
+    max_disk_bytes=config.TRANSCRIPTION_CACHE_DISK_BYTES
+)
+
+minutes_cache = ResultCache(
+    directory=os.path.join(config.CACHE_DIR, "minutes"),
+    max_memory_entries=config.MINUTES_CACHE_MEMORY_ENTRIES,
+    max_disk_bytes=config.MINUTES_CACHE_DISK_BYTES,
+    ttl=config.MINUTES_CACHE_TTL
+)
+
+_caches = {"transcription": transcription_cache, "minutes": minutes_cache}
+
+metrics.counter(
+    "mma_cache_hits_total", "Result cache hits", ["cache"],
+    function=lambda: {(name,): cache.hits for name, cache in _caches.items()}
+)
+metrics.counter(
+    "mma_cache_misses_total", "Result cache misses", ["cache"],
+    function=lambda: {(name,): cache.misses for name, cache in _caches.items()}
+)
+metrics.gauge(
+    "mma_cache_hit_ratio", "Fraction of result cache lookups that were hits", ["cache"],
+    function=lambda: {
+        (name,): cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0
+        for name, cache in _caches.items()
+    }
+)
@@ -16,17 +16,145 @@ class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8000))
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", 1))  # server processes; ignored with DEBUG auto-reload
+    SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", 60))  # seconds to finish in-flight work on exit
+    
+    # Logging Configuration
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG also logs transcripts and minutes
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text or json
     
     # API Keys
     HF_TOKEN = os.getenv("HF_TOKEN")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
+    # Backend Selection
+    ASR_BACKEND = os.getenv("ASR_BACKEND", "huggingface")  # huggingface or fake
+    MINUTES_BACKEND = os.getenv("MINUTES_BACKEND", "openai")  # openai or fake
+    
+    # Fake Backend Configuration (offline load testing)
+    FAKE_SEED = int(os.getenv("FAKE_SEED", 0))
+    FAKE_ASR_LATENCY = os.getenv("FAKE_ASR_LATENCY", "lognormal:2.0:0.5")  # fixed:s, uniform:lo:hi, exponential:mean, lognormal:median:sigma
+    FAKE_ASR_ERROR_RATE = float(os.getenv("FAKE_ASR_ERROR_RATE", 0.0))
+    FAKE_ASR_WORDS_PER_MB = int(os.getenv("FAKE_ASR_WORDS_PER_MB", 1500))
+    FAKE_MINUTES_LATENCY = os.getenv("FAKE_MINUTES_LATENCY", "lognormal:3.0:0.5")
+    FAKE_MINUTES_ERROR_RATE = float(os.getenv("FAKE_MINUTES_ERROR_RATE", 0.0))
+    FAKE_MINUTES_SUMMARY_SENTENCES = int(os.getenv("FAKE_MINUTES_SUMMARY_SENTENCES", 3))
+    FAKE_MINUTES_DECISIONS = int(os.getenv("FAKE_MINUTES_DECISIONS", 3))
+    FAKE_MINUTES_ACTION_ITEMS = int(os.getenv("FAKE_MINUTES_ACTION_ITEMS", 3))
+    
     # Transcription Configuration
     TRANSCRIPTION_MODEL = os.getenv("TRANSCRIPTION_MODEL", "openai/whisper-large-v3")
     TRANSCRIPTION_PROVIDER = os.getenv("TRANSCRIPTION_PROVIDER", "fal-ai")
     
+    # Provider Connection Configuration
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 20))
+    PROVIDER_WARMUP = os.getenv("PROVIDER_WARMUP", "True").lower() == "true"
+    PROVIDER_WARMUP_TIMEOUT = float(os.getenv("PROVIDER_WARMUP_TIMEOUT", 5))  # seconds
+    
+    # Provider Resilience Configuration
+    PROVIDER_RETRIES = int(os.getenv("PROVIDER_RETRIES", os.getenv("TRANSCRIPTION_CHUNK_RETRIES", 2)))
+    PROVIDER_RETRY_BASE_DELAY = float(os.getenv("PROVIDER_RETRY_BASE_DELAY", 1.0))  # seconds, doubled per retry
+    PROVIDER_RETRY_MAX_DELAY = float(os.getenv("PROVIDER_RETRY_MAX_DELAY", 20))  # seconds
+    PROVIDER_HEDGING = os.getenv("PROVIDER_HEDGING", "False").lower() == "true"
+    PROVIDER_HEDGE_PERCENTILE = float(os.getenv("PROVIDER_HEDGE_PERCENTILE", 0.95))  # latency that triggers a duplicate
+    PROVIDER_HEDGE_MIN_SAMPLES = int(os.getenv("PROVIDER_HEDGE_MIN_SAMPLES", 20))  # calls seen before hedging starts
+    PROVIDER_HEDGE_WORKERS = int(os.getenv("PROVIDER_HEDGE_WORKERS", 16))  # threads for hedged ASR calls
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))  # consecutive failures
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 30))
+    
+    # Transcription Worker Pool Configuration
+    TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", 4))
+    TRANSCRIPTION_TIMEOUT = float(os.getenv("TRANSCRIPTION_TIMEOUT", 300))  # seconds, including queue wait
+    
+    # Chunked Transcription Configuration
+    TRANSCRIPTION_CHUNKING = os.getenv("TRANSCRIPTION_CHUNKING", "True").lower() == "true"
+    TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", 60))
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", 2))
+    TRANSCRIPTION_CHUNK_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", 4))
+    
+    # Audio Normalization Configuration
+    AUDIO_NORMALIZATION = os.getenv("AUDIO_NORMALIZATION", "True").lower() == "true"  # 16 kHz mono before upload
+    AUDIO_NORMALIZATION_FORMAT = os.getenv("AUDIO_NORMALIZATION_FORMAT", "wav")  # wav, or flac (needs ffmpeg)
+    
+    # Silence Trimming (Voice Activity Detection) Configuration
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "False").lower() == "true"
+    VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", 1.0))  # shorter pauses are kept
+    VAD_PADDING_SECONDS = float(os.getenv("VAD_PADDING_SECONDS", 0.3))  # kept around detected speech
+    VAD_FRAME_SECONDS = float(os.getenv("VAD_FRAME_SECONDS", 0.03))
+    VAD_ENERGY_MARGIN_DB = float(os.getenv("VAD_ENERGY_MARGIN_DB", 12))  # above the recording's noise floor
+    VAD_ZCR_THRESHOLD = float(os.getenv("VAD_ZCR_THRESHOLD", 0.25))  # zero crossings per sample
+    
+    # Meeting Minutes Configuration
+    MINUTES_MODEL = os.getenv("MINUTES_MODEL")  # None uses the Agents SDK default model
+    MINUTES_CHUNK_TOKENS = int(os.getenv("MINUTES_CHUNK_TOKENS", 12000))  # longer transcripts use map-reduce
+    MINUTES_MAP_CONCURRENCY = int(os.getenv("MINUTES_MAP_CONCURRENCY", 4))
+    MINUTES_DEDUPE_THRESHOLD = float(os.getenv("MINUTES_DEDUPE_THRESHOLD", 0.85))  # similarity ratio for duplicates
+    MINUTES_MAX_INPUT_TOKENS = int(os.getenv("MINUTES_MAX_INPUT_TOKENS", 100000))  # 0 for no limit
+    COMPACT_TRANSCRIPTS = os.getenv("COMPACT_TRANSCRIPTS", "True").lower() == "true"
+    COMPACT_STRIP_FILLERS = os.getenv("COMPACT_STRIP_FILLERS", "False").lower() == "true"
+    COMPACT_MAX_NGRAM = int(os.getenv("COMPACT_MAX_NGRAM", 12))  # longest repeated word sequence collapsed
+    MINUTES_MODE = os.getenv("MINUTES_MODE", "llm")  # llm, rules or hybrid
+    RULES_MIN_CONFIDENCE = float(os.getenv("RULES_MIN_CONFIDENCE", 0.8))  # hybrid falls back to the LLM below this
+    
+    # Batch Configuration
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 100))
+    BATCH_MAX_TOTAL_SIZE = int(os.getenv("BATCH_MAX_TOTAL_SIZE", 1024 * 1024 * 1024))  # 1GB default
+    
+    # Streaming Configuration
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    
+    # Cache Configuration
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+    TRANSCRIPTION_CACHE_MEMORY_ENTRIES = int(os.getenv("TRANSCRIPTION_CACHE_MEMORY_ENTRIES", 256))
+    TRANSCRIPTION_CACHE_DISK_BYTES = int(os.getenv("TRANSCRIPTION_CACHE_DISK_BYTES", 512 * 1024 * 1024))  # 512MB default
+    MINUTES_CACHE_MEMORY_ENTRIES = int(os.getenv("MINUTES_CACHE_MEMORY_ENTRIES", 256))
+    MINUTES_CACHE_DISK_BYTES = int(os.getenv("MINUTES_CACHE_DISK_BYTES", 64 * 1024 * 1024))  # 64MB default
+    MINUTES_CACHE_TTL = float(os.getenv("MINUTES_CACHE_TTL", 7 * 24 * 3600))  # one week, in seconds
+    
+    # Background Job Configuration
+    DATA_DIR = os.getenv("DATA_DIR", ".data")
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(DATA_DIR, "jobs.db"))
+    JOB_AUDIO_DIR = os.getenv("JOB_AUDIO_DIR", os.path.join(DATA_DIR, "job_audio"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))  # seconds
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))  # a running job is retried if its process is silent this long
+    
+    # Minutes Archive Configuration
+    ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "True").lower() == "true"
+    ARCHIVE_DB_PATH = os.getenv("ARCHIVE_DB_PATH", os.path.join(DATA_DIR, "archive.db"))
+    ARCHIVE_PAGE_SIZE = int(os.getenv("ARCHIVE_PAGE_SIZE", 50))  # default results per page
+    ARCHIVE_MAX_PAGE_SIZE = int(os.getenv("ARCHIVE_MAX_PAGE_SIZE", 500))
+    
+    # Live Session Configuration
+    SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(DATA_DIR, "sessions.db"))
+    SESSION_UPDATE_TOKENS = int(os.getenv("SESSION_UPDATE_TOKENS", 300))  # new transcript that triggers an update
+    SESSION_TTL = float(os.getenv("SESSION_TTL", 4 * 3600))  # seconds a session may sit idle
+    SESSION_MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", 1000))
+    
+    # Streaming Transcription Configuration
+    STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", 6))  # audio per transcription call
+    STREAM_OVERLAP_SECONDS = float(os.getenv("STREAM_OVERLAP_SECONDS", 1))  # repeated from the previous window
+    STREAM_MAX_PENDING_WINDOWS = int(os.getenv("STREAM_MAX_PENDING_WINDOWS", 4))  # per connection, before reads pause
+    STREAM_MAX_CONNECTIONS = int(os.getenv("STREAM_MAX_CONNECTIONS", 100))
+    STREAM_MAX_CONCURRENT_WINDOWS = int(os.getenv("STREAM_MAX_CONCURRENT_WINDOWS", 8))  # across all streams, server-wide
+    STREAM_SILENCE_DB = float(os.getenv("STREAM_SILENCE_DB", -55))  # quieter windows are not transcribed
+    
+    # Rate Limiting and Admission Control Configuration
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", 30))  # per client (known API key or IP)
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 10))
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", 10000))  # buckets kept in memory
+    RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"
+    # X-API-Key values that get their own bucket; any other key is limited by IP
+    RATE_LIMIT_API_KEYS = {key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()}
+    PIPELINE_MAX_CONCURRENT = int(os.getenv("PIPELINE_MAX_CONCURRENT", 16))  # synchronous pipeline requests, server-wide
+    PIPELINE_MAX_QUEUE = int(os.getenv("PIPELINE_MAX_QUEUE", 32))  # requests waiting for a slot
+    PIPELINE_QUEUE_TIMEOUT = float(os.getenv("PIPELINE_QUEUE_TIMEOUT", 30))  # seconds
+    
     # File Upload Configuration
     MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 50 * 1024 * 1024))  # 50MB default
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1MB read/write chunks
     ALLOWED_AUDIO_TYPES = [
         "audio/wav",
         "audio/mp3", 
@@ -41,12 +169,19 @@ class Config:
         """Validate that required configuration is present"""
         missing_vars = []
         
-        if not cls.HF_TOKEN:
+        # Fake backends run offline and need no keys
+        if cls.ASR_BACKEND == "huggingface" and not cls.HF_TOKEN:
             missing_vars.append("HF_TOKEN")
         
-        if not cls.OPENAI_API_KEY:
+        if cls.MINUTES_BACKEND == "openai" and not cls.OPENAI_API_KEY:
             missing_vars.append("OPENAI_API_KEY")
         
+        if cls.WEB_WORKERS < 1:
+            raise ValueError("WEB_WORKERS must be at least 1")
+        
+        if cls.MINUTES_MODE not in ("llm", "rules", "hybrid"):
+            raise ValueError(f"MINUTES_MODE must be llm, rules or hybrid, not {cls.MINUTES_MODE!r}")
+        
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
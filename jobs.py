@@ -0,0 +1,330 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import config
+from metrics import metrics
+from pipeline import transcribe_with_cache, generate_minutes_with_cache
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT,
+    audio_path TEXT,
+    audio_sha256 TEXT,
+    transcript TEXT,
+    generate_minutes INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    stage_timings TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# Columns added since the first schema, for databases created before them
+_ADDED_COLUMNS = {"owner": "TEXT", "lease_until": "REAL"}
+
+
+class JobStore:
+    """
+    SQLite-backed job state
+
+    Every method opens its own short-lived connection, so the store can be
+    used from worker threads and survives process restarts. Server processes
+    sharing the database claim jobs under a lease: a running job whose owner
+    stops renewing it is claimed again by another process.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["generate_minutes"] = bool(job["generate_minutes"])
+        job["stage_timings"] = json.loads(job["stage_timings"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, audio_path: Optional[str], audio_sha256: Optional[str],
+               transcript: Optional[str], generate_minutes: bool) -> dict:
+        """Insert a new queued job and return it"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, audio_path, audio_sha256, transcript, generate_minutes, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, audio_path, audio_sha256, transcript, int(generate_minutes), time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job by id, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self, owner: str, lease: float) -> Optional[dict]:
+        """
+        Atomically mark the oldest claimable job as running and return it
+
+        Queued jobs are claimable, and so are running jobs whose lease has
+        run out because the process running them died.
+
+        Args:
+            owner (str): Identifies the claiming process
+            lease (float): Seconds the claim holds without being renewed
+
+        Returns:
+            dict: The claimed job, or None if there is nothing to run
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, stage = NULL, started_at = ?, owner = ?, lease_until = ? "
+                "WHERE id = ("
+                "SELECT id FROM jobs WHERE status = ? "
+                "OR (status = ? AND coalesce(lease_until, 0) < ?) "
+                "ORDER BY created_at LIMIT 1"
+                ") RETURNING *",
+                (RUNNING, now, owner, now + lease, QUEUED, RUNNING, now)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def renew_leases(self, owner: str, lease: float) -> None:
+        """Extend the lease on every job a process is running"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE status = ? AND owner = ?",
+                (time.time() + lease, RUNNING, owner)
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        """Update columns of a job; dict and list values are stored as JSON"""
+        for name in ("result", "stage_timings"):
+            if name in fields and fields[name] is not None:
+                fields[name] = json.dumps(fields[name])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def requeue_running(self, owner: str) -> int:
+        """Put a process's interrupted jobs back on the queue for any process to run"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, stage = NULL, started_at = NULL, owner = NULL, lease_until = NULL "
+                "WHERE status = ? AND owner = ?",
+                (QUEUED, RUNNING, owner)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        """Return the number of jobs in each status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class JobQueue:
+    """
+    Worker pool that runs queued jobs through the transcription and minutes stages
+
+    Submitting a job only writes it to the store, so ingestion is decoupled
+    from processing: workers pull jobs in creation order as they free up.
+    Every server process runs its own workers against the shared store.
+    """
+
+    def __init__(self, store: JobStore, workers: int, poll_interval: float, lease: float):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def submit(self, audio_path: Optional[str] = None, audio_sha256: Optional[str] = None,
+                     transcript: Optional[str] = None, generate_minutes: bool = True) -> dict:
+        """Queue a job for an audio file or a transcript and return it"""
+        job = await run_in_threadpool(
+            self.store.create, audio_path, audio_sha256, transcript, generate_minutes
+        )
+        self._wakeup.set()
+        return job
+
+    async def start(self) -> None:
+        """Start the workers; jobs interrupted by a dead process are picked up once their lease runs out"""
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._heartbeat = asyncio.create_task(self._renew_leases())
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop taking jobs and wait for running ones to finish
+
+        Jobs still running after the timeout are cancelled and put back on
+        the queue, so another process can take them over straight away.
+
+        Args:
+            timeout (float): Seconds to wait for running jobs
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks:
+            _, unfinished = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+        requeued = await run_in_threadpool(self.store.requeue_running, self.owner)
+        if requeued:
+            logger.info("Requeued interrupted jobs", extra={"jobs": requeued})
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await run_in_threadpool(self.store.renew_leases, self.owner, self.lease)
+            except Exception as e:
+                logger.error("Error renewing job leases: %s", e)
+
+    async def _worker(self) -> None:
+        while not self._stopping:
+            job = await run_in_threadpool(self.store.claim_next, self.owner, self.lease)
+            if job is None:
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # E.g. the job store failed while recording the outcome; keep serving the queue
+                logger.error("Error running job: %s", e, extra={"job_id": job["id"]})
+
+    async def _run(self, job: dict) -> None:
+        job_id = job["id"]
+        stage_timings = {"queued": job["started_at"] - job["created_at"]}
+        transcript = job["transcript"]
+        transcript_cached = False
+        silence_removed_seconds = 0.0
+        offset_map = []
+
+        try:
+            if transcript is None:
+                await run_in_threadpool(self.store.update, job_id, stage="transcription")
+                stage_start = time.perf_counter()
+                transcription, transcript_cached = await transcribe_with_cache(
+                    job["audio_path"], job["audio_sha256"]
+                )
+                stage_timings["transcription"] = time.perf_counter() - stage_start
+                if not transcription or not transcription.text:
+                    raise RuntimeError("Transcription failed")
+                transcript = transcription.text
+                silence_removed_seconds = transcription.silence_removed_seconds
+                offset_map = transcription.offset_map
+
+            meeting_minutes = {}
+            minutes_cached = False
+            if job["generate_minutes"]:
+                await run_in_threadpool(
+                    self.store.update, job_id, stage="minutes", stage_timings=stage_timings
+                )
+                stage_start = time.perf_counter()
+                meeting_minutes, minutes_cached = await generate_minutes_with_cache(transcript)
+                stage_timings["minutes"] = time.perf_counter() - stage_start
+
+            result = {
+                "transcript": transcript,
+                "meeting_minutes": meeting_minutes,
+                "success": True,
+                "message": "Job completed successfully",
+                "transcript_cached": transcript_cached,
+                "minutes_cached": minutes_cached,
+                "silence_removed_seconds": silence_removed_seconds,
+                "offset_map": offset_map
+            }
+            await run_in_threadpool(
+                self.store.update, job_id, status=COMPLETED, stage=None, result=result,
+                stage_timings=stage_timings, finished_at=time.time()
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Job failed: %s", e, extra={"job_id": job_id})
+            await run_in_threadpool(
+                self.store.update, job_id, status=FAILED, error=str(e),
+                stage_timings=stage_timings, finished_at=time.time()
+            )
+
+        # Finished jobs no longer need their audio
+        if job["audio_path"]:
+            try:
+                os.unlink(job["audio_path"])
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Return worker count and job counts by status"""
+        return {"workers": self.workers, **self.store.counts()}
+
+
+# Create job queue instance
+job_queue = JobQueue(
+    store=JobStore(config.JOB_DB_PATH),
+    workers=config.JOB_WORKERS,
+    poll_interval=config.JOB_POLL_INTERVAL,
+    lease=config.JOB_LEASE_SECONDS
+)
+
+metrics.gauge(
+    "mma_jobs", "Background jobs by status", ["status"],
+    function=lambda: {(status,): job_queue.store.counts().get(status, 0)
+                      for status in (QUEUED, RUNNING, COMPLETED, FAILED)}
+)
@@ -1,36 +1,118 @@
+# Imported first, to time the imports below
+from startup import startup_report
+startup_report.track_imports()
+
+import asyncio
+import json
+import logging
 import os
-import tempfile
-from typing import Optional
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import JSONResponse
+from datetime import date, datetime
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from dotenv import load_dotenv
 import uvicorn
 
-from transcription import transcribe_audio
-from agent import generate_meeting_minutes
 from config import config
+from logs import configure_logging
+from metrics import metrics, MetricsMiddleware
+from ratelimit import RateLimitMiddleware, rate_limiter, admission, stream_admission
+from cache import transcription_cache, minutes_cache
+from pipeline import transcribe_with_cache, generate_minutes_with_cache
+from jobs import job_queue
+from archive import minutes_archive, json_page, prefetch
+from sessions import session_manager, SessionLimitError
+from streaming import stream_transcription, StreamRejectedError
+from batch import collect_batch_items, process_batch
+from providers import providers
+from agent import prepare_agents, TokenBudgetExceededError
+from uploads import save_upload, UploadSizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
+from workers import transcription_executor, TranscriptionTimeoutError
+
+startup_report.stop_tracking_imports()
 
-# Load environment variables
-load_dotenv()
+configure_logging(config.LOG_LEVEL, config.LOG_FORMAT)
+logger = logging.getLogger(__name__)
 
 # Validate configuration
 try:
     config.validate_config()
 except ValueError as e:
-    print(f"Configuration error: {e}")
-    print("Please check your .env file and ensure all required variables are set.")
+    logger.error("Configuration error: %s", e)
+    logger.error("Please check your .env file and ensure all required variables are set.")
     exit(1)
 
+async def warm_up_providers():
+    """Build provider clients and agents, and pre-warm their connections"""
+    try:
+        await providers.start()
+        prepare_agents()
+        startup_report.log("providers_ready")
+    except Exception as e:
+        # Requests build whatever is missing on first use instead
+        logger.error("Provider warmup failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Provider SDKs take seconds to load, so the server starts serving without them
+    warmup = asyncio.create_task(warm_up_providers())
+    os.makedirs(config.JOB_AUDIO_DIR, exist_ok=True)
+    await job_queue.start()
+    startup_report.log("ready")
+    yield
+    warmup.cancel()
+    await asyncio.gather(warmup, return_exceptions=True)
+    # By now the server has stopped accepting connections and waited for
+    # in-flight requests; background jobs and session updates get as long
+    await asyncio.gather(
+        job_queue.stop(config.SHUTDOWN_DRAIN_TIMEOUT),
+        session_manager.shutdown(config.SHUTDOWN_DRAIN_TIMEOUT)
+    )
+    # Release transcription workers on shutdown
+    transcription_executor.shutdown()
+    await providers.close()
+
 app = FastAPI(
     title=config.API_TITLE,
     description=config.API_DESCRIPTION,
     version=config.API_VERSION,
-    debug=config.DEBUG
+    debug=config.DEBUG,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Abort oversized uploads while they are still streaming in
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=config.MAX_FILE_SIZE + MULTIPART_OVERHEAD_BYTES,
+    path_limits={"/transcribe-batch": config.BATCH_MAX_TOTAL_SIZE + MULTIPART_OVERHEAD_BYTES}
+)
+
+# Refuse requests over the client's rate before reading their bodies, or over the
+# pipeline's capacity once their bodies have arrived
+if config.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        admission=admission,
+        limited_paths=[
+            "/transcribe", "/transcribe-only", "/transcribe-stream",
+            "/transcribe-batch", "/generate-minutes", "/jobs"
+        ],
+        # Queued jobs are bounded by the job workers instead
+        pipeline_paths=[
+            "/transcribe", "/transcribe-only", "/transcribe-stream",
+            "/transcribe-batch", "/generate-minutes"
+        ]
+    )
+
+# Request timings cover every middleware inside this one
+app.add_middleware(MetricsMiddleware)
+
+# Add CORS middleware last, so it is outermost and 413/429 responses from the
+# middlewares above also carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure this properly for production
@@ -41,12 +123,21 @@ app.add_middleware(
 
 class TranscriptRequest(BaseModel):
     transcript: str
+    mode: Optional[Literal["llm", "rules", "hybrid"]] = None  # defaults to MINUTES_MODE
+
+class SegmentRequest(BaseModel):
+    text: str
 
 class MeetingMinutesResponse(BaseModel):
     transcript: str
     meeting_minutes: dict
     success: bool
     message: str
+    transcript_cached: bool = False
+    minutes_cached: bool = False
+    silence_removed_seconds: float = 0.0
+    # [trimmed_start, original_start, duration] segments, when silence was removed
+    offset_map: List[List[float]] = []
 
 @app.get("/")
 async def root():
@@ -56,8 +147,18 @@ async def root():
         "endpoints": {
             "transcribe": "/transcribe - Upload audio and generate minutes",
             "transcribe_only": "/transcribe-only - Upload audio for transcription only",
+            "transcribe_stream": "/transcribe-stream - Upload audio and stream progress as Server-Sent Events",
+            "transcribe_batch": "/transcribe-batch - Upload many audio files or a zip archive",
             "generate_minutes": "/generate-minutes - Generate minutes from transcript text",
-            "health": "/health - Health check"
+            "jobs": "/jobs - Queue audio or a transcript for background processing",
+            "job_status": "/jobs/{job_id} - Job status, stage timings and result",
+            "search": "/search?q= - Full-text search over archived meetings",
+            "action_items": "/action-items?owner=&due_before= - Query archived action items",
+            "meeting": "/meetings/{meeting_id} - An archived transcript and its minutes",
+            "sessions": "/sessions - Live meetings whose minutes update as transcript segments arrive",
+            "stream": "/ws/transcribe - WebSocket: stream PCM or Opus audio, receive transcript as it is recognized",
+            "health": "/health - Health check",
+            "metrics": "/metrics - Prometheus metrics"
         }
     }
 
@@ -70,9 +171,29 @@ async def health_check():
             "transcription_model": config.TRANSCRIPTION_MODEL,
             "transcription_provider": config.TRANSCRIPTION_PROVIDER,
             "max_file_size": f"{config.MAX_FILE_SIZE / (1024*1024):.1f}MB"
-        }
+        },
+        "transcription_queue": transcription_executor.stats(),
+        "pipeline_admission": admission.stats(),
+        "stream_admission": stream_admission.stats(),
+        "transcription_cache": transcription_cache.stats(),
+        "minutes_cache": minutes_cache.stats(),
+        "jobs": await run_in_threadpool(job_queue.stats),
+        "live_sessions": await run_in_threadpool(session_manager.count),
+        "providers_ready": providers.ready(),
+        "startup": startup_report.to_dict(),
+        # Each server process has its own pools, queues and counters
+        "worker_pid": os.getpid()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Expose stage latencies, queue depths, cache hit ratios and provider errors in the Prometheus text format
+    """
+    # Some gauges read the job database, so render off the event loop
+    body = await run_in_threadpool(metrics.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 @app.post("/transcribe", response_model=MeetingMinutesResponse)
 async def transcribe_and_generate_minutes(
     file: UploadFile = File(...),
@@ -96,30 +217,29 @@ async def transcribe_and_generate_minutes(
                 detail=f"File too large. Maximum size: {config.MAX_FILE_SIZE / (1024*1024):.1f}MB"
             )
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream the upload to a temporary file, hashing and size-checking as it goes
+        upload = await save_upload(file)
+        temp_file_path = upload.path
         
         try:
-            # Transcribe audio
-            transcript = transcribe_audio(temp_file_path)
+            # Transcribe audio, skipping the provider for previously seen recordings
+            transcription, transcript_cached = await transcribe_with_cache(temp_file_path, upload.sha256)
+            transcript = transcription.text if transcription else None
             
-            print(f"Transcription result type: {type(transcript)}")
-            print(f"Transcription result: {transcript}")
+            logger.debug("Transcription result: %s", transcript)
 
             if not transcript:
                 raise HTTPException(status_code=500, detail="Transcription failed")
             
             # Generate meeting minutes if requested
             meeting_minutes = None
+            minutes_cached = False
             if generate_minutes:
                 try:
-                    meeting_minutes = await generate_meeting_minutes(transcript)
-                    print(f"Generated meeting minutes: {meeting_minutes}")
+                    meeting_minutes, minutes_cached = await generate_minutes_with_cache(transcript)
+                    logger.debug("Generated meeting minutes: %s", meeting_minutes)
                 except Exception as e:
-                    print(f"Error generating meeting minutes: {e}")
+                    logger.error("Error generating meeting minutes: %s", e)
                     # Continue with just transcription if meeting minutes generation fails
                     meeting_minutes = {
                         "summary": "Error generating meeting minutes",
@@ -131,7 +251,11 @@ async def transcribe_and_generate_minutes(
                 transcript=transcript,
                 meeting_minutes=meeting_minutes or {},
                 success=True,
-                message="Audio transcribed successfully"
+                message="Audio transcribed successfully",
+                transcript_cached=transcript_cached,
+                minutes_cached=minutes_cached,
+                silence_removed_seconds=transcription.silence_removed_seconds,
+                offset_map=transcription.offset_map
             )
             
         finally:
@@ -140,6 +264,8 @@ async def transcribe_and_generate_minutes(
             
     except HTTPException:
         raise
+    except TranscriptionTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
 
@@ -152,17 +278,20 @@ async def generate_minutes_from_transcript(request: TranscriptRequest):
         if not request.transcript.strip():
             raise HTTPException(status_code=400, detail="Transcript cannot be empty")
         
-        meeting_minutes = await generate_meeting_minutes(request.transcript)
+        meeting_minutes, minutes_cached = await generate_minutes_with_cache(request.transcript, request.mode)
         
         return MeetingMinutesResponse(
             transcript=request.transcript,
             meeting_minutes=meeting_minutes,
             success=True,
-            message="Meeting minutes generated successfully"
+            message="Meeting minutes generated successfully",
+            minutes_cached=minutes_cached
         )
         
     except HTTPException:
         raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating meeting minutes: {str(e)}")
 
@@ -186,18 +315,16 @@ async def transcribe_only(file: UploadFile = File(...)):
                 detail=f"File too large. Maximum size: {config.MAX_FILE_SIZE / (1024*1024):.1f}MB"
             )
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream the upload to a temporary file, hashing and size-checking as it goes
+        upload = await save_upload(file)
+        temp_file_path = upload.path
         
         try:
-            # Transcribe audio
-            transcript = transcribe_audio(temp_file_path)
+            # Transcribe audio, skipping the provider for previously seen recordings
+            transcription, transcript_cached = await transcribe_with_cache(temp_file_path, upload.sha256)
+            transcript = transcription.text if transcription else None
             
-            print(f"Transcription result type: {type(transcript)}")
-            print(f"Transcription result: {transcript}")
+            logger.debug("Transcription result: %s", transcript)
             
             if not transcript:
                 raise HTTPException(status_code=500, detail="Transcription failed")
@@ -205,7 +332,10 @@ async def transcribe_only(file: UploadFile = File(...)):
             return {
                 "transcript": transcript,
                 "success": True,
-                "message": "Audio transcribed successfully"
+                "message": "Audio transcribed successfully",
+                "transcript_cached": transcript_cached,
+                "silence_removed_seconds": transcription.silence_removed_seconds,
+                "offset_map": transcription.offset_map
             }
             
         finally:
@@ -214,16 +344,352 @@ async def transcribe_only(file: UploadFile = File(...)):
             
     except HTTPException:
         raise
+    except TranscriptionTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
 
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/transcribe-stream")
+async def transcribe_stream(
+    file: UploadFile = File(...),
+    generate_minutes: bool = Form(True)
+):
+    """
+    Transcribe audio and generate meeting minutes, streaming progress as Server-Sent Events
+
+    Events, in order: upload_received, transcript_chunk (one per piece of
+    transcript as it becomes available), minutes_started, result (a
+    MeetingMinutesResponse) and done. An error event ends the stream early.
+    Comment lines are sent while idle so proxies keep the connection open.
+    """
+    # Validate file type
+    if file.content_type not in config.ALLOWED_AUDIO_TYPES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File type {file.content_type} not supported. Allowed types: {config.ALLOWED_AUDIO_TYPES}"
+        )
+    
+    # The upload must be consumed before the response starts streaming
+    upload = await save_upload(file)
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    
+    def on_chunk(text: str):
+        # Called from transcription threads
+        loop.call_soon_threadsafe(chunks.put_nowait, text)
+    
+    async def events():
+        try:
+            yield format_sse("upload_received", {"filename": file.filename, "size": upload.size})
+            
+            transcription = asyncio.ensure_future(
+                transcribe_with_cache(upload.path, upload.sha256, on_chunk)
+            )
+            try:
+                index = 0
+                while not (transcription.done() and chunks.empty()):
+                    get_chunk = asyncio.ensure_future(chunks.get())
+                    done, _ = await asyncio.wait(
+                        {get_chunk, transcription},
+                        timeout=config.SSE_HEARTBEAT_SECONDS,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if get_chunk in done:
+                        yield format_sse("transcript_chunk", {"index": index, "text": get_chunk.result()})
+                        index += 1
+                    else:
+                        get_chunk.cancel()
+                        if not done:
+                            yield ": keep-alive\n\n"
+                result, transcript_cached = transcription.result()
+            finally:
+                transcription.cancel()
+            
+            transcript = result.text if result else None
+            if not transcript:
+                yield format_sse("error", {"detail": "Transcription failed"})
+                return
+            
+            meeting_minutes = {}
+            minutes_cached = False
+            if generate_minutes:
+                yield format_sse("minutes_started", {})
+                minutes_task = asyncio.ensure_future(generate_minutes_with_cache(transcript))
+                try:
+                    while True:
+                        done, _ = await asyncio.wait({minutes_task}, timeout=config.SSE_HEARTBEAT_SECONDS)
+                        if done:
+                            break
+                        yield ": keep-alive\n\n"
+                    meeting_minutes, minutes_cached = minutes_task.result()
+                finally:
+                    minutes_task.cancel()
+            
+            response = MeetingMinutesResponse(
+                transcript=transcript,
+                meeting_minutes=meeting_minutes,
+                success=True,
+                message="Audio transcribed successfully",
+                transcript_cached=transcript_cached,
+                minutes_cached=minutes_cached,
+                silence_removed_seconds=result.silence_removed_seconds,
+                offset_map=result.offset_map
+            )
+            yield format_sse("result", response.model_dump())
+            yield format_sse("done", {})
+        except TranscriptionTimeoutError as e:
+            yield format_sse("error", {"detail": str(e)})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Error processing audio: {str(e)}"})
+        finally:
+            # Clean up temporary file
+            os.unlink(upload.path)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/transcribe-batch")
+async def transcribe_batch(
+    files: List[UploadFile] = File(...),
+    generate_minutes: bool = Form(True)
+):
+    """
+    Transcribe a batch of audio files, or zip archives of them, and optionally generate minutes
+
+    Results come back in upload order (archive members in archive order),
+    each with its own success flag and error, so one bad file does not fail
+    the batch.
+    """
+    items = await collect_batch_items(files)
+    results = await process_batch(items, generate_minutes)
+    succeeded = sum(1 for result in results if result["success"])
+    
+    return {
+        "results": results,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "success": True,
+        "message": f"Processed {len(results)} file(s)"
+    }
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    file: Optional[UploadFile] = File(None),
+    transcript: Optional[str] = Form(None),
+    generate_minutes: bool = Form(True)
+):
+    """
+    Queue audio or a transcript for background processing and return the job id
+    """
+    if (file is None) == (transcript is None):
+        raise HTTPException(status_code=400, detail="Provide either an audio file or a transcript")
+    
+    if transcript is not None:
+        if not transcript.strip():
+            raise HTTPException(status_code=400, detail="Transcript cannot be empty")
+        job = await job_queue.submit(transcript=transcript, generate_minutes=generate_minutes)
+    else:
+        # Validate file type
+        if file.content_type not in config.ALLOWED_AUDIO_TYPES:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"File type {file.content_type} not supported. Allowed types: {config.ALLOWED_AUDIO_TYPES}"
+            )
+        
+        # Keep the audio in job storage until a worker has processed it
+        upload = await save_upload(file, directory=config.JOB_AUDIO_DIR)
+        try:
+            job = await job_queue.submit(
+                audio_path=upload.path,
+                audio_sha256=upload.sha256,
+                generate_minutes=generate_minutes
+            )
+        except Exception:
+            os.unlink(upload.path)
+            raise
+    
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Report the status, stage timings and, once finished, the result of a job
+    """
+    job = await run_in_threadpool(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "stage_timings": job["stage_timings"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
+@app.get("/search")
+async def search_meetings(
+    q: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(config.ARCHIVE_PAGE_SIZE, ge=1, le=config.ARCHIVE_MAX_PAGE_SIZE),
+    cursor: Optional[int] = None
+):
+    """
+    Search archived summaries, decisions and transcripts for meetings containing every word of q
+
+    Results are newest first. Pass next_cursor back as cursor for the next page.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    
+    rows = await prefetch(minutes_archive.search(q, limit + 1, before_id=cursor, since=since, until=until))
+    return StreamingResponse(json_page(rows, limit, "meeting_id"), media_type="application/json")
+
+@app.get("/action-items")
+async def list_action_items(
+    owner: Optional[str] = None,
+    due_before: Optional[date] = None,
+    limit: int = Query(config.ARCHIVE_PAGE_SIZE, ge=1, le=config.ARCHIVE_MAX_PAGE_SIZE),
+    cursor: Optional[int] = None
+):
+    """
+    List archived action items, newest first, optionally by owner and due date
+
+    due_before keeps items due strictly before that date; due dates like
+    "Friday" are resolved against the day of the meeting.
+    """
+    rows = await prefetch(
+        minutes_archive.action_items(limit + 1, before_id=cursor, owner=owner, due_before=due_before)
+    )
+    return StreamingResponse(json_page(rows, limit, "id"), media_type="application/json")
+
+@app.get("/meetings/{meeting_id}")
+async def get_meeting(meeting_id: int):
+    """
+    Return an archived transcript and its minutes
+    """
+    meeting = await run_in_threadpool(minutes_archive.get, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting
+
+async def _get_session(session_id: str):
+    session = await session_manager.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+@app.post("/sessions", status_code=201)
+async def create_session():
+    """
+    Start a live meeting session
+    """
+    try:
+        session = await session_manager.create()
+    except SessionLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return session.to_dict()
+
+@app.post("/sessions/{session_id}/segments")
+async def append_session_segment(session_id: str, request: SegmentRequest):
+    """
+    Append a transcript segment to a live session
+
+    Returns straight away; once enough new transcript has built up, the
+    minutes are updated in the background from just the new segments.
+    """
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Segment text cannot be empty")
+    
+    session = await session_manager.append(session_id, request.text)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.to_dict()
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str, refresh: bool = False, include_transcript: bool = False):
+    """
+    Return the current minutes of a live session
+
+    With refresh, every segment received so far is folded in first.
+    """
+    if refresh:
+        await session_manager.refresh(session_id)
+    session = await _get_session(session_id)
+    return session.to_dict(include_transcript)
+
+@app.post("/sessions/{session_id}/close")
+async def close_session(session_id: str):
+    """
+    End a live session, returning its final minutes and archiving the meeting
+    """
+    session = await session_manager.close(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.to_dict(include_transcript=True)
+
+@app.websocket("/ws/transcribe")
+async def websocket_transcribe(
+    websocket: WebSocket,
+    format: str = "pcm",
+    sample_rate: int = 16000,
+    channels: int = 1,
+    session_id: Optional[str] = None
+):
+    """
+    Transcribe live audio streamed over a WebSocket
+
+    Send 16-bit little-endian PCM (format=pcm, with its sample_rate and
+    channels) or an Ogg/WebM Opus stream (format=opus) as binary messages,
+    and {"type": "stop"} to finish. Transcript text comes back as it is
+    recognized. With session_id, the text is also added to that live session.
+    """
+    await websocket.accept()
+    try:
+        if format not in ("pcm", "opus"):
+            raise StreamRejectedError("format must be pcm or opus")
+        if not 8000 <= sample_rate <= 48000 or channels not in (1, 2):
+            raise StreamRejectedError("PCM must be 8-48 kHz with 1 or 2 channels")
+        session = None
+        if session_id:
+            session = await session_manager.get(session_id)
+            if session is None:
+                raise StreamRejectedError("Session not found")
+        
+        await stream_transcription(websocket, format, sample_rate, channels, session)
+    except StreamRejectedError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+
 if __name__ == "__main__":
-    print(f"Starting Meeting Minutes Agent API on {config.HOST}:{config.PORT}")
-    print(f"Debug mode: {config.DEBUG}")
+    logger.info("Starting Meeting Minutes Agent API on %s:%s", config.HOST, config.PORT)
+    logger.info("Debug mode: %s", config.DEBUG)
     
+    # Auto-reload only supports a single process
     uvicorn.run(
         "main:app",
         host=config.HOST,
         port=config.PORT,
-        reload=config.DEBUG
+        reload=config.DEBUG,
+        workers=1 if config.DEBUG else config.WEB_WORKERS,
+        timeout_graceful_shutdown=config.SHUTDOWN_DRAIN_TIMEOUT
     )
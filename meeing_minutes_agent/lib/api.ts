@@ -23,19 +23,55 @@ export interface MeetingMinutes {
   summary: string;
   decisions: string[];
   action_items: ActionItem[];
+  metadata?: MinutesMetadata;
 }
 
+// Estimated model input tokens before and after transcript compaction
+export interface MinutesMetadata {
+  input_tokens: number;
+  compacted_tokens: number;
+  tokens_saved: number;
+}
+
+// llm: model only, rules: local extraction only, hybrid: model writes the summary
+export type MinutesMode = 'llm' | 'rules' | 'hybrid';
+
 export interface TranscriptResponse {
   transcript: string;
   meeting_minutes: MeetingMinutes;
   success: boolean;
   message: string;
+  transcript_cached?: boolean;
+  minutes_cached?: boolean;
+  silence_removed_seconds?: number;
 }
 
 export interface TranscribeOnlyResponse {
   transcript: string;
   success: boolean;
   message: string;
+  transcript_cached?: boolean;
+  silence_removed_seconds?: number;
+}
+
+export type JobStatus = 'queued' | 'running' | 'completed' | 'failed';
+
+export interface JobCreatedResponse {
+  job_id: string;
+  status: JobStatus;
+  status_url: string;
+}
+
+export interface JobResponse {
+  job_id: string;
+  status: JobStatus;
+  stage: string | null;
+  created_at: number;
+  started_at: number | null;
+  finished_at: number | null;
+  stage_timings: Record<string, number>;
+  result: TranscriptResponse | null;
+  error: string | null;
 }
 
 // API functions
@@ -68,13 +104,34 @@ export const apiService = {
   },
 
   // Generate meeting minutes from transcript text
-  async generateMinutesFromText(transcript: string): Promise<TranscriptResponse> {
+  async generateMinutesFromText(transcript: string, mode?: MinutesMode): Promise<TranscriptResponse> {
     const response = await api.post<TranscriptResponse>('/generate-minutes', {
       transcript,
+      mode,
     });
     return response.data;
   },
 
+  // Queue audio for background transcription and minutes generation
+  async createJob(file: File, generateMinutes = true): Promise<JobCreatedResponse> {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('generate_minutes', String(generateMinutes));
+
+    const response = await api.post<JobCreatedResponse>('/jobs', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    });
+    return response.data;
+  },
+
+  // Poll a background job
+  async getJob(jobId: string): Promise<JobResponse> {
+    const response = await api.get<JobResponse>(`/jobs/${jobId}`);
+    return response.data;
+  },
+
   // Health check
   async healthCheck() {
     const response = await api.get('/health');
@@ -0,0 +1,290 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from fast cache hits up to long provider calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _add(self, amount: float, labels: dict) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            result = self.function()
+            values = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples()
+        ]
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, optionally split by labels
+
+    A counter built with ``function`` is read at scrape time instead, for
+    counts kept elsewhere: the function returns a number, or for labelled
+    counters a dict mapping label value tuples to numbers.
+    """
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, optionally split by labels
+
+    Like counters, gauges can be read from a ``function`` at scrape time.
+    """
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self._add(-amount, labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: [bucket counts..., sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * len(self.buckets) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        lines = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of metrics, rendered in the Prometheus text format
+
+    Metrics are created through the registry so each name is registered
+    once; asking for an existing name returns the existing metric.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                function: Optional[Callable] = None) -> Counter:
+        return self._register(Counter, name, documentation, labelnames, function)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              function: Optional[Callable] = None) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, function)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Create registry instance
+metrics = MetricsRegistry()
+
+# Pipeline metrics shared by the modules that do the work
+stage_duration = metrics.histogram(
+    "mma_stage_duration_seconds",
+    "Time spent in each processing stage (upload, temp_write, transcription_queue, normalize, vad, asr, minutes, session_update)",
+    ["stage"]
+)
+bytes_processed = metrics.counter(
+    "mma_bytes_processed_total",
+    "Bytes of audio handled by each stage (upload, asr)",
+    ["stage"]
+)
+provider_calls_in_flight = metrics.gauge(
+    "mma_provider_calls_in_flight",
+    "Provider calls currently running",
+    ["kind", "provider"]
+)
+provider_errors = metrics.counter(
+    "mma_provider_errors_total",
+    "Failed provider calls by kind, provider and exception type",
+    ["kind", "provider", "error"]
+)
+http_requests_in_flight = metrics.gauge(
+    "mma_http_requests_in_flight",
+    "HTTP requests currently being served"
+)
+http_request_duration = metrics.histogram(
+    "mma_http_request_duration_seconds",
+    "HTTP request latency by method, route and status code",
+    ["method", "route", "status"]
+)
+
+
+@contextmanager
+def track_provider_call(kind: str, provider: str):
+    """
+    Time a provider call as a pipeline stage and count its failures
+
+    Args:
+        kind (str): The stage the call belongs to, "asr" or "minutes"
+        provider (str): Name of the backend making the call
+    """
+    provider_calls_in_flight.inc(kind=kind, provider=provider)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        provider_errors.inc(kind=kind, provider=provider, error=type(e).__name__)
+        raise
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage=kind)
+        provider_calls_in_flight.dec(kind=kind, provider=provider)
+
+
+class MetricsMiddleware:
+    """
+    Record request latency, in-flight requests and upload time for every HTTP request
+
+    Requests are labelled with their route template (``/jobs/{job_id}``)
+    rather than the raw path, so the number of series stays bounded. For
+    multipart uploads, the time until the last body chunk has arrived is
+    recorded as the "upload" stage.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        is_upload = dict(scope["headers"]).get(b"content-type", b"").startswith(b"multipart/form-data")
+
+        async def timed_receive():
+            message = await receive()
+            if is_upload and message["type"] == "http.request" and not message.get("more_body", False):
+                stage_duration.observe(time.perf_counter() - start, stage="upload")
+            return message
+
+        async def status_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, timed_receive, status_send)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
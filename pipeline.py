@@ -0,0 +1,188 @@
+import logging
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from agent import generate_meeting_minutes, minutes_cache_key
+from archive import archive_result
+from cache import ResultCache, transcription_cache, minutes_cache, hash_file
+from config import config
+from metrics import metrics
+from rules import generate_hybrid_minutes, generate_rule_minutes
+from singleflight import SingleFlight
+from transcription import TranscriptionResult, transcribe_audio_with_details, transcription_cache_key
+from workers import transcription_executor
+
+logger = logging.getLogger(__name__)
+
+
+class _ChunkFanout:
+    """
+    Forward the transcript chunks of a shared transcription to every caller
+
+    Callers that join late are first sent the chunks they missed, so each
+    one sees the whole transcript in order.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._subscribers: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def emit(self, text: str) -> None:
+        # Called from transcription threads
+        with self._lock:
+            self._chunks.append(text)
+            for subscriber in self._subscribers:
+                subscriber(text)
+
+    def subscribe(self, subscriber: Callable[[str], None]) -> None:
+        with self._lock:
+            for text in self._chunks:
+                subscriber(text)
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers.remove(subscriber)
+
+
+def _pin_file(path: str) -> str:
+    """Give a shared call its own link to an input file, so it outlives the caller that supplied it"""
+    root, extension = os.path.splitext(path)
+    pinned = f"{root}.{uuid.uuid4().hex}{extension}"
+    try:
+        os.link(path, pinned)
+    except OSError:
+        shutil.copyfile(path, pinned)
+    return pinned
+
+
+async def _cache_result(cache: ResultCache, key: str, value) -> None:
+    """Store a fresh result; a cache that can't be written must not fail the request"""
+    try:
+        await run_in_threadpool(cache.set, key, value)
+    except Exception as e:
+        logger.error("Error caching result: %s", e)
+
+
+# Identical requests in flight at the same time share one provider call
+transcription_flights = SingleFlight("transcription")
+minutes_flights = SingleFlight("minutes")
+_chunk_fanouts: Dict[str, _ChunkFanout] = {}
+
+metrics.gauge(
+    "mma_distinct_calls_in_flight", "Distinct transcription and minutes calls in flight after coalescing", ["kind"],
+    function=lambda: {
+        (flights.kind,): flights.in_flight() for flights in (transcription_flights, minutes_flights)
+    }
+)
+
+
+async def transcribe_with_cache(audio_file_path: str, audio_sha256: Optional[str] = None,
+                                on_chunk: Optional[Callable[[str], None]] = None) -> tuple:
+    """
+    Transcribe an audio file, reusing the cached transcript of identical audio
+
+    Concurrent requests for identical audio wait on the same transcription
+    instead of each calling the provider.
+
+    Args:
+        audio_file_path (str): Path to the audio file
+        audio_sha256 (str, optional): SHA-256 of the file, if already known.
+            The file is hashed when it is not given.
+        on_chunk (Callable, optional): Called with each piece of transcript text
+            as it becomes available; a cached transcript arrives as one piece
+
+    Returns:
+        tuple: The TranscriptionResult (None on failure) and whether it came from the cache
+    """
+    if audio_sha256 is None:
+        audio_sha256 = await run_in_threadpool(hash_file, audio_file_path)
+    cache_key = transcription_cache_key(audio_sha256)
+    cached_result = await run_in_threadpool(transcription_cache.get, cache_key)
+    if cached_result is not None:
+        result = TranscriptionResult(**cached_result)
+        if on_chunk:
+            on_chunk(result.text)
+        return result, True
+
+    # Pinned before the call starts, so the file can't be gone by the time it runs;
+    # the pin is handed over to the call, or dropped if an earlier call is joined
+    pinned_path = await run_in_threadpool(_pin_file, audio_file_path)
+    pin_taken = False
+    fanout = _chunk_fanouts.setdefault(cache_key, _ChunkFanout())
+
+    async def transcribe() -> Optional[TranscriptionResult]:
+        nonlocal pin_taken
+        pin_taken = True
+        try:
+            # Transcribe audio on the worker pool so the event loop stays responsive
+            result = await transcription_executor.run(transcribe_audio_with_details, pinned_path, fanout.emit)
+            if result and result.text:
+                await _cache_result(transcription_cache, cache_key, asdict(result))
+                await archive_result(result.text)
+            return result
+        finally:
+            # A later call for the same audio may have registered its own fanout already
+            if _chunk_fanouts.get(cache_key) is fanout:
+                del _chunk_fanouts[cache_key]
+            os.unlink(pinned_path)
+
+    if on_chunk:
+        fanout.subscribe(on_chunk)
+    try:
+        result, _ = await transcription_flights.do(cache_key, transcribe)
+    finally:
+        if on_chunk:
+            fanout.unsubscribe(on_chunk)
+        if not pin_taken:
+            os.unlink(pinned_path)
+    return result, False
+
+
+async def generate_minutes_with_cache(transcript: str, mode: Optional[str] = None) -> tuple:
+    """
+    Generate meeting minutes, reusing cached minutes for the same transcript
+
+    Concurrent requests for the same transcript wait on the same generation
+    instead of each calling the model.
+
+    Args:
+        transcript (str): The meeting transcript text
+        mode (str, optional): llm, rules (local extraction only) or hybrid
+            (the model only writes the summary); defaults to MINUTES_MODE
+
+    Returns:
+        tuple: The meeting minutes dict and whether it came from the cache
+    """
+    mode = mode or config.MINUTES_MODE
+    if mode == "rules":
+        # Local extraction takes milliseconds, less than a cache lookup is worth
+        meeting_minutes = generate_rule_minutes(transcript)
+        await archive_result(transcript, meeting_minutes)
+        return meeting_minutes, False
+
+    cache_key = minutes_cache_key(transcript, mode)
+    cached_minutes = await run_in_threadpool(minutes_cache.get, cache_key)
+    if cached_minutes is not None:
+        return cached_minutes, True
+
+    async def generate() -> dict:
+        if mode == "hybrid":
+            meeting_minutes = await generate_hybrid_minutes(transcript)
+        else:
+            meeting_minutes = await generate_meeting_minutes(transcript)
+        # Failed generations are returned but never cached
+        if "error" not in meeting_minutes:
+            await _cache_result(minutes_cache, cache_key, meeting_minutes)
+        await archive_result(transcript, meeting_minutes)
+        return meeting_minutes
+
+    meeting_minutes, _ = await minutes_flights.do(cache_key, generate)
+    return meeting_minutes, False
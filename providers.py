@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from backends import ASRBackend, MinutesBackend, create_asr_backend, create_minutes_backend
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Long-lived provider backends shared by every request
+
+    The ASR and minutes backends selected in config are built once, on first
+    use or by a background task at application startup, so requests reuse
+    pooled keep-alive connections instead of paying for client setup and
+    TLS handshakes on every call. Building a backend imports its provider
+    SDK, which is slow, so it is kept off the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._asr: Optional[ASRBackend] = None
+        self._minutes: Optional[MinutesBackend] = None
+
+    def asr(self) -> ASRBackend:
+        """Return the shared ASR backend"""
+        with self._lock:
+            if self._asr is None:
+                self._asr = create_asr_backend()
+            return self._asr
+
+    def minutes(self) -> MinutesBackend:
+        """Return the shared meeting minutes backend"""
+        with self._lock:
+            if self._minutes is None:
+                self._minutes = create_minutes_backend()
+            return self._minutes
+
+    async def load_minutes(self) -> MinutesBackend:
+        """Return the shared meeting minutes backend, building it on a thread if needed"""
+        if self._minutes is not None:
+            return self._minutes
+        return await asyncio.to_thread(self.minutes)
+
+    def ready(self) -> bool:
+        """Return whether both backends have been built"""
+        return self._asr is not None and self._minutes is not None
+
+    async def warmup(self) -> None:
+        """Open connections to both providers so the first requests skip the handshakes"""
+        backends = (self.asr(), self.minutes())
+        results = await asyncio.gather(
+            *(backend.warmup() for backend in backends),
+            return_exceptions=True
+        )
+        for backend, result in zip(backends, results):
+            if isinstance(result, Exception):
+                logger.warning("Could not pre-warm %s connection: %s", backend.name, result)
+
+    async def start(self) -> None:
+        """Build the provider backends and, if enabled, pre-warm their connections"""
+        await asyncio.to_thread(self.asr)
+        await asyncio.to_thread(self.minutes)
+        if config.PROVIDER_WARMUP:
+            await self.warmup()
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        with self._lock:
+            asr, self._asr = self._asr, None
+            minutes, self._minutes = self._minutes, None
+        if minutes is not None:
+            await minutes.close()
+        if asr is not None:
+            asr.close()
+
+
+# Create registry instance
+providers = ProviderRegistry()
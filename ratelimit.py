@@ -0,0 +1,279 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from config import config
+from metrics import metrics
+
+rejected_requests = metrics.counter(
+    "mma_rejected_requests_total",
+    "Requests refused with 429, by reason (rate_limit, overloaded)",
+    ["reason"]
+)
+
+
+class OverloadedError(Exception):
+    """Raised when the pipeline is at capacity and its queue is full"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Server is at capacity, please retry later")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second, holding at most ``burst``
+
+    Each request takes one token. A request that finds the bucket empty is
+    refused and told how long until the next token arrives.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; return 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """
+    One token bucket per client, for the most recently seen ``max_clients`` clients
+
+    Forgetting an idle client is harmless: its bucket would have refilled
+    to a full burst anyway.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: float, max_clients: int):
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str) -> float:
+        """Count a request from a client; return 0 if allowed or the seconds to wait"""
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client)
+            return bucket.take()
+
+
+class AdmissionController:
+    """
+    Global cap on concurrent pipeline runs with a bounded wait queue
+
+    Up to ``max_concurrent`` requests run at once and up to ``max_queue``
+    more wait for a slot, each for at most ``queue_timeout`` seconds. Beyond
+    that, requests are refused straight away with an estimate of when a slot
+    should be free, based on a moving average of recent run times, instead
+    of letting every request's latency grow.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._average_seconds: Optional[float] = None
+
+    def retry_after(self) -> float:
+        """Estimate how long until a new request would get a slot"""
+        average = self._average_seconds or 1.0
+        return max(1.0, average * (self.waiting + 1) / self.max_concurrent)
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold a pipeline slot for the duration of the with-block
+
+        Raises:
+            OverloadedError: If the queue is full or no slot frees up within the queue timeout
+        """
+        if self.running >= self.max_concurrent and self.waiting >= self.max_queue:
+            raise OverloadedError(self.retry_after())
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise OverloadedError(self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            elapsed = time.monotonic() - start
+            self._average_seconds = (
+                elapsed if self._average_seconds is None else 0.8 * self._average_seconds + 0.2 * elapsed
+            )
+
+    def stats(self) -> dict:
+        """Return current slot usage"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue
+        }
+
+
+def client_id(scope) -> str:
+    """
+    Identify the caller by API key when it is a configured one, otherwise by IP address
+
+    The app does not authenticate keys itself, so an unknown key is ignored:
+    trusting any key would let a client take a fresh bucket per request.
+    """
+    headers = dict(scope["headers"])
+    api_key = headers.get(b"x-api-key", b"").decode("latin-1")
+    if api_key and api_key in config.RATE_LIMIT_API_KEYS:
+        return "key:" + api_key
+    forwarded = headers.get(b"x-forwarded-for")
+    if forwarded and config.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def _too_many_requests(detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=429,
+        headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Refuse expensive requests with 429 and Retry-After
+
+    POST requests to ``limited_paths`` spend a token from the caller's
+    bucket before their bodies are read. Requests to ``pipeline_paths``
+    also need an admission slot. It is taken once the body has fully
+    arrived, so a slow upload does not hold a slot it is not using, and
+    held until the response (including a streamed one) is complete.
+    """
+
+    def __init__(self, app, limiter: ClientRateLimiter, admission: AdmissionController,
+                 limited_paths: Iterable[str], pipeline_paths: Iterable[str]):
+        self.app = app
+        self.limiter = limiter
+        self.admission = admission
+        self.limited_paths = set(limited_paths)
+        self.pipeline_paths = set(pipeline_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.limited_paths:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.limiter.check(client_id(scope))
+        if wait:
+            rejected_requests.inc(reason="rate_limit")
+            response = _too_many_requests("Rate limit exceeded, please slow down", wait)
+            await response(scope, receive, send)
+            return
+
+        if scope["path"] not in self.pipeline_paths:
+            await self.app(scope, receive, send)
+            return
+
+        admitted = False
+
+        async with AsyncExitStack() as stack:
+            async def admitted_receive():
+                nonlocal admitted
+                message = await receive()
+                if not admitted and message["type"] == "http.request" and not message.get("more_body", False):
+                    admitted = True
+                    try:
+                        await stack.enter_async_context(self.admission.slot())
+                    except OverloadedError as e:
+                        rejected_requests.inc(reason="overloaded")
+                        # Raised while the app reads the body, like the 413 for oversized uploads
+                        raise HTTPException(
+                            status_code=429,
+                            detail=str(e),
+                            headers={"Retry-After": str(math.ceil(e.retry_after))}
+                        )
+                return message
+
+            await self.app(scope, admitted_receive, send)
+
+
+def process_share(limit: float, processes: int) -> float:
+    """
+    Split a server-wide limit evenly between server processes
+
+    Each process keeps its own buckets and slots, and the kernel spreads
+    connections across processes, so each enforces its share of the limit.
+
+    Args:
+        limit (float): The limit for the whole server
+        processes (int): Number of server processes
+
+    Returns:
+        float: This process's share, at least 1 unless the limit itself is smaller
+    """
+    return max(min(limit, 1), limit / max(1, processes))
+
+
+# Auto-reload runs a single process whatever WEB_WORKERS says
+_processes = 1 if config.DEBUG else config.WEB_WORKERS
+
+# Create limiter instances
+rate_limiter = ClientRateLimiter(
+    requests_per_minute=process_share(config.RATE_LIMIT_PER_MINUTE, _processes),
+    burst=process_share(config.RATE_LIMIT_BURST, _processes),
+    max_clients=config.RATE_LIMIT_MAX_CLIENTS
+)
+
+admission = AdmissionController(
+    max_concurrent=math.ceil(process_share(config.PIPELINE_MAX_CONCURRENT, _processes)),
+    max_queue=math.ceil(process_share(config.PIPELINE_MAX_QUEUE, _processes)),
+    queue_timeout=config.PIPELINE_QUEUE_TIMEOUT
+)
+
+# Streaming windows; every window a stream may hold back can wait for a slot
+stream_admission = AdmissionController(
+    max_concurrent=math.ceil(process_share(config.STREAM_MAX_CONCURRENT_WINDOWS, _processes)),
+    max_queue=config.STREAM_MAX_CONNECTIONS * config.STREAM_MAX_PENDING_WINDOWS,
+    queue_timeout=config.PIPELINE_QUEUE_TIMEOUT
+)
+
+metrics.gauge(
+    "mma_pipeline_slots", "Pipeline admission slots by state", ["state"],
+    function=lambda: {("running",): admission.running, ("waiting",): admission.waiting}
+)
+metrics.gauge(
+    "mma_stream_window_slots", "Streaming window admission slots by state", ["state"],
+    function=lambda: {("running",): stream_admission.running, ("waiting",): stream_admission.waiting}
+)
@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Optional
+
+from config import config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+provider_retries = metrics.counter(
+    "mma_provider_retries_total", "Provider calls retried after a transient failure", ["kind"]
+)
+provider_hedges = metrics.counter(
+    "mma_provider_hedges_total", "Hedged duplicate provider calls, by whether the duplicate won", ["kind", "won"]
+)
+circuit_rejections = metrics.counter(
+    "mma_circuit_open_rejections_total", "Provider calls refused because the circuit breaker was open", ["kind"]
+)
+
+# Client errors that are worth retrying: timeout, conflict and rate limit
+_RETRYABLE_CLIENT_STATUSES = {408, 409, 429}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider that has been failing"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return whether a failed provider call might succeed if repeated
+
+    HTTP client errors (other than timeouts, conflicts and rate limits) mean
+    the request itself is wrong, so repeating it only wastes time.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in _RETRYABLE_CLIENT_STATUSES
+    return True
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is down
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused for ``reset_timeout`` seconds. Then a single trial
+    call is let through (half-open): success closes the circuit, failure
+    opens it again. A trial that never reports back (its caller was
+    cancelled) is given up on after another reset_timeout.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        Check that a call may go ahead
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial already running
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_started = None
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_timeout
+            ):
+                self._trial_started = now
+                return
+        circuit_rejections.inc(kind=self.name)
+        raise CircuitOpenError(f"{self.name} provider is unavailable, failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit opened for %s provider", self.name, extra={"failures": self._failures})
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_started = None
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for picking a hedging delay"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int) -> Optional[float]:
+        """Return the given latency percentile, or None until min_samples calls have been seen"""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=config.PROVIDER_HEDGE_WORKERS,
+                thread_name_prefix="hedge"
+            )
+        return _hedge_executor
+
+
+class ProviderPolicy:
+    """
+    Retries, hedging and circuit breaking for one kind of provider call
+
+    Failed calls are retried with exponential backoff and full jitter.
+    When hedging is enabled, a call still running after the recent latency
+    percentile gets one duplicate, and whichever finishes first wins. The
+    circuit breaker fails calls fast while the provider keeps failing.
+    """
+
+    def __init__(self, kind: str, retries: int, base_delay: float, max_delay: float,
+                 breaker: CircuitBreaker, hedging: bool = False,
+                 hedge_percentile: float = 0.95, hedge_min_samples: int = 20):
+        self.kind = kind
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedging:
+            return None
+        return self.latency.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if not is_retryable(error):
+            # The provider answered, it just rejected this request
+            self.breaker.record_success()
+            return False
+        self.breaker.record_failure()
+        if attempt == self.retries:
+            return False
+        provider_retries.inc(kind=self.kind)
+        logger.warning(
+            "Retrying %s call after error: %s", self.kind, error,
+            extra={"attempt": attempt + 1}
+        )
+        return True
+
+    def call(self, func: Callable, *args) -> Any:
+        """
+        Call a blocking provider function with retries, hedging and circuit breaking
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The last error once retries are exhausted
+        """
+        for attempt in range(self.retries + 1):
+            self.breaker.allow()
+            try:
+                result = self._attempt(func, args)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, func: Callable, *args) -> Any:
+        """Async counterpart of call for coroutine functions"""
+        for attempt in range(self.retries + 1):
+            self.breaker.allow()
+            try:
+                result = await self._attempt_async(func, args)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _attempt(self, func: Callable, args: tuple) -> Any:
+        start = time.perf_counter()
+        delay = self._hedge_delay()
+        if delay is None:
+            result = func(*args)
+            self.latency.record(time.perf_counter() - start)
+            return result
+
+        pool = _hedge_pool()
+        primary = pool.submit(func, *args)
+        futures = [primary]
+        if not wait(futures, timeout=delay).done:
+            futures.append(pool.submit(func, *args))
+
+        error = None
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                error = e
+                continue
+            self.latency.record(time.perf_counter() - start)
+            if len(futures) > 1:
+                provider_hedges.inc(kind=self.kind, won=str(future is not primary).lower())
+            # A blocking call that already started can't be stopped; its result is dropped
+            for other in futures:
+                other.cancel()
+            return result
+        raise error
+
+    async def _attempt_async(self, func: Callable, args: tuple) -> Any:
+        start = time.perf_counter()
+        delay = self._hedge_delay()
+        if delay is None:
+            result = await func(*args)
+            self.latency.record(time.perf_counter() - start)
+            return result
+
+        primary = asyncio.ensure_future(func(*args))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            hedged = not done
+            if hedged:
+                pending.add(asyncio.ensure_future(func(*args)))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self.latency.record(time.perf_counter() - start)
+                    if hedged:
+                        provider_hedges.inc(kind=self.kind, won=str(task is not primary).lower())
+                    return task.result()
+            raise error
+        finally:
+            # The loser, or both calls if we were cancelled, are abandoned
+            for task in pending:
+                task.cancel()
+
+
+def _policy(kind: str) -> ProviderPolicy:
+    return ProviderPolicy(
+        kind=kind,
+        retries=config.PROVIDER_RETRIES,
+        base_delay=config.PROVIDER_RETRY_BASE_DELAY,
+        max_delay=config.PROVIDER_RETRY_MAX_DELAY,
+        breaker=CircuitBreaker(kind, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_SECONDS),
+        hedging=config.PROVIDER_HEDGING,
+        hedge_percentile=config.PROVIDER_HEDGE_PERCENTILE,
+        hedge_min_samples=config.PROVIDER_HEDGE_MIN_SAMPLES
+    )
+
+
+# Create policy instances
+asr_policy = _policy("asr")
+minutes_policy = _policy("minutes")
+
+_CIRCUIT_STATES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+metrics.gauge(
+    "mma_circuit_state", "Provider circuit breaker state (0 closed, 1 half-open, 2 open)", ["kind"],
+    function=lambda: {(policy.kind,): _CIRCUIT_STATES[policy.breaker.state] for policy in (asr_policy, minutes_policy)}
+)
@@ -0,0 +1,300 @@
+import calendar
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from agent import (
+    ActionItem, MeetingMinutes, dedupe_action_items, dedupe_decisions, estimate_tokens,
+    generate_meeting_minutes, minutes_to_dict, prepare_transcript, summarize_transcript
+)
+from config import config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+rule_extractions = metrics.counter(
+    "mma_rule_extractions_total",
+    "Minutes produced with the local extractor, by outcome (rules, hybrid, fallback)",
+    ["outcome"]
+)
+
+_WEEKDAY = r"(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+_DUE_DATE = (
+    rf"(?:(?:next|this)\s+)?{_WEEKDAY}"
+    rf"|{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}(?:\s+\d{{4}})?"
+    r"|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?"
+    r"|today|tonight|tomorrow|eod|eow|end\s+of\s+(?:the\s+)?(?:day|week|month|quarter|year|sprint)"
+    r"|(?:next|this)\s+(?:week|month|quarter|sprint)|q[1-4]"
+)
+
+# "Decision: ..." and "Action: ..." style markers at the start of a sentence
+_DECISION_MARKER = re.compile(
+    r"^(?:key\s+)?(?:decision|decided|agreed|resolution)s?\s*[:\-–]\s*(?P<text>.+)$", re.IGNORECASE
+)
+_ACTION_MARKER = re.compile(
+    r"^(?:action(?:\s+item)?|todo|to-do|follow[- ]up)s?\s*[:\-–]\s*(?P<text>.+)$", re.IGNORECASE
+)
+# "John to prepare the plan", "Sarah Lee will review", "Priya: update the docs"
+_ASSIGNED = re.compile(
+    r"^(?P<owner>[A-Z][\w'’-]*(?:\s+[A-Z][\w'’-]*)?)"
+    r"(?:\s*[:\-–]\s*|\s+(?:to|will|should|must|needs?\s+to|has\s+to|is\s+going\s+to)\s+)"
+    r"(?P<task>.+)$"
+)
+_DUE = re.compile(
+    rf"\s+(?:by|before|on|until|due(?:\s+(?:by|on))?|no\s+later\s+than)\s+(?P<due>{_DUE_DATE})$",
+    re.IGNORECASE
+)
+# Decisions or commitments stated without a marker, which the extractor would miss
+_UNMARKED_CUE = re.compile(
+    r"\b(?:we\s+(?:decided|agreed)|decided\s+to|action\s+items?|to-?dos?|follow[- ]ups?|deadline)\b"
+    rf"|\b(?:will|to|should|must)\s+\w.*\s(?:by|before|until|due)\s+(?:{_DUE_DATE})\b",
+    re.IGNORECASE
+)
+# Subjects that name the whole room rather than an owner
+_NOT_OWNERS = {"we", "i", "everyone", "everybody", "someone", "somebody", "team", "they", "you", "all"}
+
+_SUMMARY_SENTENCES = 3
+
+_WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTH_PREFIXES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_MONTH_DAY = re.compile(rf"^(?P<month>{_MONTH})\.?\s+(?P<day>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{{4}}))?$")
+_DAY_MONTH = re.compile(rf"^(?P<day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month>{_MONTH})(?:\s+(?P<year>\d{{4}}))?$")
+
+
+@dataclass
+class RuleExtraction:
+    """
+    Minutes parsed from explicit markers in a transcript
+
+    ``confidence`` (0 to 1) drops when markers could not be fully parsed
+    (an action item without an owner) and when the transcript has decisions
+    or commitments that were not marked, which the extractor misses.
+    """
+    minutes: MeetingMinutes
+    confidence: float
+
+
+def _sentences(transcript: str) -> List[str]:
+    sentences = []
+    for sentence in re.split(r"(?<=[.!?])\s+|\n+", transcript):
+        # Drop list bullets and numbering
+        sentence = re.sub(r"^\s*(?:[-*•]+|\d+[.)])\s*", "", sentence).strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def _capitalize(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def parse_action_item(text: str) -> ActionItem:
+    """
+    Parse the text after an action marker into task, owner and due date
+
+    Args:
+        text (str): e.g. "John to prepare project plan by Friday."
+
+    Returns:
+        ActionItem: The owner and due date are None when not stated
+    """
+    text = text.strip().rstrip(".!;")
+    due = None
+    match = _DUE.search(text)
+    if match:
+        due = match.group("due")
+        text = text[:match.start()]
+
+    owner = None
+    match = _ASSIGNED.match(text)
+    if match:
+        if match.group("owner").lower() not in _NOT_OWNERS:
+            owner = match.group("owner")
+        text = match.group("task")
+
+    return ActionItem(task=_capitalize(text.strip()), owner=owner, due=due)
+
+
+def _end_of_month(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def resolve_due_date(due: str, reference: date) -> Optional[date]:
+    """
+    Turn a due date as spoken ("Friday", "March 3rd", "end of month") into a calendar date
+
+    Relative dates count from the reference date, normally the day of the
+    meeting; a weekday means its next occurrence after it.
+
+    Args:
+        due (str): The due date text of an action item
+        reference (date): The date the due date was said on
+
+    Returns:
+        date: The due date, or None if it cannot be pinned down (e.g. "3/4", "end of sprint")
+    """
+    text = " ".join(due.lower().rstrip(".").split())
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+
+    if text in ("today", "tonight", "eod", "end of day", "end of the day"):
+        return reference
+    if text == "tomorrow":
+        return reference + timedelta(days=1)
+    if text in ("eow", "end of week", "end of the week", "this week"):
+        return reference + timedelta(days=max(0, 4 - reference.weekday()))
+    if text == "next week":
+        return reference + timedelta(days=7 - reference.weekday())
+    if text in ("end of month", "end of the month", "this month"):
+        return _end_of_month(reference.year, reference.month)
+    if text == "next month":
+        return _end_of_month(reference.year, reference.month) + timedelta(days=1)
+    if text in ("end of year", "end of the year"):
+        return date(reference.year, 12, 31)
+
+    quarter = None
+    if text in ("end of quarter", "end of the quarter", "this quarter"):
+        quarter = (reference.month - 1) // 3 + 1
+    elif re.fullmatch(r"q[1-4]", text):
+        quarter = int(text[1])
+    if quarter is not None:
+        end = _end_of_month(reference.year, quarter * 3)
+        return end if end >= reference else _end_of_month(reference.year + 1, quarter * 3)
+
+    weekday = re.sub(r"^(?:next|this)\s+", "", text)
+    if weekday in _WEEKDAY_NAMES:
+        days = (_WEEKDAY_NAMES.index(weekday) - reference.weekday()) % 7
+        return reference + timedelta(days=days or 7)
+
+    match = _MONTH_DAY.match(text) or _DAY_MONTH.match(text)
+    if match:
+        month = _MONTH_PREFIXES.index(match.group("month")[:3]) + 1
+        try:
+            resolved = date(int(match.group("year") or reference.year), month, int(match.group("day")))
+        except ValueError:
+            return None
+        if not match.group("year") and resolved < reference:
+            resolved = resolved.replace(year=resolved.year + 1)
+        return resolved
+    return None
+
+
+def _extractive_summary(discussion: List[str], decisions: int, action_items: int) -> str:
+    # The first few distinct substantive sentences, then what was recorded
+    picked: List[str] = []
+    for sentence in discussion:
+        if len(sentence.split()) >= 4 and sentence not in picked:
+            picked.append(sentence)
+            if len(picked) == _SUMMARY_SENTENCES:
+                break
+    picked.append(f"{decisions} decision(s) and {action_items} action item(s) were recorded.")
+    return " ".join(picked)
+
+
+def extract_minutes(transcript: str) -> RuleExtraction:
+    """
+    Extract meeting minutes from a transcript without calling a model
+
+    Sentences starting with a marker such as ``Decision:`` or
+    ``Action: John to ... by Friday`` become decisions and action items;
+    the summary is a few sentences of the discussion itself.
+
+    Args:
+        transcript (str): The meeting transcript text
+
+    Returns:
+        RuleExtraction: The minutes and how much to trust them
+    """
+    decisions: List[str] = []
+    action_items: List[ActionItem] = []
+    discussion: List[str] = []
+    missed = 0
+
+    for sentence in _sentences(transcript):
+        match = _DECISION_MARKER.match(sentence)
+        if match:
+            decisions.append(_capitalize(match.group("text").strip()))
+            continue
+        match = _ACTION_MARKER.match(sentence)
+        if match:
+            action_items.append(parse_action_item(match.group("text")))
+            continue
+        if _UNMARKED_CUE.search(sentence):
+            missed += 1
+        discussion.append(sentence)
+
+    found = len(decisions) + len(action_items)
+    confidence = 0.0
+    if found:
+        parsed = len(decisions) + sum(1.0 if item.owner else 0.5 for item in action_items)
+        confidence = round(parsed / (found + missed), 3)
+
+    decisions = dedupe_decisions(decisions)
+    action_items = dedupe_action_items(action_items)
+    minutes = MeetingMinutes(
+        summary=_extractive_summary(discussion, len(decisions), len(action_items)),
+        decisions=decisions,
+        action_items=action_items
+    )
+    return RuleExtraction(minutes=minutes, confidence=confidence)
+
+
+def generate_rule_minutes(transcript: str) -> dict:
+    """
+    Generate meeting minutes with the local extractor only
+
+    Args:
+        transcript (str): The meeting transcript text
+
+    Returns:
+        dict: Meeting minutes with summary, decisions, and action items
+    """
+    extraction = extract_minutes(transcript)
+    rule_extractions.inc(outcome="rules")
+    logger.debug("Extracted minutes locally", extra={"confidence": extraction.confidence})
+    return minutes_to_dict(extraction.minutes)
+
+
+async def generate_hybrid_minutes(transcript: str) -> dict:
+    """
+    Generate meeting minutes locally, calling the model only where it is needed
+
+    When the extractor is confident, the model only writes the summary.
+    Otherwise, or when the transcript is long enough to need map-reduce,
+    the whole minutes come from the model as usual. If the summary call
+    fails, the extractive summary is kept and the error is reported.
+
+    Args:
+        transcript (str): The meeting transcript text
+
+    Returns:
+        dict: Meeting minutes with summary, decisions, and action items
+
+    Raises:
+        TokenBudgetExceededError: If the transcript is over MINUTES_MAX_INPUT_TOKENS
+    """
+    extraction = extract_minutes(transcript)
+    if (extraction.confidence < config.RULES_MIN_CONFIDENCE
+            or estimate_tokens(transcript) > config.MINUTES_CHUNK_TOKENS):
+        rule_extractions.inc(outcome="fallback")
+        logger.info("Local extraction not used, generating full minutes", extra={"confidence": extraction.confidence})
+        return await generate_meeting_minutes(transcript)
+
+    rule_extractions.inc(outcome="hybrid")
+    meeting_minutes = minutes_to_dict(extraction.minutes)
+    compacted, meeting_minutes["metadata"] = prepare_transcript(transcript)
+    try:
+        meeting_minutes["summary"] = await summarize_transcript(compacted)
+    except Exception as e:
+        logger.error("Error generating meeting summary: %s", e)
+        meeting_minutes["error"] = str(e)
+    return meeting_minutes
@@ -0,0 +1,398 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from agent import MeetingMinutes, estimate_tokens, minutes_to_dict, split_transcript, update_meeting_minutes
+from archive import archive_result
+from config import config
+from metrics import metrics, stage_duration
+
+logger = logging.getLogger(__name__)
+
+# Longer than any single model call; an update left behind by a dead process
+# can be taken over once this has passed
+_UPDATE_LEASE_SECONDS = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    minutes TEXT NOT NULL,
+    folded_through INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updating_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_session ON segments (session_id, id);
+"""
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when creating a session would exceed SESSION_MAX_ACTIVE"""
+
+
+@dataclass
+class LiveSession:
+    """
+    A live meeting as last stored: its transcript segments and the minutes folded from them
+
+    Segments before ``folded`` are already reflected in the minutes; the
+    rest are pending for the next update.
+    """
+    id: str
+    created_at: float
+    updated_at: float
+    segments: List[str]
+    folded: int
+    minutes: MeetingMinutes
+    version: int
+    last_error: Optional[str]
+    updating: bool
+
+    def pending_text(self) -> str:
+        return " ".join(self.segments[self.folded:])
+
+    def transcript(self) -> str:
+        return " ".join(self.segments)
+
+    def to_dict(self, include_transcript: bool = False) -> dict:
+        session = {
+            "session_id": self.id,
+            "version": self.version,
+            "meeting_minutes": minutes_to_dict(self.minutes),
+            "segments": len(self.segments),
+            "pending_tokens": estimate_tokens(self.pending_text()),
+            "updating": self.updating,
+            "last_error": self.last_error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+        if include_transcript:
+            session["transcript"] = self.transcript()
+        return session
+
+
+class SessionStore:
+    """
+    SQLite-backed live session state
+
+    Every server process reads and writes sessions here, so any process can
+    serve any request for a session. An update holds a lease on its session
+    while it runs, so one update runs at a time across processes. Like the
+    job store, every method opens its own short-lived connection.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def expire(self, ttl: float) -> int:
+        """Delete sessions idle for longer than ttl seconds; return how many"""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - ttl,))
+        return cursor.rowcount
+
+    def create(self, max_active: int) -> Optional[str]:
+        """Insert a new session and return its id, or None if max_active are already open"""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        empty = minutes_to_dict(MeetingMinutes(summary="", decisions=[], action_items=[]))
+        with self._connect() as conn:
+            # One statement, so processes creating sessions at once can't overshoot the limit
+            cursor = conn.execute(
+                "INSERT INTO sessions (id, minutes, created_at, updated_at) "
+                "SELECT ?, ?, ?, ? WHERE (SELECT COUNT(*) FROM sessions) < ?",
+                (session_id, json.dumps(empty), now, now, max_active)
+            )
+        return session_id if cursor.rowcount else None
+
+    def get(self, session_id: str, ttl: float) -> Optional[LiveSession]:
+        """Return a session with all its segments, or None if it does not exist or has expired"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM sessions WHERE id = ? AND updated_at >= ?", (session_id, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            segments = conn.execute(
+                "SELECT id, text FROM segments WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return LiveSession(
+            id=row["id"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            segments=[segment["text"] for segment in segments],
+            folded=sum(1 for segment in segments if segment["id"] <= row["folded_through"]),
+            minutes=MeetingMinutes(**json.loads(row["minutes"])),
+            version=row["version"],
+            last_error=row["last_error"],
+            updating=(row["updating_until"] or 0) > now
+        )
+
+    def append(self, session_id: str, text: str, ttl: float) -> bool:
+        """Add a transcript segment; return False if the session does not exist or has expired"""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE sessions SET updated_at = ? WHERE id = ? AND updated_at >= ?",
+                (now, session_id, now - ttl)
+            )
+            if not cursor.rowcount:
+                return False
+            conn.execute("INSERT INTO segments (session_id, text) VALUES (?, ?)", (session_id, text))
+        return True
+
+    def claim_update(self, session_id: str, lease: float) -> Optional[bool]:
+        """
+        Take the update lease on a session
+
+        Returns:
+            bool: True once claimed, False if another update holds it, None if
+                the session does not exist
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE sessions SET updating_until = ? WHERE id = ? AND coalesce(updating_until, 0) < ?",
+                (now + lease, session_id, now)
+            )
+            if cursor.rowcount:
+                return True
+            exists = conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return False if exists else None
+
+    def renew_update(self, session_id: str, lease: float) -> None:
+        """Extend the update lease held on a session"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET updating_until = ? WHERE id = ?", (time.time() + lease, session_id)
+            )
+
+    def pending(self, session_id: str) -> Tuple[Optional[dict], int, str]:
+        """Return a session's minutes, the id of its last segment and the text not yet folded in"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT minutes, folded_through FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None, 0, ""
+            segments = conn.execute(
+                "SELECT id, text FROM segments WHERE session_id = ? AND id > ? ORDER BY id",
+                (session_id, row["folded_through"])
+            ).fetchall()
+        end = segments[-1]["id"] if segments else row["folded_through"]
+        return json.loads(row["minutes"]), end, " ".join(segment["text"] for segment in segments)
+
+    def finish_update(self, session_id: str, meeting_minutes: Optional[dict] = None,
+                      folded_through: int = 0, error: Optional[str] = None) -> None:
+        """Store the result of an update, or its error, and release the lease"""
+        with self._connect() as conn:
+            if meeting_minutes is None:
+                conn.execute(
+                    "UPDATE sessions SET last_error = ?, updating_until = NULL WHERE id = ?",
+                    (error, session_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE sessions SET minutes = ?, folded_through = ?, version = version + 1, "
+                    "last_error = NULL, updating_until = NULL WHERE id = ?",
+                    (json.dumps(meeting_minutes), folded_through, session_id)
+                )
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def count(self, ttl: float) -> int:
+        """Return the number of sessions active within the last ttl seconds"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS n FROM sessions WHERE updated_at >= ?", (time.time() - ttl,)
+            ).fetchone()
+        return row["n"]
+
+
+class SessionManager:
+    """
+    Live meeting sessions whose minutes are updated from transcript deltas
+
+    Once a session has ``update_tokens`` of new transcript, a background
+    update sends only that delta and the current minutes to the model, so
+    update latency stays flat as the meeting grows. Segments appended while
+    an update runs are folded in by the next one. Sessions idle for longer
+    than ``ttl`` seconds are dropped.
+    """
+
+    def __init__(self, store: SessionStore, update_tokens: int, ttl: float, max_active: int):
+        self.store = store
+        self.update_tokens = update_tokens
+        self.ttl = ttl
+        self.max_active = max_active
+        # Background updates started by this process
+        self._updates: Dict[str, asyncio.Task] = {}
+
+    async def create(self) -> LiveSession:
+        """
+        Start a new session
+
+        Raises:
+            SessionLimitError: If SESSION_MAX_ACTIVE sessions are already open
+        """
+        expired = await run_in_threadpool(self.store.expire, self.ttl)
+        if expired:
+            logger.info("Dropped idle live sessions", extra={"sessions": expired})
+        session_id = await run_in_threadpool(self.store.create, self.max_active)
+        if session_id is None:
+            raise SessionLimitError("Too many live sessions, close one or retry later")
+        return await self.get(session_id)
+
+    async def get(self, session_id: str) -> Optional[LiveSession]:
+        """Return an open session, or None if it does not exist or has expired"""
+        return await run_in_threadpool(self.store.get, session_id, self.ttl)
+
+    async def append(self, session_id: str, text: str) -> Optional[LiveSession]:
+        """
+        Add a transcript segment, starting an update in the background once enough has built up
+
+        Returns:
+            LiveSession: The session with the new segment, or None if it does not exist
+        """
+        if not await run_in_threadpool(self.store.append, session_id, text.strip(), self.ttl):
+            return None
+        session = await self.get(session_id)
+        if session is None:
+            return None
+        task = self._updates.get(session_id)
+        if (task is None or task.done()) and estimate_tokens(session.pending_text()) >= self.update_tokens:
+            self._updates[session_id] = asyncio.ensure_future(self._update_while_pending(session_id))
+        return session
+
+    async def _update_while_pending(self, session_id: str) -> None:
+        try:
+            while True:
+                _, _, delta = await run_in_threadpool(self.store.pending, session_id)
+                if estimate_tokens(delta) < self.update_tokens:
+                    return
+                # Another process is updating; it checks for more text when it is done
+                if not await self._fold(session_id, wait=False):
+                    # Retried once more text arrives, rather than spinning on a failing provider
+                    return
+        finally:
+            if self._updates.get(session_id) is asyncio.current_task():
+                del self._updates[session_id]
+
+    async def _fold(self, session_id: str, wait: bool = True) -> bool:
+        """
+        Fold all pending segments into the minutes
+
+        Returns:
+            bool: False if the update failed, or if another update holds the
+                session and ``wait`` is False
+        """
+        while True:
+            claimed = await run_in_threadpool(self.store.claim_update, session_id, _UPDATE_LEASE_SECONDS)
+            if claimed is None:
+                # Closed or expired meanwhile; there is nothing left to update
+                return True
+            if claimed:
+                break
+            if not wait:
+                return False
+            await asyncio.sleep(0.2)
+
+        try:
+            meeting_minutes, end, delta = await run_in_threadpool(self.store.pending, session_id)
+            if meeting_minutes is None or not delta.strip():
+                await run_in_threadpool(self.store.finish_update, session_id)
+                return True
+            with stage_duration.time(stage="session_update"):
+                minutes = MeetingMinutes(**meeting_minutes)
+                # A backlog bigger than one model call is folded in part by part
+                for part in split_transcript(delta, config.MINUTES_CHUNK_TOKENS):
+                    await run_in_threadpool(self.store.renew_update, session_id, _UPDATE_LEASE_SECONDS)
+                    minutes = await update_meeting_minutes(minutes, part)
+        except asyncio.CancelledError:
+            # Let the next update start right away rather than after the lease; shielded
+            # so that cancelling again can't leave the session claimed
+            await asyncio.shield(
+                run_in_threadpool(self.store.finish_update, session_id, error="Update interrupted")
+            )
+            raise
+        except Exception as e:
+            logger.error("Error updating live session minutes: %s", e, extra={"session_id": session_id})
+            await run_in_threadpool(self.store.finish_update, session_id, error=str(e))
+            return False
+        await run_in_threadpool(self.store.finish_update, session_id, minutes_to_dict(minutes), end)
+        return True
+
+    async def refresh(self, session_id: str) -> None:
+        """Fold in every pending segment, however few, before returning"""
+        await self._fold(session_id)
+
+    async def close(self, session_id: str) -> Optional[LiveSession]:
+        """
+        Fold in what is pending, archive the meeting and end the session
+
+        Returns:
+            LiveSession: The final session, or None if it does not exist
+        """
+        await self._fold(session_id)
+        session = await self.get(session_id)
+        if session is None:
+            return None
+        await run_in_threadpool(self.store.delete, session_id)
+        task = self._updates.pop(session_id, None)
+        if task:
+            task.cancel()
+        if session.segments:
+            await archive_result(session.transcript(), minutes_to_dict(session.minutes))
+        return session
+
+    async def shutdown(self, timeout: float = 0) -> None:
+        """Let background updates finish for up to timeout seconds, then stop them"""
+        tasks = list(self._updates.values())
+        if tasks:
+            _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def count(self) -> int:
+        """Return the number of open sessions"""
+        return self.store.count(self.ttl)
+
+
+# Create session manager instance
+session_manager = SessionManager(
+    store=SessionStore(config.SESSION_DB_PATH),
+    update_tokens=config.SESSION_UPDATE_TOKENS,
+    ttl=config.SESSION_TTL,
+    max_active=config.SESSION_MAX_ACTIVE
+)
+
+metrics.gauge("mma_live_sessions", "Open live meeting sessions", function=session_manager.count)
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from metrics import metrics
+
+coalesced_calls = metrics.counter(
+    "mma_coalesced_calls_total", "Calls that joined an identical call already in flight", ["kind"]
+)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key onto one shared task
+
+    The first caller for a key starts the work; callers arriving while it
+    runs wait for the same task and get the same result or exception. Each
+    caller awaits the task through a shield, so one caller disconnecting
+    does not cancel the work for the others. The task is only cancelled
+    once every caller has gone.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._flights: Dict[str, _Flight] = {}
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: str, func: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        Run func for a key, or wait for the run already in flight for that key
+
+        Args:
+            key (str): Identifies identical calls, e.g. a content hash
+            func (Callable): Coroutine function starting the work
+
+        Returns:
+            tuple: The result and whether it was shared with an earlier caller
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            coalesced_calls.inc(kind=self.kind)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Everyone who wanted the result has gone
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def in_flight(self) -> int:
+        """Return the number of distinct calls currently running"""
+        return len(self._flights)
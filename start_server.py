@@ -56,11 +56,20 @@ def main():
         import uvicorn
         from config import config
         
+        workers = 1 if config.DEBUG else config.WEB_WORKERS
+        if config.DEBUG and config.WEB_WORKERS > 1:
+            print("⚠️  DEBUG auto-reload runs a single process; WEB_WORKERS is ignored")
+        print(f"⚙️  Server processes: {workers}")
+        
+        # On SIGTERM, new connections are refused and in-flight work gets
+        # SHUTDOWN_DRAIN_TIMEOUT seconds to finish before the process exits
         uvicorn.run(
             "main:app",
             host=config.HOST,
             port=config.PORT,
             reload=config.DEBUG,
+            workers=workers,
+            timeout_graceful_shutdown=config.SHUTDOWN_DRAIN_TIMEOUT,
             log_level="info"
         )
         
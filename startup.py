@@ -0,0 +1,121 @@
+import logging
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _ImportTimer:
+    """
+    Meta path finder that times how long each top-level module takes to load
+
+    It finds specs through the other finders, then wraps the loader's
+    exec_module. A module's time includes the modules it imports first.
+    """
+
+    def __init__(self, record: Callable[[str, float], None]):
+        self.record = record
+
+    def find_spec(self, name, path=None, target=None):
+        if "." in name:
+            return None
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        exec_module = getattr(loader, "exec_module", None)
+        # Built-in and frozen modules share one loader class and load instantly
+        if exec_module is None or isinstance(loader, type):
+            return spec
+
+        def timed_exec_module(module):
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                self.record(name, time.perf_counter() - start)
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            pass
+        return spec
+
+
+class StartupReport:
+    """
+    Where process startup time goes
+
+    Records the import time of each top-level module and when each startup
+    phase finished, in seconds since this module was first imported.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self._timer: Optional[_ImportTimer] = None
+
+    def _record_import(self, name: str, seconds: float) -> None:
+        self.imports[name] = seconds
+
+    def track_imports(self) -> None:
+        """Start timing module imports"""
+        if self._timer is None:
+            self._timer = _ImportTimer(self._record_import)
+            sys.meta_path.insert(0, self._timer)
+
+    def stop_tracking_imports(self) -> None:
+        """Stop timing module imports and mark the imports phase"""
+        if self._timer is not None:
+            sys.meta_path.remove(self._timer)
+            self._timer = None
+        self.mark("imports")
+
+    def mark(self, phase: str) -> None:
+        """Record that a startup phase has finished"""
+        self.phases[phase] = time.perf_counter() - self.started
+
+    def to_dict(self, slowest: int = 10) -> dict:
+        """
+        Return the phase times and the slowest imports
+
+        Args:
+            slowest (int): How many of the slowest top-level imports to list
+
+        Returns:
+            dict: Seconds per phase, and per import including its own imports
+        """
+        imports = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:slowest]
+        return {
+            "phases": {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+            "slowest_imports": {name: round(seconds, 3) for name, seconds in imports}
+        }
+
+    def log(self, phase: str) -> None:
+        """Mark a phase and log the report so far"""
+        self.mark(phase)
+        report = self.to_dict()
+        logger.info(
+            "Startup: %s after %.2fs", phase, self.phases[phase],
+            extra={"phases": report["phases"], "slowest_imports": report["slowest_imports"]}
+        )
+
+
+# Create startup report instance
+startup_report = StartupReport()
+
+metrics.gauge(
+    "mma_startup_seconds", "Seconds from the start of the app import to each startup phase", ["phase"],
+    function=lambda: {(phase,): seconds for phase, seconds in startup_report.phases.items()}
+)
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import shutil
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from archive import archive_result
+from audio import PCMAudio, TARGET_SAMPLE_RATE
+from config import config
+from metrics import metrics
+from ratelimit import stream_admission
+from sessions import LiveSession, session_manager
+from transcription import TranscriptStitcher, transcribe_pcm
+from workers import transcription_executor
+
+logger = logging.getLogger(__name__)
+
+_connections = 0
+
+metrics.gauge("mma_stream_connections", "Open streaming transcription WebSockets", function=lambda: _connections)
+
+
+class StreamRejectedError(Exception):
+    """Raised when a stream can't be served; the message is sent to the client"""
+
+
+class WindowBuffer:
+    """
+    Cut a growing stream of PCM into overlapping windows
+
+    Only the audio the next window still needs is held, so memory stays at
+    about one window however long the stream runs.
+    """
+
+    def __init__(self, sample_rate: int, channels: int, sample_width: int,
+                 window_seconds: float, overlap_seconds: float):
+        if window_seconds <= overlap_seconds:
+            raise ValueError("Window length must be greater than the overlap")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        frame_size = channels * sample_width
+        self.window_bytes = int(window_seconds * sample_rate) * frame_size
+        self.step_bytes = int((window_seconds - overlap_seconds) * sample_rate) * frame_size
+        self.overlap_bytes = self.window_bytes - self.step_bytes
+        self.bytes_per_second = sample_rate * frame_size
+        self.buffer = bytearray()
+        self.start = 0.0  # stream offset of the buffer, in seconds
+        self.windows = 0
+        self.received_bytes = 0
+
+    @property
+    def received_seconds(self) -> float:
+        return self.received_bytes / self.bytes_per_second
+
+    def _window(self, frames: bytes) -> Tuple[float, PCMAudio]:
+        self.windows += 1
+        return self.start, PCMAudio(frames, self.sample_rate, self.channels, self.sample_width)
+
+    def feed(self, data: bytes) -> List[Tuple[float, PCMAudio]]:
+        """Add audio; return the (start offset, audio) of every window it completes"""
+        self.buffer += data
+        self.received_bytes += len(data)
+        windows = []
+        while len(self.buffer) >= self.window_bytes:
+            windows.append(self._window(bytes(self.buffer[:self.window_bytes])))
+            del self.buffer[:self.step_bytes]
+            self.start += self.step_bytes / self.bytes_per_second
+        return windows
+
+    def flush(self, min_seconds: float = 0.3) -> Optional[Tuple[float, PCMAudio]]:
+        """Return the final, partial window, if it has enough audio not yet in an earlier window"""
+        new_bytes = len(self.buffer) - (self.overlap_bytes if self.windows else 0)
+        if new_bytes < min_seconds * self.bytes_per_second:
+            return None
+        window = self._window(bytes(self.buffer))
+        self.buffer.clear()
+        return window
+
+
+class FFmpegDecoder:
+    """
+    Decode a compressed stream (Ogg or WebM Opus) to 16 kHz mono PCM with ffmpeg
+
+    Decoded audio is passed to ``on_pcm`` as it comes out. Writes wait while
+    ffmpeg's input pipe is full, so a slow consumer slows the sender down
+    instead of buffering without limit.
+    """
+
+    def __init__(self, on_pcm: Callable[[bytes], Awaitable[None]]):
+        self.on_pcm = on_pcm
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-v", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            data = await self._process.stdout.read(65536)
+            if not data:
+                return
+            await self.on_pcm(data)
+
+    async def feed(self, data: bytes) -> None:
+        self._process.stdin.write(data)
+        await self._process.stdin.drain()
+
+    async def finish(self) -> None:
+        """Flush ffmpeg and wait until all decoded audio has been passed on"""
+        self._process.stdin.close()
+        await self._reader
+        await self._process.wait()
+
+    def kill(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        if self._process and self._process.returncode is None:
+            self._process.kill()
+
+
+def _is_stop(text: str) -> bool:
+    try:
+        return json.loads(text).get("type") == "stop"
+    except (ValueError, AttributeError):
+        return False
+
+
+async def _transcribe_window(audio: PCMAudio) -> str:
+    async with stream_admission.slot():
+        return await transcription_executor.run(transcribe_pcm, audio)
+
+
+async def stream_transcription(websocket: WebSocket, format: str, sample_rate: int, channels: int,
+                               session: Optional[LiveSession] = None) -> None:
+    """
+    Transcribe audio streamed over an accepted WebSocket in rolling windows
+
+    Binary messages carry audio: 16-bit little-endian PCM, or an Ogg/WebM
+    Opus stream. Each time a window fills it is transcribed, and the new
+    text is sent back as ``{"type": "transcript", ...}`` in order. At most
+    STREAM_MAX_PENDING_WINDOWS windows wait for transcription; beyond that
+    the server stops reading, which pushes back on the client. A text
+    message ``{"type": "stop"}`` flushes the last window and ends the
+    stream with ``{"type": "done", "transcript": ...}``.
+
+    Args:
+        websocket (WebSocket): The accepted connection
+        format (str): pcm or opus
+        sample_rate (int): Sample rate of PCM input
+        channels (int): Channel count of PCM input
+        session (LiveSession, optional): Live session to append transcript text to
+    """
+    global _connections
+    if _connections >= config.STREAM_MAX_CONNECTIONS:
+        raise StreamRejectedError("Too many streams, please retry later")
+    if format == "opus" and shutil.which("ffmpeg") is None:
+        raise StreamRejectedError("Opus streams need ffmpeg on the server; send PCM instead")
+
+    if format == "opus":
+        sample_rate, channels = TARGET_SAMPLE_RATE, 1
+    windows = WindowBuffer(
+        sample_rate, channels, 2, config.STREAM_WINDOW_SECONDS, config.STREAM_OVERLAP_SECONDS
+    )
+    pending: asyncio.Queue = asyncio.Queue(maxsize=config.STREAM_MAX_PENDING_WINDOWS)
+    stitcher = TranscriptStitcher()
+    stream_start = time.perf_counter()
+
+    async def enqueue(start: float, audio: PCMAudio) -> None:
+        # Waits while too many windows are in flight; reading stops meanwhile
+        transcription = asyncio.ensure_future(_transcribe_window(audio))
+        put = asyncio.ensure_future(pending.put((start, audio.duration, transcription)))
+        try:
+            done, _ = await asyncio.wait({put, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if put not in done:
+                # The sender failed (the client went away), so the queue will never drain
+                sender.result()
+                raise RuntimeError("Stream sender stopped")
+        finally:
+            # A window that never made it into the queue is not cleaned up with it
+            if not put.done():
+                put.cancel()
+                transcription.cancel()
+
+    async def on_pcm(data: bytes) -> None:
+        for start, audio in windows.feed(data):
+            await enqueue(start, audio)
+
+    async def send_transcripts() -> None:
+        index = 0
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            start, duration, transcription = item
+            try:
+                text = await transcription
+            except Exception as e:
+                logger.error("Error transcribing stream window: %s", e)
+                await websocket.send_json({"type": "error", "detail": f"Transcription failed: {e}",
+                                           "start": start})
+                continue
+            added = stitcher.add(text) if text else ""
+            if not added:
+                continue
+            if session is not None:
+                await session_manager.append(session.id, added)
+            if index == 0:
+                logger.info("First streamed transcript",
+                            extra={"seconds": round(time.perf_counter() - stream_start, 2)})
+            await websocket.send_json({
+                "type": "transcript",
+                "index": index,
+                "text": added,
+                "start": round(start, 2),
+                "end": round(start + duration, 2),
+                "lag_seconds": round(windows.received_seconds - (start + duration), 2)
+            })
+            index += 1
+
+    decoder = FFmpegDecoder(on_pcm) if format == "opus" else None
+    sender = asyncio.ensure_future(send_transcripts())
+    _connections += 1
+    try:
+        if decoder:
+            await decoder.start()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                if decoder:
+                    await decoder.feed(message["bytes"])
+                else:
+                    await on_pcm(message["bytes"])
+            elif message.get("text") and _is_stop(message["text"]):
+                break
+
+        if decoder:
+            await decoder.finish()
+        final = windows.flush()
+        if final:
+            await enqueue(*final)
+        await pending.put(None)
+        await sender
+
+        if stitcher.text:
+            await archive_result(stitcher.text)
+        await websocket.send_json({"type": "done", "transcript": stitcher.text})
+        await websocket.close()
+    finally:
+        _connections -= 1
+        sender.cancel()
+        if decoder:
+            decoder.kill()
+        # Windows still queued are abandoned with the connection
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[2].cancel()
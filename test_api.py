@@ -4,12 +4,32 @@ Simple test script for the Meeting Minutes Agent API
 Run this after starting the server to test the endpoints
 """
 
+import array
+import io
+import math
+import wave
+import zipfile
+
 import requests
 import json
+import time
 
 # API base URL
 BASE_URL = "http://localhost:8000"
 
+def sample_wav(seconds=5, sample_rate=16000):
+    """Generate a short 16-bit mono WAV tone to upload"""
+    samples = array.array("h", (
+        int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate)) for i in range(seconds * sample_rate)
+    ))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
 def test_root():
     """Test the root endpoint"""
     print("Testing root endpoint...")
@@ -55,6 +75,134 @@ def test_generate_minutes():
         print(f"Error: {response.text}")
     print()
 
+def test_jobs():
+    """Test queueing a transcript as a background job and polling its status"""
+    print("Testing jobs endpoint...")
+    
+    data = {"transcript": "Decision: Launch moves to March. Action: John to update the plan by Friday."}
+    response = requests.post(f"{BASE_URL}/jobs", data=data)
+    
+    print(f"Status: {response.status_code}")
+    if response.status_code == 202:
+        status_url = response.json()["status_url"]
+        for _ in range(30):
+            job = requests.get(f"{BASE_URL}{status_url}").json()
+            if job["status"] not in ("queued", "running"):
+                break
+            time.sleep(1)
+        print(f"Job status: {job['status']}")
+        print(f"Stage timings: {job['stage_timings']}")
+    else:
+        print(f"Error: {response.text}")
+    print()
+
+def test_transcribe_stream():
+    """Test streaming transcription progress as Server-Sent Events"""
+    print("Testing transcribe stream endpoint...")
+    
+    files = {"file": ("sample.wav", sample_wav(), "audio/wav")}
+    response = requests.post(f"{BASE_URL}/transcribe-stream", files=files, stream=True)
+    
+    print(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                print(f"Event: {line[len('event: '):]}")
+    else:
+        print(f"Error: {response.text}")
+    print()
+
+def test_transcribe_batch():
+    """Test batch transcription of several files and a zip archive"""
+    print("Testing transcribe batch endpoint...")
+    
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("standup.wav", sample_wav(2))
+        zip_file.writestr("retro.wav", sample_wav(3))
+    
+    files = [
+        ("files", ("sample.wav", sample_wav(), "audio/wav")),
+        ("files", ("meetings.zip", archive.getvalue(), "application/zip")),
+    ]
+    response = requests.post(f"{BASE_URL}/transcribe-batch", files=files, data={"generate_minutes": "false"})
+    
+    print(f"Status: {response.status_code}")
+    if response.status_code == 200:
+        result = response.json()
+        print(f"Succeeded: {result['succeeded']}/{result['total']}")
+        for item in result["results"]:
+            print(f"  {item['filename']}: {'ok' if item['success'] else item['error']}")
+    else:
+        print(f"Error: {response.text}")
+    print()
+
+def test_metrics():
+    """Test the Prometheus metrics endpoint"""
+    print("Testing metrics endpoint...")
+    response = requests.get(f"{BASE_URL}/metrics")
+    print(f"Status: {response.status_code}")
+    stages = sorted({
+        line.split('stage="', 1)[1].split('"', 1)[0]
+        for line in response.text.splitlines()
+        if line.startswith("mma_stage_duration_seconds_count")
+    })
+    print(f"Stages timed: {', '.join(stages) or 'none yet'}")
+    print()
+
+def test_archive():
+    """Test searching the archive, listing action items and fetching a meeting"""
+    print("Testing archive endpoints...")
+    
+    response = requests.get(f"{BASE_URL}/search", params={"q": "budget", "limit": 5})
+    print(f"Search status: {response.status_code}")
+    if response.status_code == 200:
+        results = response.json()
+        print(f"Meetings found: {len(results['items'])}, next cursor: {results['next_cursor']}")
+        if results["items"]:
+            meeting_id = results["items"][0]["meeting_id"]
+            meeting = requests.get(f"{BASE_URL}/meetings/{meeting_id}")
+            print(f"Meeting {meeting_id} status: {meeting.status_code}")
+    else:
+        print(f"Error: {response.text}")
+    
+    response = requests.get(f"{BASE_URL}/action-items", params={"owner": "John", "limit": 5})
+    print(f"Action items status: {response.status_code}")
+    if response.status_code == 200:
+        for item in response.json()["items"]:
+            print(f"  {item['owner']}: {item['task']} (due {item['due_date'] or item['due']})")
+    else:
+        print(f"Error: {response.text}")
+    print()
+
+def test_sessions():
+    """Test a live meeting session: append segments, refresh and close"""
+    print("Testing live session endpoints...")
+    
+    response = requests.post(f"{BASE_URL}/sessions")
+    print(f"Create status: {response.status_code}")
+    if response.status_code != 201:
+        print(f"Error: {response.text}")
+        print()
+        return
+    session_id = response.json()["session_id"]
+    
+    segments = [
+        "John opened the meeting and went through the project timeline.",
+        "Decision: Project will start next week as planned.",
+        "Action: Sarah to review the budget spreadsheet by Monday.",
+    ]
+    for text in segments:
+        requests.post(f"{BASE_URL}/sessions/{session_id}/segments", json={"text": text})
+    
+    session = requests.get(f"{BASE_URL}/sessions/{session_id}", params={"refresh": "true"}).json()
+    print(f"Version after refresh: {session['version']}")
+    print(f"Summary: {session['meeting_minutes'].get('summary', 'N/A')}")
+    
+    response = requests.post(f"{BASE_URL}/sessions/{session_id}/close")
+    print(f"Close status: {response.status_code}")
+    print()
+
 def main():
     """Run all tests"""
     print("=== Meeting Minutes Agent API Tests ===\n")
@@ -63,6 +211,12 @@ def main():
         test_root()
         test_health()
         test_generate_minutes()
+        test_archive()
+        test_jobs()
+        test_sessions()
+        test_transcribe_stream()
+        test_transcribe_batch()
+        test_metrics()
         
         print("=== Tests Completed ===")
         print("Note: Audio transcription tests require actual audio files")
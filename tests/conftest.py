@@ -0,0 +1,41 @@
+"""
+Shared test setup
+
+Settings are read once, when config is first imported, so the offline fake
+backends and throwaway cache and data directories are configured here
+before any test imports an app module.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_test_root = tempfile.mkdtemp(prefix="meeting-minutes-tests-")
+
+for _name in ("HF_TOKEN", "OPENAI_API_KEY"):
+    os.environ.pop(_name, None)
+
+os.environ.update({
+    "ASR_BACKEND": "fake",
+    "MINUTES_BACKEND": "fake",
+    "FAKE_ASR_LATENCY": "fixed:0",
+    "FAKE_MINUTES_LATENCY": "fixed:0",
+    "CACHE_DIR": os.path.join(_test_root, "cache"),
+    "DATA_DIR": os.path.join(_test_root, "data"),
+    "RATE_LIMIT_ENABLED": "False",
+    "PROVIDER_RETRY_BASE_DELAY": "0",
+    "JOB_POLL_INTERVAL": "0.05",
+    "LOG_LEVEL": "WARNING",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A client for the app, with its startup and shutdown run once for the whole session"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
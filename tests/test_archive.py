@@ -0,0 +1,125 @@
+import asyncio
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from archive import MinutesArchive, json_page, prefetch
+
+
+def _minutes(summary: str, decisions=(), action_items=()) -> dict:
+    return {
+        "summary": summary,
+        "decisions": list(decisions),
+        "action_items": [{"task": task, "owner": owner, "due": due} for task, owner, due in action_items]
+    }
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return MinutesArchive(str(tmp_path / "archive.db"))
+
+
+def _page(rows, limit: int, cursor_field: str) -> dict:
+    return json.loads(b"".join(json_page(rows, limit, cursor_field)))
+
+
+def test_transcript_and_minutes_share_one_meeting(archive):
+    meeting_id = archive.record("Alice:  we   talked about the budget.")
+    assert archive.record("Alice: we talked about the budget.", _minutes("Budget talk")) == meeting_id
+
+    meeting = archive.get(meeting_id)
+    assert meeting["minutes"]["summary"] == "Budget talk"
+    # A later transcript-only record keeps the minutes
+    archive.record("Alice: we talked about the budget.")
+    assert archive.get(meeting_id)["minutes"]["summary"] == "Budget talk"
+    assert archive.get(meeting_id + 1) is None
+
+
+def test_search_matches_every_word_newest_first(archive):
+    oldest = archive.record("The budget is tight.", _minutes("Budget review", ["Cut travel costs"]))
+    archive.record("Hiring plan.", _minutes("Hiring", ["Open two roles"]))
+    newest = archive.record("Budget for hiring.", _minutes("Budget and hiring"))
+
+    assert [row["meeting_id"] for row in archive.search("budget", 10)] == [newest, oldest]
+    assert [row["meeting_id"] for row in archive.search("travel budget", 10)] == [oldest]
+    assert "[travel]" in next(archive.search("travel", 10))["snippet"]
+    # Query syntax is treated as plain words
+    assert list(archive.search('budget" OR "hiring', 10)) == []
+
+    tomorrow = datetime.now() + timedelta(days=1)
+    assert list(archive.search("budget", 10, since=tomorrow)) == []
+    assert len(list(archive.search("budget", 10, until=tomorrow))) == 2
+
+
+def test_keyset_pages_cover_everything_once(archive):
+    for i in range(7):
+        archive.record(f"Standup {i}.", _minutes(f"Standup {i}", action_items=[(f"Task {i}", "Sam", None)]))
+
+    seen = []
+    cursor = None
+    while True:
+        page = _page(archive.action_items(3 + 1, before_id=cursor), 3, "id")
+        seen.extend(item["task"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"Task {i}" for i in reversed(range(7))]
+
+
+def test_action_item_ids_are_stable_across_identical_records(archive):
+    minutes = _minutes("Sync", action_items=[("Write notes", "Sam", "Friday")])
+    archive.record("A sync.", minutes)
+    first_ids = [item["id"] for item in archive.action_items(10)]
+    archive.record("A sync.", minutes)
+    archive.record("A sync.")
+    assert [item["id"] for item in archive.action_items(10)] == first_ids
+
+    archive.record("A sync.", _minutes("Sync", action_items=[("Write better notes", "Sam", "Friday")]))
+    assert [item["task"] for item in archive.action_items(10)] == ["Write better notes"]
+
+
+def test_action_items_filter_by_owner_and_resolved_due_date(archive):
+    today = date.today()
+    archive.record("Planning.", _minutes("Planning", action_items=[
+        ("Book the venue", "sam", "tomorrow"),
+        ("Draft the agenda", "Alex", (today + timedelta(days=30)).isoformat()),
+        ("Think about it", "Sam", "end of sprint"),
+    ]))
+
+    assert {item["task"] for item in archive.action_items(10, owner="SAM")} == {"Book the venue", "Think about it"}
+    due_soon = list(archive.action_items(10, due_before=today + timedelta(days=2)))
+    assert [item["task"] for item in due_soon] == ["Book the venue"]
+    assert due_soon[0]["due_date"] == (today + timedelta(days=1)).isoformat()
+
+
+def test_prefetch_runs_the_query_before_the_page_starts(archive):
+    archive.record("Budget talk.", _minutes("Budget"))
+    archive.record("Hiring talk.", _minutes("Hiring"))
+    rows = asyncio.run(prefetch(archive.search("talk", 3)))
+    assert [row["summary"] for row in rows] == ["Hiring", "Budget"]
+    assert list(asyncio.run(prefetch(archive.search("nothing", 3)))) == []
+
+    def broken():
+        raise sqlite3.OperationalError("database is locked")
+        yield
+
+    # The error surfaces before any of the response would have been sent
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(prefetch(broken()))
+
+
+def test_archive_endpoints(client):
+    transcript = "Decision: adopt the archive. Action: Quinn to index the minutes by tomorrow."
+    assert client.post("/generate-minutes", json={"transcript": transcript}).status_code == 200
+
+    results = client.get("/search", params={"q": "adopt archive"}).json()
+    assert results["items"]
+    meeting = client.get(f"/meetings/{results['items'][0]['meeting_id']}").json()
+    assert meeting["transcript"] == transcript
+
+    assert "items" in client.get("/action-items", params={"limit": 1}).json()
+    assert client.get("/search", params={"q": "  "}).status_code == 400
+    assert client.get("/meetings/999999").status_code == 404
+    assert client.get("/action-items", params={"limit": 0}).status_code == 422
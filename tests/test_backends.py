@@ -0,0 +1,64 @@
+import asyncio
+import random
+
+import pytest
+
+from agent import MeetingMinutes
+from backends import (
+    FakeASRBackend, FakeMinutesBackend, FakeProviderError, LatencyModel, create_asr_backend, create_minutes_backend
+)
+from config import config
+from transcription import transcription_cache_key
+
+
+def test_latency_specs():
+    rng = random.Random(0)
+    assert LatencyModel("fixed:1.5", rng).sample() == 1.5
+    assert 0.5 <= LatencyModel("uniform:0.5:2.0", rng).sample() <= 2.0
+    assert LatencyModel("exponential:0", rng).sample() == 0.0
+    assert LatencyModel("lognormal:1.0:0.5", rng).sample() > 0
+    with pytest.raises(ValueError):
+        LatencyModel("gaussian:1", rng)
+
+
+def test_fake_asr_depends_only_on_the_audio():
+    audio = b"RIFF" + bytes(range(256)) * 40
+    first, second = FakeASRBackend(), FakeASRBackend()
+    transcript = first.transcribe(audio)
+    first.transcribe(b"something else entirely")
+    assert second.transcribe(audio) == first.transcribe(audio) == transcript
+    assert FakeASRBackend().transcribe(audio + b"!") != transcript
+
+
+def test_fake_minutes_are_structured_and_deterministic():
+    backend = FakeMinutesBackend()
+
+    async def run(prompt):
+        return await backend.run("MeetingMinutesAgent", "", prompt, output_type=MeetingMinutes)
+
+    minutes = asyncio.run(run("We met."))
+    assert len(minutes.decisions) == config.FAKE_MINUTES_DECISIONS
+    assert len(minutes.action_items) == config.FAKE_MINUTES_ACTION_ITEMS
+    assert asyncio.run(run("We met.")) == minutes
+    assert isinstance(asyncio.run(backend.run("SummaryAgent", "", "We met.")), str)
+
+
+def test_injected_failures(monkeypatch):
+    monkeypatch.setattr(config, "FAKE_ASR_ERROR_RATE", 1.0)
+    with pytest.raises(FakeProviderError):
+        FakeASRBackend().transcribe(b"audio")
+
+
+def test_backends_are_chosen_by_name():
+    assert isinstance(create_asr_backend("fake"), FakeASRBackend)
+    assert isinstance(create_minutes_backend(), FakeMinutesBackend)
+    with pytest.raises(ValueError, match="Available"):
+        create_asr_backend("whisper")
+    with pytest.raises(ValueError, match="Available"):
+        create_minutes_backend("claude")
+
+
+def test_transcription_cache_key_includes_the_backend(monkeypatch):
+    key = transcription_cache_key("abc")
+    monkeypatch.setattr(config, "ASR_BACKEND", "huggingface")
+    assert transcription_cache_key("abc") != key
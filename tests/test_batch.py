@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+from config import config
+from uploads import ArchiveTooLargeError, SavedUpload, extract_audio_files
+
+
+def _zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def zip_path(tmp_path):
+    def write(members: dict) -> str:
+        path = tmp_path / "upload.zip"
+        path.write_bytes(_zip(members))
+        return str(path)
+    return write
+
+
+def _temp_files() -> set:
+    return set(os.listdir(tempfile.gettempdir()))
+
+
+def test_extracts_audio_members_in_order(zip_path):
+    path = zip_path({"b.wav": b"1" * 100, "notes.txt": b"skip me", "dir/a.mp3": b"2" * 50, "big.flac": b"3" * 5000})
+    results = extract_audio_files(path, max_size=1000, max_files=10, max_total_size=100_000)
+    try:
+        assert [name for name, _ in results] == ["b.wav", "dir/a.mp3", "big.flac"]
+        assert [member.size for _, member in results[:2]] == [100, 50]
+        assert "too large" in results[2][1]
+    finally:
+        for _, member in results:
+            if isinstance(member, SavedUpload):
+                os.unlink(member.path)
+
+
+def test_rejects_too_many_members_before_extracting(zip_path):
+    path = zip_path({f"{i}.wav": b"x" for i in range(5)})
+    before = _temp_files()
+    with pytest.raises(ArchiveTooLargeError):
+        extract_audio_files(path, max_files=4)
+    assert _temp_files() == before
+
+
+def test_rejects_declared_uncompressed_size_before_extracting(zip_path):
+    # Zeros compress to almost nothing: a small upload that would expand on disk
+    path = zip_path({"a.wav": bytes(400_000), "b.wav": bytes(400_000)})
+    assert os.path.getsize(path) < 10_000
+    before = _temp_files()
+    with pytest.raises(ArchiveTooLargeError):
+        extract_audio_files(path, max_size=1_000_000, max_total_size=500_000)
+    assert _temp_files() == before
+
+
+def test_corrupt_member_leaves_no_files(zip_path, monkeypatch):
+    path = zip_path({"a.wav": b"1" * 100, "b.wav": b"2" * 100})
+    infolist = zipfile.ZipFile.infolist
+
+    def corrupt_second(self):
+        members = infolist(self)
+        members[1].CRC ^= 1
+        return members
+
+    monkeypatch.setattr(zipfile.ZipFile, "infolist", corrupt_second)
+    before = _temp_files()
+    with pytest.raises(zipfile.BadZipFile):
+        extract_audio_files(path)
+    assert _temp_files() == before
+
+
+def test_batch_keeps_upload_order_and_isolates_failures(client):
+    files = [
+        ("files", ("first.wav", b"RIFF" + bytes(3000), "audio/wav")),
+        ("files", ("notes.txt", b"hello", "text/plain")),
+        ("files", ("meetings.zip", _zip({"m1.wav": b"RIFF" + bytes(2000), "m2.mp3": b"ID3" + bytes(2500)}),
+                   "application/zip")),
+        ("files", ("broken.zip", b"not a zip", "application/zip")),
+    ]
+    response = client.post("/transcribe-batch", files=files, data={"generate_minutes": "false"})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [result["filename"] for result in body["results"]] == [
+        "first.wav", "notes.txt", "meetings.zip/m1.wav", "meetings.zip/m2.mp3", "broken.zip"
+    ]
+    assert [result["success"] for result in body["results"]] == [True, False, True, True, False]
+    assert body["results"][4]["error"] == "Invalid zip archive"
+    assert (body["total"], body["succeeded"], body["failed"]) == (5, 3, 2)
+
+
+def test_batch_rejects_archives_over_the_file_limit(client, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_MAX_FILES", 2)
+    files = [("files", ("many.zip", _zip({f"{i}.wav": b"RIFF" for i in range(3)}), "application/zip"))]
+    response = client.post("/transcribe-batch", files=files)
+    assert response.status_code == 400
+    assert "Batch too large" in response.json()["detail"]
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import io
+import random
+import wave
+
+import pytest
+
+from benchmark import compare, make_wav, parse_mix, percentile, run_load, summarize, unique_audio
+
+
+def test_parse_mix():
+    assert parse_mix("transcribe=1, generate-minutes=3") == {"transcribe": 1.0, "generate-minutes": 3.0}
+    assert parse_mix("transcribe-only") == {"transcribe-only": 1.0}
+    with pytest.raises(SystemExit):
+        parse_mix("summarize=1")
+
+
+def test_percentiles_use_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile([], 0.99) == 0.0
+    assert summarize([1.0, 3.0])["mean"] == 2.0
+
+
+def test_generated_audio_is_valid_and_unique_per_request():
+    audio = make_wav(0.5, random.Random(0))
+    with wave.open(io.BytesIO(audio)) as wav_file:
+        assert (wav_file.getframerate(), wav_file.getnframes()) == (16000, 8000)
+    assert unique_audio(audio, 1) != unique_audio(audio, 2)
+    assert len(unique_audio(audio, 1)) == len(audio)
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {"requests_per_second": 100.0, "latency_seconds": {"overall": {"p95": 1.0}}}
+    within = {"requests_per_second": 95.0, "latency_seconds": {"overall": {"p95": 1.05}}}
+    worse = {"requests_per_second": 80.0, "latency_seconds": {"overall": {"p95": 1.5}}}
+    assert compare(within, baseline, 0.10) == []
+    assert len(compare(worse, baseline, 0.10)) == 2
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _Client:
+    def __init__(self):
+        self.paths = []
+
+    async def post(self, path, **kwargs):
+        self.paths.append(path)
+        await asyncio.sleep(0)
+        return _Response(503 if path == "/transcribe-only" else 200)
+
+
+def test_run_load_follows_the_mix_and_counts_errors():
+    args = argparse.Namespace(mix="transcribe-only=1,generate-minutes=1", seed=0, requests=20,
+                              concurrency=4, audio_seconds=0.1, repeat_inputs=False)
+    client = _Client()
+    results = asyncio.run(run_load(client, args))
+
+    failed = client.paths.count("/transcribe-only")
+    assert len(client.paths) == 20
+    assert results["failed_requests"] == failed
+    assert results["successful_requests"] == 20 - failed
+    assert results["status_codes"].get("503", 0) == failed
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+import wave
+
+import numpy as np
+
+from cache import ResultCache
+from config import config
+import pipeline
+from pipeline import transcribe_with_cache
+from transcription import transcription_cache_key
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_entries=1, max_disk_bytes=1 << 20)
+    cache.set("a", {"text": "first"})
+    cache.set("b", {"text": "second"})
+    assert cache.stats()["memory_entries"] == 1
+
+    # "a" was pushed out of memory but is still on disk
+    assert cache.get("a") == {"text": "first"}
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A new instance, like another server process, sees the same entries
+    other = ResultCache(str(tmp_path), max_memory_entries=10, max_disk_bytes=1 << 20)
+    assert other.get("b") == {"text": "second"}
+
+
+def test_expired_entries_are_misses_and_removed(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_entries=10, max_disk_bytes=1 << 20, ttl=0.05)
+    cache.set("a", "value")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert not os.path.exists(tmp_path / "a.json")
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    value = "x" * 1000
+    cache = ResultCache(str(tmp_path), max_memory_entries=1, max_disk_bytes=3500)
+    for key in ("a", "b", "c"):
+        cache.set(key, value)
+        time.sleep(0.01)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == value
+    cache.set("d", value)
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c", "d"]
+    assert cache.stats()["disk_bytes"] <= 3500
+
+
+def test_transcription_key_covers_backend_and_model(monkeypatch):
+    key = transcription_cache_key("abc")
+    assert transcription_cache_key("abc") == key
+    assert transcription_cache_key("abd") != key
+
+    monkeypatch.setattr(config, "ASR_BACKEND", "huggingface")
+    assert transcription_cache_key("abc") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(config, "TRANSCRIPTION_MODEL", "another-model")
+    assert transcription_cache_key("abc") != key
+
+
+def _write_wav(path: str, step: float) -> None:
+    samples = (np.sin(np.arange(16000 * 2) / step) * 8000).astype("<i2")
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(samples.tobytes())
+
+
+def test_identical_audio_is_transcribed_once(tmp_path):
+    path = str(tmp_path / "meeting.wav")
+    _write_wav(path, 5)
+
+    async def go():
+        first, first_cached = await transcribe_with_cache(path)
+        chunks = []
+        second, second_cached = await transcribe_with_cache(path, on_chunk=chunks.append)
+        return first, first_cached, second, second_cached, chunks
+
+    first, first_cached, second, second_cached, chunks = asyncio.run(go())
+    assert first.text and not first_cached
+    assert second_cached and second.text == first.text
+    assert chunks == [first.text]
+
+
+def test_concurrent_transcriptions_clean_up_their_pins(tmp_path):
+    path = str(tmp_path / "meeting.wav")
+    _write_wav(path, 7)
+
+    async def go():
+        return await asyncio.gather(transcribe_with_cache(path), transcribe_with_cache(path))
+
+    (first, _), (second, _) = asyncio.run(go())
+    assert first.text == second.text
+    # Only the caller's own file is left, and no chunk fanout outlives the call
+    assert os.listdir(tmp_path) == ["meeting.wav"]
+    assert not pipeline._chunk_fanouts
+
+
+def test_cache_write_failures_do_not_fail_the_transcription(tmp_path, monkeypatch):
+    path = str(tmp_path / "meeting.wav")
+    _write_wav(path, 9)
+
+    def full_disk(key, value):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(pipeline.transcription_cache, "set", full_disk)
+    result, cached = asyncio.run(transcribe_with_cache(path))
+    assert result.text and not cached
@@ -0,0 +1,85 @@
+import io
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from audio import PCMAudio, split_windows
+from transcription import TranscriptStitcher, _transcribe_chunks, stitch_transcripts
+
+RATE = 1000
+
+
+def _counting_audio(seconds: int) -> PCMAudio:
+    # Every sample in second n has the value n, so a window's content says where it came from
+    samples = np.repeat(np.arange(seconds, dtype="<i2"), RATE)
+    return PCMAudio(frames=samples.tobytes(), sample_rate=RATE, channels=1, sample_width=2)
+
+
+class SecondsASR:
+    """Transcribes each second of audio as the word "s<n>", slowest for the earliest windows"""
+
+    name = "seconds"
+
+    def __init__(self):
+        self.threads = set()
+
+    def transcribe(self, audio: bytes) -> str:
+        self.threads.add(threading.get_ident())
+        with wave.open(io.BytesIO(audio)) as wav_file:
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+        seconds = samples[::RATE]
+        time.sleep(0.05 * (10 - int(seconds[0])) / 10)
+        return " ".join(f"s{second}" for second in seconds)
+
+
+def test_stitcher_drops_repeated_overlap():
+    stitcher = TranscriptStitcher()
+    assert stitcher.add("the quick brown fox jumps") == "the quick brown fox jumps"
+    assert stitcher.add("fox jumps over the lazy dog") == "over the lazy dog"
+    assert stitcher.text == "the quick brown fox jumps over the lazy dog"
+
+
+def test_stitcher_ignores_case_punctuation_and_a_cut_leading_word():
+    texts = ["We agreed to ship the release.", "ase ship the release on Friday, then review."]
+    assert stitch_transcripts(texts) == "We agreed to ship the release. on Friday, then review."
+
+
+def test_stitcher_keeps_text_without_overlap():
+    assert stitch_transcripts(["one two three", "four five"]) == "one two three four five"
+    assert stitch_transcripts(["", "four five", ""]) == "four five"
+
+
+def test_split_windows_overlap_and_cover_the_audio():
+    audio = _counting_audio(10)
+    windows = split_windows(audio, window_seconds=4, overlap_seconds=1)
+    starts = [int(np.frombuffer(window.frames, dtype="<i2")[0]) for window in windows]
+    assert starts == [0, 3, 6]
+    assert windows[-1].duration == 4
+    assert np.frombuffer(windows[-1].frames, dtype="<i2")[-1] == 9
+
+
+def test_split_windows_share_the_decoded_buffer():
+    audio = _counting_audio(10)
+    window = split_windows(audio, window_seconds=4, overlap_seconds=1)[1]
+    assert isinstance(window.frames, memoryview)
+    assert window.frames.obj is audio.frames
+
+
+def test_split_windows_rejects_overlap_as_long_as_the_window():
+    with pytest.raises(ValueError):
+        split_windows(_counting_audio(5), window_seconds=2, overlap_seconds=2)
+
+
+def test_chunks_are_encoded_in_workers_and_stitched_in_order():
+    asr = SecondsASR()
+    windows = split_windows(_counting_audio(12), window_seconds=4, overlap_seconds=2)
+    pieces = []
+
+    text = _transcribe_chunks(asr, windows, on_chunk=pieces.append)
+
+    assert text == " ".join(f"s{second}" for second in range(12))
+    assert " ".join(pieces) == text
+    assert threading.get_ident() not in asr.threads
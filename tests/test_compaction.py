@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from agent import (
+    TokenBudgetExceededError, compact_transcript, estimate_tokens, generate_meeting_minutes, prepare_transcript
+)
+from config import config
+
+
+def test_repeated_phrases_are_collapsed():
+    assert compact_transcript("thank you thank you thank you for coming") == "thank you for coming"
+    assert compact_transcript("We should, we should ship it.") == "We should, ship it."
+    # A doubled word can be grammatical; a tripled one is not
+    assert compact_transcript("what it had had had done") == "what it had had done"
+
+
+def test_whitespace_is_normalized_per_line():
+    assert compact_transcript("Alice:   hello   there\n\n   \nBob:  hi ") == "Alice: hello there\nBob: hi"
+
+
+def test_fillers_are_only_stripped_when_enabled(monkeypatch):
+    transcript = "So, um, the launch is, you know, late, uh, again."
+    assert compact_transcript(transcript) == transcript
+    monkeypatch.setattr(config, "COMPACT_STRIP_FILLERS", True)
+    assert compact_transcript(transcript) == "So the launch is late again."
+
+
+def test_prepare_reports_tokens_saved():
+    transcript = "Alice: the budget the budget the budget is fine.\n" * 3
+    compacted, metadata = prepare_transcript(transcript)
+    assert metadata["input_tokens"] == estimate_tokens(transcript)
+    assert metadata["compacted_tokens"] == estimate_tokens(compacted)
+    assert metadata["tokens_saved"] > 0
+
+
+def test_token_budget_is_enforced_after_compaction(monkeypatch):
+    monkeypatch.setattr(config, "MINUTES_MAX_INPUT_TOKENS", 20)
+    # Long only because of an ASR loop, so it fits once compacted
+    prepare_transcript("We agreed to ship on Friday. " + "okay okay okay " * 50)
+    with pytest.raises(TokenBudgetExceededError):
+        prepare_transcript(" ".join(f"word{i}" for i in range(100)))
+
+    with pytest.raises(TokenBudgetExceededError):
+        asyncio.run(generate_meeting_minutes(" ".join(f"word{i}" for i in range(100))))
+
+
+def test_over_budget_transcripts_are_refused_with_413(client, monkeypatch):
+    monkeypatch.setattr(config, "MINUTES_MAX_INPUT_TOKENS", 20)
+    for mode in ("llm", "hybrid"):
+        response = client.post("/generate-minutes", json={
+            "transcript": "Decision: ship it. " + " ".join(f"word{i}" for i in range(100)), "mode": mode
+        })
+        assert response.status_code == 413
+        assert "over the budget" in response.json()["detail"]
+
+
+def test_minutes_report_token_counts():
+    minutes = asyncio.run(generate_meeting_minutes("Decision: ship it ship it ship it on Friday."))
+    assert minutes["metadata"]["tokens_saved"] > 0
@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+import time
+
+import jobs
+from jobs import COMPLETED, FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+
+def _wait_for_job(client, job_id: str, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in (QUEUED, RUNNING) or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_store_claims_oldest_queued_job_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.create(None, None, "first", True)
+    store.create(None, None, "second", False)
+
+    claimed = store.claim_next("worker-a", lease=60)
+    assert claimed["id"] == first["id"]
+    assert claimed["status"] == RUNNING and claimed["owner"] == "worker-a"
+    assert store.claim_next("worker-b", lease=60)["transcript"] == "second"
+    assert store.claim_next("worker-b", lease=60) is None
+
+
+def test_store_round_trips_results_and_counts(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create(None, None, "hello", True)
+    store.update(job["id"], status=COMPLETED, result={"transcript": "hello"}, stage_timings={"minutes": 0.5})
+
+    stored = store.get(job["id"])
+    assert stored["result"] == {"transcript": "hello"}
+    assert stored["stage_timings"] == {"minutes": 0.5}
+    assert stored["generate_minutes"] is True
+    assert store.counts() == {COMPLETED: 1}
+    assert store.get("missing") is None
+
+
+def test_expired_leases_are_taken_over(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create(None, None, "hello", True)
+    store.claim_next("worker-a", lease=-1)
+
+    # worker-a stopped renewing, so worker-b may run the job
+    claimed = store.claim_next("worker-b", lease=60)
+    assert claimed["id"] == job["id"] and claimed["owner"] == "worker-b"
+    store.renew_leases("worker-b", lease=60)
+    assert store.claim_next("worker-c", lease=60) is None
+
+
+def test_requeue_only_touches_the_owners_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    for transcript in ("a", "b"):
+        store.create(None, None, transcript, True)
+    store.claim_next("worker-a", lease=60)
+    store.claim_next("worker-b", lease=60)
+
+    assert store.requeue_running("worker-a") == 1
+    requeued = store.claim_next("worker-c", lease=60)
+    assert requeued["transcript"] == "a"
+    assert store.counts() == {RUNNING: 2}
+
+
+def test_databases_from_before_leases_are_migrated(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT, audio_path TEXT, "
+            "audio_sha256 TEXT, transcript TEXT, generate_minutes INTEGER NOT NULL, result TEXT, error TEXT, "
+            "stage_timings TEXT NOT NULL DEFAULT '{}', created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO jobs (id, status, generate_minutes, created_at) VALUES ('old', 'queued', 1, 0)")
+    conn.close()
+
+    store = JobStore(path)
+    assert store.claim_next("worker-a", lease=60)["id"] == "old"
+    assert store.get("old")["owner"] == "worker-a"
+
+
+def test_stop_requeues_jobs_that_do_not_finish(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    queue = JobQueue(store, workers=1, poll_interval=0.01, lease=60)
+
+    async def hang(transcript):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs, "generate_minutes_with_cache", hang)
+
+    async def go():
+        await queue.start()
+        job = await queue.submit(transcript="A long meeting.")
+        while store.get(job["id"])["status"] != RUNNING:
+            await asyncio.sleep(0.01)
+        await queue.stop(timeout=0.05)
+        return store.get(job["id"])
+
+    job = asyncio.run(go())
+    assert job["status"] == QUEUED and job["owner"] is None
+
+
+def test_worker_survives_a_job_it_cannot_record(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    queue = JobQueue(store, workers=1, poll_interval=0.01, lease=60)
+    update = store.update
+
+    async def minutes(transcript):
+        if transcript == "bad":
+            raise ValueError("model failed")
+        return {"summary": transcript}, False
+
+    def flaky_update(job_id, **fields):
+        if fields.get("status") == FAILED:
+            raise sqlite3.OperationalError("database is locked")
+        update(job_id, **fields)
+
+    monkeypatch.setattr(jobs, "generate_minutes_with_cache", minutes)
+    monkeypatch.setattr(store, "update", flaky_update)
+
+    async def go():
+        await queue.start()
+        await queue.submit(transcript="bad")
+        job = await queue.submit(transcript="good")
+        while store.get(job["id"])["status"] != COMPLETED:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(asyncio.wait_for(go(), 5))
+
+
+def test_transcript_job_runs_in_the_background(client):
+    response = client.post("/jobs", data={"transcript": "Decision: ship on Friday. Action: Sam to write the notes."})
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status_url"] == f"/jobs/{body['job_id']}"
+
+    job = _wait_for_job(client, body["job_id"])
+    assert job["status"] == COMPLETED
+    assert job["result"]["meeting_minutes"]["summary"]
+    assert "minutes" in job["stage_timings"]
+
+
+def test_audio_job_transcribes_the_upload(client):
+    response = client.post(
+        "/jobs",
+        files={"file": ("meeting.wav", b"RIFF" + bytes(2000), "audio/wav")},
+        data={"generate_minutes": "false"}
+    )
+    job = _wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == COMPLETED
+    assert job["result"]["transcript"]
+    assert job["result"]["meeting_minutes"] == {}
+
+
+def test_job_requests_need_exactly_one_input(client):
+    assert client.post("/jobs").status_code == 400
+    assert client.post("/jobs", data={"transcript": "  "}).status_code == 400
+    assert client.get("/jobs/does-not-exist").status_code == 404
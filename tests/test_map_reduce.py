@@ -0,0 +1,74 @@
+import asyncio
+
+import agent
+from agent import (
+    ActionItem, dedupe_action_items, dedupe_decisions, estimate_tokens, generate_meeting_minutes, split_transcript
+)
+from config import config
+
+TRANSCRIPT = " ".join(
+    f"Item {i}: the team went through open question number {i} in some detail." for i in range(40)
+)
+
+
+def test_split_respects_budget_and_sentence_boundaries():
+    chunks = split_transcript(TRANSCRIPT, max_tokens=60)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 60 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == TRANSCRIPT
+
+
+def test_split_breaks_an_overlong_sentence_on_words():
+    sentence = " ".join(["word"] * 200)
+    chunks = split_transcript(sentence, max_tokens=20)
+    assert all(estimate_tokens(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks).split() == sentence.split()
+
+
+def test_dedupe_keeps_first_and_fills_missing_fields():
+    assert dedupe_decisions(["Ship v2 on Friday.", "ship v2 on friday", "Ship v3 on Friday."]) == [
+        "Ship v2 on Friday.", "Ship v3 on Friday."
+    ]
+    items = dedupe_action_items([
+        ActionItem(task="Write the release notes", owner="Sam", due=None),
+        ActionItem(task="write the release notes.", owner=None, due="Friday"),
+        ActionItem(task="Write the release notes", owner="Alex", due=None),
+    ])
+    assert [(item.task, item.owner, item.due) for item in items] == [
+        ("Write the release notes", "Sam", "Friday"),
+        ("Write the release notes", "Alex", None),
+    ]
+
+
+def test_long_transcripts_are_mapped_then_reduced(monkeypatch):
+    monkeypatch.setattr(config, "MINUTES_CHUNK_TOKENS", 100)
+    calls = []
+    run_agent = agent._run_agent
+
+    async def recording_run_agent(agent_name, *args, **kwargs):
+        calls.append(agent_name)
+        return await run_agent(agent_name, *args, **kwargs)
+
+    monkeypatch.setattr(agent, "_run_agent", recording_run_agent)
+    minutes = asyncio.run(generate_meeting_minutes(TRANSCRIPT))
+
+    chunks = len(split_transcript(agent.compact_transcript(TRANSCRIPT), 100))
+    assert calls.count("MeetingMinutesChunkAgent") == chunks > 1
+    assert calls[-1] == "MeetingMinutesReduceAgent"
+    assert "error" not in minutes and minutes["summary"]
+    # The fake backend repeats decisions across chunks; they are merged
+    assert len(minutes["decisions"]) == len(set(minutes["decisions"]))
+
+
+def test_short_transcripts_take_a_single_call(monkeypatch):
+    calls = []
+    run_agent = agent._run_agent
+
+    async def recording_run_agent(agent_name, *args, **kwargs):
+        calls.append(agent_name)
+        return await run_agent(agent_name, *args, **kwargs)
+
+    monkeypatch.setattr(agent, "_run_agent", recording_run_agent)
+    asyncio.run(generate_meeting_minutes("A short meeting. Nothing was decided."))
+    assert calls == ["MeetingMinutesAgent"]
@@ -0,0 +1,48 @@
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def test_counters_gauges_and_callbacks_render():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"quoted"')
+    registry.gauge("queue_depth", "Queued", function=lambda: 7)
+    assert registry.counter("requests_total", "Requests", ["route"]) is requests
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 1' in text
+    assert 'requests_total{route="/b\\"quoted\\""} 2' in text
+    assert "queue_depth 7" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, stage="asr")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="asr",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="asr",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="asr",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="asr"} 5.55' in lines
+    assert 'latency_seconds_count{stage="asr"} 3' in lines
+
+
+def test_labels_must_match():
+    counter = MetricsRegistry().counter("errors_total", "Errors", ["kind"])
+    with pytest.raises(ValueError):
+        counter.inc(provider="fake")
+
+
+def test_metrics_endpoint_labels_requests_by_route(client):
+    client.get("/jobs/not-a-job")
+    client.post("/generate-minutes", json={"transcript": "A metrics check. Decision: keep the dashboards."})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/jobs/{job_id}",status="404"' in response.text
+    assert 'mma_stage_duration_seconds_count{stage="minutes"}' in response.text
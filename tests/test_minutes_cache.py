@@ -0,0 +1,56 @@
+import asyncio
+
+import agent
+import pipeline
+from agent import _minutes_fingerprint, minutes_cache_key
+from config import config
+from pipeline import generate_minutes_with_cache
+
+
+def test_key_ignores_whitespace_but_not_words_or_mode():
+    key = minutes_cache_key("Alice: hello   there\nBob: hi", "llm")
+    assert minutes_cache_key(" Alice: hello there Bob:  hi ", "llm") == key
+    assert minutes_cache_key("Alice: hello there Bob: bye", "llm") != key
+    assert minutes_cache_key("Alice: hello there Bob: hi", "hybrid") != key
+
+
+def test_fingerprint_covers_backend_model_and_instructions(monkeypatch):
+    fingerprint = _minutes_fingerprint()
+    monkeypatch.setattr(config, "MINUTES_BACKEND", "openai")
+    assert _minutes_fingerprint() != fingerprint
+    monkeypatch.undo()
+
+    monkeypatch.setattr(config, "MINUTES_MODEL", "another-model")
+    assert _minutes_fingerprint() != fingerprint
+    monkeypatch.undo()
+
+    monkeypatch.setattr(agent, "MINUTES_INSTRUCTIONS", "Write a haiku.")
+    assert _minutes_fingerprint() != fingerprint
+
+
+def test_repeat_transcript_is_served_from_cache():
+    transcript = "We agreed to move the launch to March. Dana will update the plan."
+
+    async def go():
+        return [await generate_minutes_with_cache(transcript, "llm") for _ in range(2)]
+
+    (first, first_cached), (second, second_cached) = asyncio.run(go())
+    assert "summary" in first and not first_cached
+    assert second == first and second_cached
+
+
+def test_failed_generations_are_not_cached(monkeypatch):
+    calls = []
+
+    async def failing(transcript):
+        calls.append(transcript)
+        return {"summary": "", "decisions": [], "action_items": [], "error": "provider down"}
+
+    monkeypatch.setattr(pipeline, "generate_meeting_minutes", failing)
+
+    async def go():
+        return [await generate_minutes_with_cache("A transcript nobody has seen.", "llm") for _ in range(2)]
+
+    results = asyncio.run(go())
+    assert [cached for _, cached in results] == [False, False]
+    assert len(calls) == 2
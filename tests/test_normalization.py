@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import audio as audio_module
+from audio import PCMAudio, is_normalized, normalize_audio, resample
+
+RATE = 16000
+
+
+def _tone(frequency: float, rate: int, seconds: float = 1.0) -> np.ndarray:
+    return np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+
+def _amplitude(samples: np.ndarray) -> float:
+    # RMS of the middle, away from the filter's edge effects
+    middle = samples[len(samples) // 4:-len(samples) // 4]
+    return float(np.sqrt(np.mean(middle ** 2)) * np.sqrt(2))
+
+
+@pytest.mark.parametrize("sample_width,dtype,scale,offset", [
+    (1, np.uint8, 127, 128),
+    (2, "<i2", 32767, 0),
+    (4, "<i4", 2 ** 31 - 1, 0),
+])
+def test_to_mono_float_scales_each_width(sample_width, dtype, scale, offset):
+    values = np.array([0.0, 0.5, -0.5, 1.0])
+    frames = (values * scale + offset).astype(dtype).tobytes()
+    samples = PCMAudio(frames, RATE, 1, sample_width).to_mono_float()
+    assert samples.dtype == np.float32
+    np.testing.assert_allclose(samples, values, atol=0.01)
+
+
+def test_to_mono_float_reads_24_bit_and_downmixes():
+    # Left at +0.5 and right at -0.25 in signed 24-bit little endian
+    left, right = int(0.5 * (1 << 23)), int(-0.25 * (1 << 23)) & 0xFFFFFF
+    frame = left.to_bytes(3, "little") + right.to_bytes(3, "little")
+    samples = PCMAudio(frame * 4, RATE, 2, 3).to_mono_float()
+    np.testing.assert_allclose(samples, [0.125] * 4, atol=1e-6)
+
+
+def test_resample_keeps_speech_band_and_removes_aliases():
+    speech = resample(_tone(440, 44100), 44100, RATE)
+    assert len(speech) == RATE
+    assert _amplitude(speech) == pytest.approx(1.0, abs=0.05)
+
+    # 12 kHz is above the new 8 kHz Nyquist frequency and would alias to 4 kHz
+    alias = resample(_tone(12000, 48000), 48000, RATE)
+    assert _amplitude(alias) < 0.05
+
+
+def test_resample_blocks_match_one_pass(monkeypatch):
+    samples = _tone(300, 22050, 2)
+    whole = resample(samples, 22050, RATE)
+    monkeypatch.setattr(audio_module, "_RESAMPLE_BLOCK", 1000)
+    np.testing.assert_array_equal(resample(samples, 22050, RATE), whole)
+
+
+def test_normalize_audio():
+    stereo = np.repeat(_tone(440, 44100) * 0.5, 2)
+    audio = PCMAudio((stereo * 32767).astype("<i2").tobytes(), 44100, 2, 2)
+    normalized = normalize_audio(audio)
+
+    assert is_normalized(normalized)
+    assert normalized.duration == pytest.approx(1.0)
+    assert _amplitude(normalized.to_mono_float()) == pytest.approx(0.5, abs=0.03)
+    assert normalize_audio(normalized) is normalized
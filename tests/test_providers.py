@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from backends import FakeASRBackend, FakeMinutesBackend
+from providers import ProviderRegistry
+
+
+def test_backends_are_built_once_and_shared():
+    registry = ProviderRegistry()
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(registry.asr())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(seen[0], FakeASRBackend)
+    assert all(backend is seen[0] for backend in seen)
+    assert registry.minutes() is registry.minutes()
+
+
+def test_start_builds_both_and_close_releases_them():
+    registry = ProviderRegistry()
+    assert not registry.ready()
+
+    async def go():
+        await registry.start()
+        ready = registry.ready()
+        minutes = await registry.load_minutes()
+        await registry.close()
+        return ready, minutes
+
+    ready, minutes = asyncio.run(go())
+    assert ready
+    assert isinstance(minutes, FakeMinutesBackend)
+    assert not registry.ready()
+
+
+def test_warmup_failure_is_logged_not_raised(monkeypatch, caplog):
+    registry = ProviderRegistry()
+
+    async def unreachable(self):
+        raise ConnectionError("provider unreachable")
+
+    monkeypatch.setattr(FakeASRBackend, "warmup", unreachable)
+    asyncio.run(registry.warmup())
+    assert "Could not pre-warm fake connection" in caplog.text
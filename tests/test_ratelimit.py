@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from config import config
+from ratelimit import (
+    AdmissionController, ClientRateLimiter, OverloadedError, RateLimitMiddleware, TokenBucket, client_id,
+    process_share
+)
+
+
+def test_token_bucket_refuses_when_empty():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert 0 < bucket.take() <= 1
+
+
+def test_limiter_tracks_clients_separately_and_forgets_the_oldest():
+    limiter = ClientRateLimiter(requests_per_minute=1, burst=1, max_clients=2)
+    assert limiter.check("a") == 0
+    assert limiter.check("a") > 0
+    assert limiter.check("b") == 0
+    assert limiter.check("c") == 0
+    # "a" was evicted, so it starts again with a full bucket
+    assert limiter.check("a") == 0
+
+
+def test_process_share():
+    assert process_share(60, 4) == 15
+    assert process_share(3, 4) == 1
+    assert process_share(0.5, 4) == 0.5
+    assert process_share(10, 0) == 10
+
+
+def test_admission_queues_then_refuses():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+
+    async def go():
+        async with admission.slot():
+            # One waiter fits in the queue but times out; with it waiting, the next is refused outright
+            waiter = asyncio.create_task(admission.slot().__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(OverloadedError):
+                async with admission.slot():
+                    pass
+            with pytest.raises(OverloadedError):
+                await waiter
+        return admission.stats()
+
+    stats = asyncio.run(go())
+    assert (stats["running"], stats["waiting"]) == (0, 0)
+
+
+def _app(limiter, admission):
+    app = FastAPI()
+
+    @app.post("/work")
+    async def work(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/cheap")
+    async def cheap():
+        return {}
+
+    return RateLimitMiddleware(app, limiter, admission, limited_paths=["/work", "/cheap"], pipeline_paths=["/work"])
+
+
+def _post(app, path, **kwargs):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+    return asyncio.run(go())
+
+
+def test_only_configured_api_keys_identify_a_client(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_API_KEYS", {"known"})
+    scope = {"headers": [(b"x-api-key", b"known")], "client": ("10.0.0.1", 1234)}
+    assert client_id(scope) == "key:known"
+    # A made-up key doesn't get its own bucket
+    scope["headers"] = [(b"x-api-key", b"made-up")]
+    assert client_id(scope) == "ip:10.0.0.1"
+
+
+def test_middleware_rate_limits_per_client(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_API_KEYS", {"one", "two"})
+    app = _app(ClientRateLimiter(60, 1, 10), AdmissionController(1, 0, 0.1))
+    assert _post(app, "/cheap", headers={"X-API-Key": "one"}).status_code == 200
+    refused = _post(app, "/cheap", headers={"X-API-Key": "one"})
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "1"
+    assert _post(app, "/cheap", headers={"X-API-Key": "two"}).status_code == 200
+    # Unknown keys fall back to the caller's address, which has spent its burst already
+    assert _post(app, "/cheap").status_code == 200
+    assert _post(app, "/cheap", headers={"X-API-Key": "three"}).status_code == 429
+
+
+def test_middleware_refuses_pipeline_requests_when_full():
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.1)
+    app = _app(ClientRateLimiter(6000, 100, 10), admission)
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.post("/work", content=b"abc")).json() == {"size": 3}
+            async with admission.slot():
+                busy = await client.post("/work", content=b"abc")
+                # Requests outside the pipeline are not held back by it
+                cheap = await client.post("/cheap")
+            return busy, cheap
+
+    busy, cheap = asyncio.run(go())
+    assert busy.status_code == 429
+    assert "Retry-After" in busy.headers
+    assert cheap.status_code == 200
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, ProviderPolicy, is_retryable
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _policy(retries=2, threshold=5, reset=60.0, **kwargs) -> ProviderPolicy:
+    return ProviderPolicy("test", retries=retries, base_delay=0, max_delay=0,
+                          breaker=CircuitBreaker("test", threshold, reset), **kwargs)
+
+
+def _flaky(failures: int, error: Exception = None):
+    calls = []
+
+    def func(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise error or ConnectionError("connection reset")
+        return value * 2
+
+    return func, calls
+
+
+def test_retryable_errors():
+    assert is_retryable(ConnectionError())
+    assert is_retryable(_HTTPError(503))
+    assert is_retryable(_HTTPError(429))
+    assert not is_retryable(_HTTPError(400))
+    assert not is_retryable(CircuitOpenError())
+
+
+def test_transient_failures_are_retried():
+    func, calls = _flaky(2)
+    assert _policy(retries=2).call(func, 21) == 42
+    assert len(calls) == 3
+
+
+def test_retries_give_up_with_the_last_error():
+    func, calls = _flaky(5)
+    with pytest.raises(ConnectionError):
+        _policy(retries=2).call(func, 1)
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried_or_counted_against_the_provider():
+    policy = _policy(threshold=1)
+    func, calls = _flaky(1, _HTTPError(400))
+    with pytest.raises(_HTTPError):
+        policy.call(func, 1)
+    assert len(calls) == 1
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast_without_calling():
+    policy = _policy(retries=0, threshold=1)
+    func, calls = _flaky(10)
+    with pytest.raises(ConnectionError):
+        policy.call(func, 1)
+    with pytest.raises(CircuitOpenError):
+        policy.call(func, 1)
+    assert len(calls) == 1
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker()
+    for value in range(1, 10):
+        tracker.record(value)
+    assert tracker.percentile(0.5, min_samples=10) is None
+    tracker.record(10)
+    assert tracker.percentile(0.9, min_samples=10) == 10
+
+
+def test_slow_calls_are_hedged():
+    policy = _policy(hedging=True, hedge_min_samples=1)
+    policy.latency.record(0.01)
+    first_call = threading.Event()
+
+    def func(value):
+        # The first call hangs; its duplicate answers straight away
+        if not first_call.is_set():
+            first_call.set()
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    start = time.perf_counter()
+    assert policy.call(func, 1) == "fast"
+    assert time.perf_counter() - start < 0.5
+
+
+def test_async_calls_retry_and_hedge():
+    policy = _policy(hedging=True, hedge_min_samples=1)
+    policy.latency.record(0.01)
+    calls = []
+
+    async def func(value):
+        calls.append(value)
+        if len(calls) == 1:
+            raise ConnectionError("connection reset")
+        if len(calls) == 2:
+            await asyncio.sleep(1)
+            return "slow"
+        return "fast"
+
+    assert asyncio.run(policy.call_async(func, 1)) == "fast"
+    assert len(calls) == 3
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import rules
+from rules import extract_minutes, generate_hybrid_minutes, parse_action_item, resolve_due_date
+
+# A Wednesday
+MEETING_DAY = date(2025, 3, 12)
+
+STRUCTURED = """
+Meeting started at 10:00 AM.
+John discussed the new project timeline and mentioned we need to start next week.
+Decision: Project will start next week as planned.
+- Decision: budget review meeting scheduled for Friday.
+Action: John to prepare detailed project plan by Friday.
+Action item: Sarah Lee will review the budget spreadsheet before March 3rd.
+"""
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("John to prepare the plan by Friday.", ("Prepare the plan", "John", "Friday")),
+    ("Sarah Lee will review the budget before end of the month", ("Review the budget", "Sarah Lee", "end of the month")),
+    ("Priya: update the docs", ("Update the docs", "Priya", None)),
+    ("We need to book a room by tomorrow", ("Book a room", None, "tomorrow")),
+    ("send the recap due on 2025-04-01", ("Send the recap", None, "2025-04-01")),
+])
+def test_parse_action_item(text, expected):
+    item = parse_action_item(text)
+    assert (item.task, item.owner, item.due) == expected
+
+
+@pytest.mark.parametrize("due,expected", [
+    ("Friday", date(2025, 3, 14)),
+    ("next Wednesday", date(2025, 3, 19)),
+    ("tomorrow", date(2025, 3, 13)),
+    ("EOD", MEETING_DAY),
+    ("end of the week", date(2025, 3, 14)),
+    ("next week", date(2025, 3, 17)),
+    ("end of month", date(2025, 3, 31)),
+    ("next month", date(2025, 4, 1)),
+    ("Q1", date(2025, 3, 31)),
+    ("Q4", date(2025, 12, 31)),
+    ("March 20th", date(2025, 3, 20)),
+    ("3rd of March", date(2026, 3, 3)),
+    ("Jan 5, 2027", date(2027, 1, 5)),
+    ("2025-06-30", date(2025, 6, 30)),
+    ("February 30", None),
+    ("3/4", None),
+    ("end of sprint", None),
+])
+def test_resolve_due_date(due, expected):
+    assert resolve_due_date(due, MEETING_DAY) == expected
+
+
+def test_extracts_marked_decisions_and_action_items():
+    extraction = extract_minutes(STRUCTURED)
+    minutes = extraction.minutes
+    assert minutes.decisions == [
+        "Project will start next week as planned.", "Budget review meeting scheduled for Friday."
+    ]
+    assert [(item.owner, item.due) for item in minutes.action_items] == [
+        ("John", "Friday"), ("Sarah Lee", "March 3rd")
+    ]
+    assert minutes.summary.endswith("2 decision(s) and 2 action item(s) were recorded.")
+    # The unmarked "we need to start next week" isn't a commitment with a due date
+    assert extraction.confidence == 1.0
+
+
+def test_unmarked_commitments_lower_confidence():
+    extraction = extract_minutes("Decision: ship it. We agreed to freeze the branch. Action: write the notes.")
+    # One decision, one action item without an owner, one missed decision
+    assert extraction.confidence == round(1.5 / 3, 3)
+    assert extract_minutes("Just a chat about the weather.").confidence == 0.0
+
+
+def test_hybrid_only_asks_the_model_for_a_summary(monkeypatch):
+    calls = []
+
+    async def summarize(transcript):
+        calls.append("summary")
+        return "A model-written summary."
+
+    async def full_minutes(transcript):
+        calls.append("full")
+        return {"summary": "", "decisions": [], "action_items": []}
+
+    monkeypatch.setattr(rules, "summarize_transcript", summarize)
+    monkeypatch.setattr(rules, "generate_meeting_minutes", full_minutes)
+
+    minutes = asyncio.run(generate_hybrid_minutes(STRUCTURED))
+    assert minutes["summary"] == "A model-written summary."
+    assert len(minutes["action_items"]) == 2
+    assert calls == ["summary"]
+
+    asyncio.run(generate_hybrid_minutes("We agreed on nothing in particular, and everyone will follow up by Friday."))
+    assert calls == ["summary", "full"]
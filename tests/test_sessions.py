@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+import sessions
+from agent import ActionItem, MeetingMinutes
+from sessions import SessionLimitError, SessionManager, SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_store_limits_active_sessions(store):
+    first = store.create(max_active=1)
+    assert first and store.create(max_active=1) is None
+    store.delete(first)
+    assert store.create(max_active=1)
+
+
+def test_update_lease_is_exclusive(store):
+    session_id = store.create(max_active=10)
+    assert store.claim_update(session_id, lease=60) is True
+    assert store.claim_update(session_id, lease=60) is False
+    store.finish_update(session_id, error="provider down")
+    assert store.claim_update(session_id, lease=60) is True
+    assert store.claim_update("missing", lease=60) is None
+    # An expired lease, left by a process that died, can be taken over
+    store.renew_update(session_id, lease=-1)
+    assert store.claim_update(session_id, lease=60) is True
+
+
+def test_expired_sessions_are_gone(store):
+    session_id = store.create(max_active=10)
+    assert store.append(session_id, "hello", ttl=60)
+    assert store.get(session_id, ttl=-1) is None
+    assert not store.append(session_id, "hello", ttl=-1)
+    assert store.expire(ttl=-1) == 1
+
+
+def test_updates_fold_only_the_new_segments(store, monkeypatch):
+    deltas = []
+
+    async def update(minutes, delta):
+        deltas.append(delta)
+        return MeetingMinutes(
+            summary=f"{minutes.summary} {delta}".strip(),
+            decisions=minutes.decisions,
+            action_items=minutes.action_items + [ActionItem(task=delta, owner=None, due=None)]
+        )
+
+    monkeypatch.setattr(sessions, "update_meeting_minutes", update)
+    manager = SessionManager(store, update_tokens=5, ttl=60, max_active=10)
+
+    async def go():
+        session = await manager.create()
+        await manager.append(session.id, "Short.")
+        assert deltas == []
+        await manager.append(session.id, "Now there is enough new text to update.")
+        # The update runs in the background
+        while (await manager.get(session.id)).version == 0:
+            await asyncio.sleep(0.01)
+        await manager.append(session.id, "Tail.")
+        await manager.refresh(session.id)
+        refreshed = await manager.get(session.id)
+        closed = await manager.close(session.id)
+        return refreshed, closed, await manager.get(session.id)
+
+    refreshed, closed, after_close = asyncio.run(go())
+    assert deltas == ["Short. Now there is enough new text to update.", "Tail."]
+    assert refreshed.version == 2 and refreshed.pending_text() == ""
+    assert len(closed.minutes.action_items) == 2
+    assert closed.transcript() == "Short. Now there is enough new text to update. Tail."
+    assert after_close is None
+
+
+def test_failed_update_keeps_text_pending(store, monkeypatch):
+    async def failing(minutes, delta):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(sessions, "update_meeting_minutes", failing)
+    manager = SessionManager(store, update_tokens=1000, ttl=60, max_active=1)
+
+    async def go():
+        session = await manager.create()
+        await manager.append(session.id, "Something was said.")
+        await manager.refresh(session.id)
+        with pytest.raises(SessionLimitError):
+            await manager.create()
+        return await manager.get(session.id)
+
+    session = asyncio.run(go())
+    assert session.last_error == "provider down"
+    assert session.pending_text() == "Something was said."
+    assert session.version == 0
+
+
+def test_session_endpoints(client):
+    session = client.post("/sessions").json()
+    session_id = session["session_id"]
+    assert session["meeting_minutes"]["summary"] == ""
+
+    response = client.post(f"/sessions/{session_id}/segments", json={"text": "Decision: use live sessions."})
+    assert response.json()["segments"] == 1
+    assert client.post(f"/sessions/{session_id}/segments", json={"text": " "}).status_code == 400
+
+    refreshed = client.get(f"/sessions/{session_id}", params={"refresh": True}).json()
+    assert refreshed["version"] == 1 and refreshed["pending_tokens"] == 0
+
+    closed = client.post(f"/sessions/{session_id}/close").json()
+    assert closed["transcript"] == "Decision: use live sessions."
+    assert client.get(f"/sessions/{session_id}").status_code == 404
+    assert client.post("/sessions/missing/segments", json={"text": "hello"}).status_code == 404
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import pipeline
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flights = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "minutes"
+
+    async def go():
+        results = await asyncio.gather(*(flights.do("same", work) for _ in range(5)), flights.do("other", work))
+        return results, flights.in_flight()
+
+    results, in_flight = asyncio.run(go())
+    assert len(runs) == 2
+    assert [result for result, _ in results] == ["minutes"] * 6
+    assert [shared for _, shared in results] == [False, True, True, True, True, False]
+    assert in_flight == 0
+
+
+def test_failures_are_shared_and_not_remembered():
+    flights = SingleFlight("test")
+    runs = []
+
+    async def failing():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise ConnectionError("provider down")
+
+    async def go():
+        outcomes = await asyncio.gather(flights.do("key", failing), flights.do("key", failing),
+                                        return_exceptions=True)
+        assert len(runs) == 1
+        # A later call starts afresh
+        with pytest.raises(ConnectionError):
+            await flights.do("key", failing)
+        return outcomes
+
+    outcomes = asyncio.run(go())
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+    assert len(runs) == 2
+
+
+def test_work_continues_until_the_last_caller_leaves():
+    flights = SingleFlight("test")
+    finished = []
+
+    async def work():
+        try:
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return "done"
+        except asyncio.CancelledError:
+            finished.append(False)
+            raise
+
+    async def go():
+        first = asyncio.create_task(flights.do("key", work))
+        second = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+
+        third = asyncio.create_task(flights.do("again", work))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.sleep(0.01)
+        return result
+
+    assert asyncio.run(go()) == ("done", True)
+    assert finished == [True, False]
+
+
+def test_identical_minutes_requests_make_one_model_call(monkeypatch):
+    calls = []
+
+    async def slow_generate(transcript):
+        calls.append(transcript)
+        await asyncio.sleep(0.02)
+        return {"summary": "Shared.", "decisions": [], "action_items": []}
+
+    monkeypatch.setattr(pipeline, "generate_meeting_minutes", slow_generate)
+
+    async def go():
+        return await asyncio.gather(*(
+            pipeline.generate_minutes_with_cache("Three people asked for the same minutes.", "llm")
+            for _ in range(3)
+        ))
+
+    results = asyncio.run(go())
+    assert len(calls) == 1
+    assert all(minutes == {"summary": "Shared.", "decisions": [], "action_items": []} for minutes, _ in results)
@@ -0,0 +1,71 @@
+import io
+import json
+import wave
+
+import numpy as np
+
+from main import format_sse
+
+
+def _wav(seconds: float, rate: int = 16000) -> bytes:
+    samples = (np.sin(np.arange(int(seconds * rate)) * 0.3) * 8000).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def _events(body: str) -> list:
+    events = []
+    for message in body.split("\n\n"):
+        lines = [line for line in message.splitlines() if not line.startswith(":")]
+        if not lines:
+            continue
+        fields = dict(line.split(": ", 1) for line in lines)
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_format_sse():
+    assert format_sse("done", {"a": 1}) == 'event: done\ndata: {"a": 1}\n\n'
+
+
+def test_stream_reports_progress_then_result(client):
+    response = client.post(
+        "/transcribe-stream",
+        files={"file": ("meeting.wav", _wav(70), "audio/wav")}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "upload_received"
+    assert names[-3:] == ["minutes_started", "result", "done"]
+    chunks = [data for name, data in events if name == "transcript_chunk"]
+    assert len(chunks) > 1
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+
+    result = events[-2][1]
+    assert result["success"] is True
+    assert result["transcript"] == " ".join(chunk["text"] for chunk in chunks)
+    assert result["meeting_minutes"]["summary"]
+
+
+def test_stream_without_minutes(client):
+    response = client.post(
+        "/transcribe-stream",
+        files={"file": ("meeting.wav", _wav(2), "audio/wav")},
+        data={"generate_minutes": "false"}
+    )
+    names = [name for name, _ in _events(response.text)]
+    assert "minutes_started" not in names
+    assert names[-2:] == ["result", "done"]
+
+
+def test_unsupported_type_fails_before_streaming(client):
+    response = client.post("/transcribe-stream", files={"file": ("notes.txt", b"hello", "text/plain")})
+    assert response.status_code == 400
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+from startup import StartupReport
+
+
+def test_report_times_imports_and_phases(tmp_path, monkeypatch):
+    (tmp_path / "slow_module_for_startup_test.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    report = StartupReport()
+
+    report.track_imports()
+    try:
+        import slow_module_for_startup_test  # noqa: F401
+    finally:
+        report.stop_tracking_imports()
+        sys.modules.pop("slow_module_for_startup_test", None)
+    report.mark("ready")
+
+    result = report.to_dict()
+    assert result["slowest_imports"]["slow_module_for_startup_test"] >= 0.05
+    assert list(result["phases"]) == ["imports", "ready"]
+    assert result["phases"]["ready"] >= result["phases"]["imports"]
+
+
+def test_fake_backends_never_import_provider_sdks():
+    # A fresh interpreter, since this one may already have imported them
+    code = (
+        "import sys, main; "
+        "print(sorted(name for name in ('agents', 'openai', 'huggingface_hub') if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=os.environ.copy(),
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_health_reports_startup(client):
+    startup = client.get("/health").json()["startup"]
+    assert {"imports", "ready"} <= set(startup["phases"])
+    assert startup["slowest_imports"]
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import streaming
+from ratelimit import AdmissionController
+from streaming import WindowBuffer
+
+RATE = 16000
+
+
+def _pcm(seconds: float) -> bytes:
+    return (np.sin(np.arange(int(seconds * RATE)) * 0.3) * 8000).astype("<i2").tobytes()
+
+
+def test_windows_overlap_and_hold_one_window_of_audio():
+    buffer = WindowBuffer(RATE, 1, 2, window_seconds=4, overlap_seconds=1)
+    windows = []
+    audio = _pcm(11)
+    for offset in range(0, len(audio), 3000):
+        windows.extend(buffer.feed(audio[offset:offset + 3000]))
+        assert len(buffer.buffer) < buffer.window_bytes
+
+    assert [start for start, _ in windows] == [0, 3, 6]
+    assert all(window.duration == 4 for _, window in windows)
+    # The second window starts with the last second of the first
+    assert windows[1][1].frames[:RATE * 2] == windows[0][1].frames[-RATE * 2:]
+
+    start, tail = buffer.flush()
+    assert (start, tail.duration) == (9, 2)
+    assert buffer.received_seconds == 11
+
+
+def test_flush_skips_audio_already_sent():
+    buffer = WindowBuffer(RATE, 1, 2, window_seconds=4, overlap_seconds=1)
+    buffer.feed(_pcm(4.1))
+    # Only 0.1 s is new; the rest was in the first window
+    assert buffer.flush() is None
+
+    short = WindowBuffer(RATE, 1, 2, window_seconds=4, overlap_seconds=1)
+    short.feed(_pcm(1))
+    assert short.flush()[1].duration == 1
+
+
+def test_window_must_be_longer_than_overlap():
+    with pytest.raises(ValueError):
+        WindowBuffer(RATE, 1, 2, window_seconds=1, overlap_seconds=1)
+
+
+def _stream(client, audio: bytes, query: str = "") -> list:
+    with client.websocket_connect(f"/ws/transcribe{query}") as websocket:
+        for offset in range(0, len(audio), RATE):
+            websocket.send_bytes(audio[offset:offset + RATE])
+        websocket.send_json({"type": "stop"})
+        messages = []
+        while not messages or messages[-1]["type"] not in ("done", "error"):
+            messages.append(websocket.receive_json())
+    return messages
+
+
+def test_websocket_streams_transcripts_in_order(client):
+    messages = _stream(client, _pcm(15))
+    transcripts = [message for message in messages if message["type"] == "transcript"]
+    assert messages[-1]["type"] == "done"
+    assert len(transcripts) > 1
+    assert [message["index"] for message in transcripts] == list(range(len(transcripts)))
+    assert messages[-1]["transcript"] == " ".join(message["text"] for message in transcripts)
+
+
+def test_windows_without_a_slot_are_reported_as_errors(client, monkeypatch):
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.1)
+    # Every slot is taken by other streams
+    admission.running = 1
+    monkeypatch.setattr(streaming, "stream_admission", admission)
+    error = _stream(client, _pcm(9))[-1]
+    assert error["type"] == "error"
+    assert "capacity" in error["detail"]
+
+
+def test_websocket_feeds_a_live_session(client):
+    session_id = client.post("/sessions").json()["session_id"]
+    done = _stream(client, _pcm(3), f"?session_id={session_id}")[-1]
+    session = client.get(f"/sessions/{session_id}", params={"include_transcript": True}).json()
+    assert session["transcript"] == done["transcript"]
+    client.post(f"/sessions/{session_id}/close")
+
+
+def test_websocket_rejects_bad_parameters(client):
+    for query in ("?format=mp3", "?sample_rate=96000", "?session_id=missing"):
+        with client.websocket_connect(f"/ws/transcribe{query}") as websocket:
+            assert websocket.receive_json()["type"] == "error"
@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import UploadSizeLimitMiddleware, save_upload
+
+
+def _upload(data: bytes, filename: str = "meeting.wav") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+def test_save_upload_streams_hashes_and_keeps_extension(tmp_path):
+    data = os.urandom(3000)
+    saved = asyncio.run(save_upload(_upload(data), max_size=5000, directory=str(tmp_path)))
+    try:
+        assert saved.size == 3000
+        assert saved.sha256 == hashlib.sha256(data).hexdigest()
+        assert saved.path.endswith(".wav")
+        with open(saved.path, "rb") as f:
+            assert f.read() == data
+    finally:
+        os.unlink(saved.path)
+
+
+def test_oversized_upload_is_rejected_and_removed(tmp_path):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(save_upload(_upload(os.urandom(6000)), max_size=5000, directory=str(tmp_path)))
+    assert error.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def _limited_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_size=1000, path_limits={"/big": 10_000})
+    return app
+
+
+def test_declared_oversized_body_is_refused_before_reading():
+    with TestClient(_limited_app()) as client:
+        assert client.post("/upload", content=b"x" * 500).json() == {"size": 500}
+        response = client.post("/upload", content=b"x" * 1500)
+    assert response.status_code == 413
+
+
+def test_chunked_body_is_cut_off_once_over_the_limit():
+    def body():
+        for _ in range(20):
+            yield b"x" * 100
+
+    with TestClient(_limited_app()) as client:
+        response = client.post("/upload", content=body())
+    assert response.status_code == 413
+    assert "content-length" not in response.request.headers
+
+
+def test_path_limits_override_the_default():
+    app = _limited_app()
+
+    @app.post("/big")
+    async def big(request: Request):
+        return {"size": len(await request.body())}
+
+    with TestClient(app) as client:
+        assert client.post("/big", content=b"x" * 5000).status_code == 200
+        assert client.post("/big", content=b"x" * 20_000).status_code == 413
+
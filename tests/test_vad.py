@@ -0,0 +1,72 @@
+import numpy as np
+
+from audio import PCMAudio, level_db, trim_silence
+from config import config
+from transcription import transcribe_audio_with_details
+
+RATE = 16000
+
+
+def _pcm(*parts) -> PCMAudio:
+    """Build mono 16-bit audio from (seconds, amplitude) parts of tone or faint noise"""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, amplitude in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        if amplitude:
+            pieces.append(np.sin(2 * np.pi * 220 * t) * amplitude)
+        else:
+            pieces.append(rng.normal(0, 0.0005, len(t)))
+    samples = (np.concatenate(pieces) * 32767).astype("<i2")
+    return PCMAudio(frames=samples.tobytes(), sample_rate=RATE, channels=1, sample_width=2)
+
+
+def test_long_silences_are_removed_and_mapped_back():
+    audio = _pcm((1, 0.5), (3, 0), (1, 0.5))
+    trimmed = trim_silence(audio, min_silence_seconds=1.0, padding_seconds=0.3)
+
+    # 3 s of silence less 0.3 s of padding on each side, to the nearest frame
+    assert 2.3 < trimmed.removed_seconds < 2.5
+    assert abs(trimmed.audio.duration + trimmed.removed_seconds - audio.duration) < 1e-9
+    assert len(trimmed.segments) == 2
+    # Speech after the gap maps back past the removed silence
+    assert trimmed.to_original(0.5) == 0.5
+    assert abs(trimmed.to_original(trimmed.audio.duration - 0.1) - 4.9) < 0.02
+
+
+def test_short_pauses_and_flat_audio_are_kept():
+    paused = _pcm((1, 0.5), (0.5, 0), (1, 0.5))
+    assert trim_silence(paused, min_silence_seconds=1.0, padding_seconds=0.3).removed_seconds == 0
+
+    flat = _pcm((3, 0))
+    trimmed = trim_silence(flat, min_silence_seconds=1.0, padding_seconds=0.3)
+    assert trimmed.audio is flat
+    assert trimmed.to_original(1.5) == 1.5
+
+
+def test_level_db():
+    assert level_db(_pcm((1, 0))) < -60
+    assert -10 < level_db(_pcm((1, 0.5))) < -8
+    assert level_db(PCMAudio(frames=b"", sample_rate=RATE, channels=1, sample_width=2)) == -120.0
+
+
+def test_transcription_reports_removed_silence(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "VAD_ENABLED", True)
+    path = tmp_path / "meeting.wav"
+    path.write_bytes(_pcm((1, 0.5), (5, 0), (1, 0.5)).to_wav_bytes())
+
+    result = transcribe_audio_with_details(str(path))
+    assert result.text
+    assert result.audio_seconds == 7
+    assert 4 < result.silence_removed_seconds < 5
+    assert [segment[1] for segment in result.offset_map][0] == 0
+
+
+def test_offset_map_is_returned_with_the_transcript(client, monkeypatch):
+    monkeypatch.setattr(config, "VAD_ENABLED", True)
+    wav = _pcm((1, 0.5), (4, 0), (1, 0.5)).to_wav_bytes()
+    response = client.post("/transcribe-only", files={"file": ("gap.wav", wav, "audio/wav")})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["offset_map"]) == 2
+    assert body["offset_map"][1][1] > 4
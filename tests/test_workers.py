@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from workers import TranscriptionExecutor, TranscriptionTimeoutError
+
+
+def test_run_returns_result_off_the_event_loop():
+    executor = TranscriptionExecutor(max_workers=2, timeout=5)
+    loop_thread = threading.get_ident()
+
+    async def go():
+        return await executor.run(lambda x: (x * 2, threading.get_ident()), 21)
+
+    try:
+        value, thread = asyncio.run(go())
+    finally:
+        executor.shutdown()
+    assert value == 42
+    assert thread != loop_thread
+
+
+def test_concurrency_is_bounded_and_queue_is_reported():
+    executor = TranscriptionExecutor(max_workers=2, timeout=5)
+    release = threading.Event()
+    running = []
+    lock = threading.Lock()
+    peak = [0]
+
+    def work():
+        with lock:
+            running.append(1)
+            peak[0] = max(peak[0], len(running))
+        release.wait(5)
+        with lock:
+            running.pop()
+
+    async def go():
+        tasks = [asyncio.create_task(executor.run(work)) for _ in range(5)]
+        await asyncio.sleep(0.2)
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    try:
+        stats = asyncio.run(go())
+    finally:
+        executor.shutdown()
+    assert peak[0] == 2
+    assert stats["running"] == 2
+    assert stats["queued"] == 3
+    assert executor.stats()["running"] == 0
+    assert executor.stats()["queued"] == 0
+
+
+def test_timeout_raises_and_drops_queued_calls():
+    executor = TranscriptionExecutor(max_workers=1, timeout=5)
+    calls = []
+
+    async def go():
+        blocker = asyncio.create_task(executor.run(time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(TranscriptionTimeoutError):
+            await executor.run(calls.append, "queued", timeout=0.1)
+        await blocker
+
+    try:
+        asyncio.run(go())
+    finally:
+        executor.shutdown()
+    assert calls == []
+    assert executor.stats()["queued"] == 0
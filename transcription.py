@@ -1,56 +1,291 @@
+import hashlib
+import logging
 import os
-from huggingface_hub import InferenceClient
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
 
-def transcribe_audio(audio_file_path: str) -> str:
+from audio import PCMAudio, TrimmedAudio, encode_audio, level_db, load_pcm, normalize_audio, split_windows, trim_silence
+from config import config
+from backends import ASRBackend
+from metrics import bytes_processed, stage_duration, track_provider_call
+from providers import providers
+from resilience import asr_policy
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TranscriptionResult:
+    """
+    A transcript plus what preprocessing did to the audio
+
+    ``offset_map`` lists ``[trimmed_start, original_start, duration]``
+    segments, in seconds, mapping positions in the audio that was sent to
+    the provider back to the uploaded recording.
+    """
+    text: str
+    audio_seconds: Optional[float] = None
+    silence_removed_seconds: float = 0.0
+    offset_map: List[List[float]] = field(default_factory=list)
+
+def _preprocessing_fingerprint() -> str:
+    normalization = f"normalize={config.AUDIO_NORMALIZATION}"
+    if not config.VAD_ENABLED:
+        return f"{normalization}:vad=off"
+    return f"{normalization}:vad=" + ",".join(str(value) for value in (
+        config.VAD_MIN_SILENCE_SECONDS, config.VAD_PADDING_SECONDS, config.VAD_FRAME_SECONDS,
+        config.VAD_ENERGY_MARGIN_DB, config.VAD_ZCR_THRESHOLD
+    ))
+
+def transcription_cache_key(audio_sha256: str) -> str:
     """
-    Transcribe audio file using Hugging Face inference API
-    
+    Build the transcription cache key for an audio file
+
+    Args:
+        audio_sha256 (str): SHA-256 hex digest of the audio bytes
+
+    Returns:
+        str: Key covering the audio content, backend, model, provider and preprocessing settings
+    """
+    key = (f"{audio_sha256}:{config.ASR_BACKEND}:{config.TRANSCRIPTION_MODEL}:{config.TRANSCRIPTION_PROVIDER}:"
+           f"{_preprocessing_fingerprint()}")
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+class TranscriptStitcher:
+    """
+    Incrementally join transcripts of overlapping audio windows
+
+    Each window repeats the tail of the previous one, so the start of each
+    transcript normally repeats the end of the text so far. The longest such
+    repetition is removed. A couple of leading words may be skipped while
+    matching, since a window boundary often cuts a word in half.
+    """
+
+    def __init__(self, max_overlap_words: int = 30):
+        self.max_overlap_words = max_overlap_words
+        self.words: List[str] = []
+
+    def add(self, text: str) -> str:
+        """
+        Append the transcript of the next window
+
+        Args:
+            text (str): Transcript of the next window
+
+        Returns:
+            str: The text actually appended, with the repeated words removed
+        """
+        new_words = text.split()
+        drop = 0
+        if self.words and new_words:
+            tail = [_normalize_word(w) for w in self.words[-self.max_overlap_words:]]
+            head = [_normalize_word(w) for w in new_words[:self.max_overlap_words + 2]]
+            for size in range(min(len(tail), len(head)), 1, -1):
+                match = next(
+                    (skip for skip in range(3) if head[skip:skip + size] == tail[-size:]),
+                    None
+                )
+                if match is not None:
+                    drop = match + size
+                    break
+        self.words.extend(new_words[drop:])
+        return " ".join(new_words[drop:])
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.words)
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 30) -> str:
+    """
+    Join transcripts of overlapping audio windows, dropping the repeated words
+
+    Args:
+        texts (List[str]): Transcripts of consecutive windows, in order
+        max_overlap_words (int): Longest repetition to look for
+
+    Returns:
+        str: The stitched transcript
+    """
+    stitcher = TranscriptStitcher(max_overlap_words)
+    for text in texts:
+        stitcher.add(text)
+    return stitcher.text
+
+def _call_asr(asr: ASRBackend, audio) -> str:
+    """
+    Transcribe with retries, hedging and circuit breaking, recording the
+    latency and any failure of every attempt
+    """
+    size = len(audio) if isinstance(audio, bytes) else os.path.getsize(audio)
+    bytes_processed.inc(size, stage="asr")
+
+    def attempt() -> str:
+        with track_provider_call("asr", asr.name):
+            return asr.transcribe(audio)
+
+    return asr_policy.call(attempt)
+
+def _transcribe_chunks(asr: ASRBackend, windows: List[PCMAudio],
+                       on_chunk: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Transcribe audio windows concurrently, retrying each failed window on its own
+
+    Each worker encodes its own window, so only the windows in flight are
+    held encoded. Windows are stitched in order as soon as they and every
+    earlier window are done, and each newly stitched piece of text is
+    passed to on_chunk.
+    """
+    def transcribe_window(window: PCMAudio) -> str:
+        return _call_asr(asr, encode_audio(window, config.AUDIO_NORMALIZATION_FORMAT))
+
+    stitcher = TranscriptStitcher()
+    with ThreadPoolExecutor(max_workers=config.TRANSCRIPTION_CHUNK_CONCURRENCY) as executor:
+        for text in executor.map(transcribe_window, windows):
+            added = stitcher.add(text)
+            if on_chunk and added:
+                on_chunk(added)
+    return stitcher.text
+
+def _trim_silence(audio: PCMAudio) -> TrimmedAudio:
+    with stage_duration.time(stage="vad"):
+        return trim_silence(
+            audio,
+            min_silence_seconds=config.VAD_MIN_SILENCE_SECONDS,
+            padding_seconds=config.VAD_PADDING_SECONDS,
+            frame_seconds=config.VAD_FRAME_SECONDS,
+            margin_db=config.VAD_ENERGY_MARGIN_DB,
+            zcr_threshold=config.VAD_ZCR_THRESHOLD
+        )
+
+def transcribe_pcm(audio: PCMAudio) -> str:
+    """
+    Transcribe one window of live audio already held in memory
+
+    The window is normalized like an upload. A window quieter than
+    STREAM_SILENCE_DB is not sent to the provider, since Whisper tends to
+    invent text for silence; with silence trimming enabled, neither is a
+    window in which no speech is found.
+
+    Args:
+        audio (PCMAudio): The audio window
+
+    Returns:
+        str: The transcript, empty if the window was silent
+
+    Raises:
+        Exception: If the provider call fails
+    """
+    if level_db(audio) < config.STREAM_SILENCE_DB:
+        return ""
+    with stage_duration.time(stage="normalize"):
+        audio = normalize_audio(audio)
+    if config.VAD_ENABLED:
+        audio = _trim_silence(audio).audio
+        if not audio.frames:
+            return ""
+    return _call_asr(providers.asr(), encode_audio(audio, config.AUDIO_NORMALIZATION_FORMAT))
+
+def transcribe_audio_with_details(audio_file_path: str,
+                                  on_chunk: Optional[Callable[[str], None]] = None) -> Optional[TranscriptionResult]:
+    """
+    Transcribe audio file with the configured ASR backend (Hugging Face inference by default)
+
+    When normalization is enabled, audio is downmixed and resampled to
+    16 kHz mono, and sent in that form whenever it is smaller than the
+    upload. When silence trimming is enabled, long silent spans are removed
+    before the audio is sent. Recordings longer than one chunk are split
+    into overlapping windows that are transcribed concurrently when chunking
+    is enabled.
+
     Args:
         audio_file_path (str): Path to the audio file
-        
+        on_chunk (Callable, optional): Called from the transcription thread with
+            each new piece of transcript text, in order, as it becomes available
+
     Returns:
-        str: Transcribed text
+        TranscriptionResult: The transcript and preprocessing details, or None on failure
     """
     try:
-        # Check if HF_TOKEN is available
-        if "HF_TOKEN" not in os.environ:
-            raise ValueError("HF_TOKEN environment variable not found")
-        
-        client = InferenceClient(
-            provider="fal-ai",
-            api_key=os.environ["HF_TOKEN"],
-        )
-        
-        # Transcribe the audio file
-        output = client.automatic_speech_recognition(
-            audio_file_path, 
-            model="openai/whisper-large-v3"
-        )
-        print(output)
-        
-        # Handle different response types
-        if hasattr(output, 'text'):
-            # If it's an object with a text attribute
-            return output.text
-        elif isinstance(output, dict) and 'text' in output:
-            # If it's a dictionary with text key
-            return output['text']
-        elif isinstance(output, str):
-            # If it's already a string
-            return output
-        elif hasattr(output, '__str__'):
-            # Try to convert to string as fallback
-            return str(output)
-        else:
-            # Last resort - try to access common attributes
-            print(f"Unexpected output type: {type(output)}")
-            print(f"Output content: {output}")
-            return "Transcription completed but text extraction failed"
-        
+        asr = providers.asr()
+        audio = None
+        result = TranscriptionResult(text="")
+        if config.TRANSCRIPTION_CHUNKING or config.VAD_ENABLED or config.AUDIO_NORMALIZATION:
+            audio = load_pcm(audio_file_path)
+        if audio:
+            result.audio_seconds = audio.duration
+
+        # Whisper only consumes 16 kHz mono, so don't upload anything more
+        if audio and config.AUDIO_NORMALIZATION:
+            with stage_duration.time(stage="normalize"):
+                audio = normalize_audio(audio)
+
+        # Drop long silences so the provider only hears speech
+        if audio and config.VAD_ENABLED:
+            trimmed = _trim_silence(audio)
+            audio = trimmed.audio
+            result.silence_removed_seconds = trimmed.removed_seconds
+            result.offset_map = [list(segment) for segment in trimmed.segments]
+            if trimmed.removed_seconds:
+                logger.info(
+                    "Trimmed silence before transcription",
+                    extra={"removed_seconds": round(trimmed.removed_seconds, 1),
+                           "kept_seconds": round(audio.duration, 1)}
+                )
+
+        # Split long recordings into overlapping windows
+        chunk_seconds = config.TRANSCRIPTION_CHUNK_SECONDS
+        overlap_seconds = config.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS
+        if audio and config.TRANSCRIPTION_CHUNKING and audio.duration > chunk_seconds + overlap_seconds:
+            windows = split_windows(audio, chunk_seconds, overlap_seconds)
+            logger.info(
+                "Transcribing audio in chunks",
+                extra={"duration_seconds": round(audio.duration), "chunks": len(windows)}
+            )
+            result.text = _transcribe_chunks(asr, windows, on_chunk)
+            return result
+
+        # Send the trimmed or normalized audio, unless the file as uploaded is smaller
+        payload = audio_file_path
+        if audio and result.silence_removed_seconds:
+            payload = encode_audio(audio, config.AUDIO_NORMALIZATION_FORMAT)
+        elif audio and config.AUDIO_NORMALIZATION:
+            upload_size = os.path.getsize(audio_file_path)
+            # Uncompressed PCM can't beat an upload that is already as small
+            if config.AUDIO_NORMALIZATION_FORMAT == "flac" or len(audio.frames) < upload_size:
+                encoded = encode_audio(audio, config.AUDIO_NORMALIZATION_FORMAT)
+                if len(encoded) < upload_size:
+                    payload = encoded
+        text = _call_asr(asr, payload)
+        logger.debug("Transcript: %s", text)
+
+        if on_chunk and text:
+            on_chunk(text)
+        result.text = text
+        return result
+
     except Exception as e:
-        print(f"Error in transcription: {str(e)}")
+        logger.error("Error in transcription: %s", e)
         return None
 
+def transcribe_audio(audio_file_path: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Transcribe audio file with the configured ASR backend (Hugging Face inference by default)
+
+    Args:
+        audio_file_path (str): Path to the audio file
+        on_chunk (Callable, optional): Called from the transcription thread with
+            each new piece of transcript text, in order, as it becomes available
+
+    Returns:
+        str: Transcribed text
+    """
+    result = transcribe_audio_with_details(audio_file_path, on_chunk)
+    return result.text if result else None
+
 # For testing purposes
 if __name__ == "__main__":
     # Test with a sample file if it exists
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from config import config
+from metrics import bytes_processed, stage_duration
+
+# Room for the multipart envelope and form fields around the uploaded file
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+# Archive members with these extensions are treated as audio files
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".ogg", ".webm"}
+
+
+def _too_large_detail(max_size: int) -> str:
+    return f"File too large. Maximum size: {max_size / (1024*1024):.1f}MB"
+
+
+@dataclass
+class SavedUpload:
+    """An uploaded file streamed to a temporary path"""
+    path: str
+    size: int
+    sha256: str
+
+
+async def save_upload(file: UploadFile, max_size: int = config.MAX_FILE_SIZE,
+                      directory: Optional[str] = None) -> SavedUpload:
+    """
+    Stream an uploaded file to a temporary file in bounded chunks
+
+    The file is hashed and its size checked as it is copied, so at most one
+    chunk is held in memory and oversized uploads stop at the first chunk
+    over the limit. The caller owns the returned file and must delete it.
+
+    Args:
+        file (UploadFile): The uploaded file
+        max_size (int): Maximum number of bytes to accept
+        directory (str, optional): Where to create the file. Defaults to the system temp directory.
+
+    Returns:
+        SavedUpload: Path, size and SHA-256 digest of the saved file
+
+    Raises:
+        HTTPException: 400 if the file is larger than max_size
+    """
+    digest = hashlib.sha256()
+    size = 0
+    extension = os.path.splitext(file.filename or "")[1] or ".bin"
+
+    start = time.perf_counter()
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=extension, dir=directory)
+    try:
+        with temp_file:
+            while chunk := await file.read(config.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=400, detail=_too_large_detail(max_size))
+                digest.update(chunk)
+                await run_in_threadpool(temp_file.write, chunk)
+    except BaseException:
+        os.unlink(temp_file.name)
+        raise
+
+    stage_duration.observe(time.perf_counter() - start, stage="temp_write")
+    bytes_processed.inc(size, stage="upload")
+    return SavedUpload(path=temp_file.name, size=size, sha256=digest.hexdigest())
+
+
+def is_zip_upload(file: UploadFile) -> bool:
+    """Return whether an uploaded file is a zip archive"""
+    return (
+        file.content_type in ("application/zip", "application/x-zip-compressed")
+        or (file.filename or "").lower().endswith(".zip")
+    )
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised when a zip archive holds more audio files or bytes than allowed"""
+
+
+def extract_audio_files(zip_path: str, max_size: int = config.MAX_FILE_SIZE,
+                        max_files: int = config.BATCH_MAX_FILES,
+                        max_total_size: int = config.BATCH_MAX_TOTAL_SIZE) -> List[Tuple[str, object]]:
+    """
+    Extract the audio files in a zip archive to temporary files
+
+    The member count and declared sizes are checked before anything is
+    written, so a small archive cannot expand to fill the disk. Members are
+    streamed out in chunks and hashed on the way, like uploads. Each result
+    is either a SavedUpload or, for a member that is too large, an error
+    message, so one bad member does not spoil the archive. The caller owns
+    the returned files and must delete them.
+
+    Args:
+        zip_path (str): Path to the zip archive
+        max_size (int): Maximum uncompressed size of a member
+        max_files (int): Maximum number of audio members
+        max_total_size (int): Maximum uncompressed size of all audio members together
+
+    Returns:
+        List[Tuple[str, object]]: (member name, SavedUpload or error message) pairs in archive order
+
+    Raises:
+        zipfile.BadZipFile: If the file is not a valid zip archive
+        ArchiveTooLargeError: If the archive exceeds max_files or max_total_size
+    """
+    results = []
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [
+            member for member in archive.infolist()
+            if not member.is_dir() and os.path.splitext(member.filename)[1].lower() in AUDIO_EXTENSIONS
+        ]
+        if len(members) > max_files:
+            raise ArchiveTooLargeError(f"Archive has {len(members)} audio files, more than {max_files}")
+        if sum(member.file_size for member in members) > max_total_size:
+            raise ArchiveTooLargeError(f"Archive audio files exceed {max_total_size} bytes uncompressed")
+
+        total = 0
+        try:
+            for member in members:
+                extension = os.path.splitext(member.filename)[1].lower()
+                digest = hashlib.sha256()
+                size = 0
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=extension)
+                # The declared sizes can lie, so the limits are also enforced while reading
+                try:
+                    with temp_file, archive.open(member) as source:
+                        while size <= max_size and total + size <= max_total_size and (
+                            chunk := source.read(config.UPLOAD_CHUNK_SIZE)
+                        ):
+                            size += len(chunk)
+                            digest.update(chunk)
+                            temp_file.write(chunk)
+                except BaseException:
+                    os.unlink(temp_file.name)
+                    raise
+
+                if total + size > max_total_size:
+                    os.unlink(temp_file.name)
+                    raise ArchiveTooLargeError(f"Archive audio files exceed {max_total_size} bytes uncompressed")
+                if size > max_size:
+                    os.unlink(temp_file.name)
+                    results.append((member.filename, _too_large_detail(max_size)))
+                else:
+                    total += size
+                    results.append((member.filename, SavedUpload(
+                        path=temp_file.name, size=size, sha256=digest.hexdigest()
+                    )))
+        except BaseException:
+            # Don't leak the members extracted before the failure
+            for _, member in results:
+                if isinstance(member, SavedUpload):
+                    os.unlink(member.path)
+            raise
+    return results
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject request bodies over a size limit while they are still arriving
+
+    Requests that declare an oversized Content-Length are refused before any
+    of the body is read. Chunked requests are counted as they stream in and
+    fail with 413 as soon as they cross the limit, instead of after the
+    whole body has been spooled to disk. ``path_limits`` overrides the
+    limit for specific paths.
+    """
+
+    def __init__(self, app, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self.path_limits.get(scope["path"], self.max_body_size)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and int(content_length) > max_body_size:
+            response = JSONResponse(
+                {"detail": _too_large_detail(max_body_size)},
+                status_code=413
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_body_size))
+            return message
+
+        await self.app(scope, limited_receive, send)
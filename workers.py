@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import config
+from metrics import metrics, stage_duration
+
+
+class TranscriptionTimeoutError(TimeoutError):
+    """Raised when a transcription call does not finish within its timeout"""
+
+
+class TranscriptionExecutor:
+    """
+    Bounded worker pool for blocking transcription calls
+
+    Transcription is a long, blocking provider call. Running it on this pool
+    keeps the event loop free to serve other requests while up to
+    ``max_workers`` transcriptions are in flight; further calls wait in the
+    pool's queue.
+    """
+
+    def __init__(self, max_workers: int, timeout: float):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="transcription"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    def _call(self, func: Callable, args: tuple, submitted_at: float) -> Any:
+        stage_duration.observe(time.perf_counter() - submitted_at, stage="transcription_queue")
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _on_done(self, future) -> None:
+        # A call cancelled while still queued never reaches _call
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run a blocking function on the pool and await its result
+
+        Args:
+            func (Callable): The blocking function to run
+            *args: Positional arguments for the function
+            timeout (float, optional): Seconds to wait, including time spent queued.
+                Defaults to the executor timeout.
+
+        Returns:
+            Any: The function's return value
+
+        Raises:
+            TranscriptionTimeoutError: If the call does not finish in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._call, func, args, time.perf_counter())
+        future.add_done_callback(self._on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Queued calls are dropped; a call that already started keeps its
+            # worker until the provider returns, but nobody waits for it.
+            future.cancel()
+            raise TranscriptionTimeoutError(f"Transcription timed out after {timeout:.0f}s")
+
+    def stats(self) -> dict:
+        """Return the current pool utilisation"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": self._queued,
+                "timeout_seconds": self.timeout
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pool, dropping calls that have not started yet"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Create executor instance
+transcription_executor = TranscriptionExecutor(
+    max_workers=config.TRANSCRIPTION_WORKERS,
+    timeout=config.TRANSCRIPTION_TIMEOUT
+)
+
+metrics.gauge(
+    "mma_transcription_workers", "Transcription worker pool usage", ["state"],
+    function=lambda: {
+        (state,): transcription_executor.stats()[state] for state in ("running", "queued")
+    }
+)